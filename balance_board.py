@@ -0,0 +1,359 @@
+import argparse
+import json
+import math
+import os
+import random
+import threading
+import time
+
+# Wii Balance Board input: a reader thread turns raw evdev events into
+# timestamped weight samples in a ring buffer; the game polls a smoothed,
+# calibrated analog lean (-1 .. 1) once per frame. Raw event streams can be
+# recorded to a file and replayed with their original timing, so latency and
+# jitter can be measured on a machine without the board.
+#
+#   python balance_board.py record board.jsonl --seconds 30   (needs evdev and the board)
+#   python balance_board.py replay board.jsonl
+#   python balance_board.py replay --synthetic 20
+
+# Make sure you have installed evdev: sudo apt install python3-evdev
+try:
+    import evdev
+except ImportError:
+    evdev = None
+
+BOARD_NAME = "Nintendo Wii Remote Balance Board"
+EV_SYN, EV_ABS = 0, 3
+# This is the exact sensor map we found for the board
+ABS_HAT0X, ABS_HAT0Y, ABS_HAT1X, ABS_HAT1Y = 0x10, 0x11, 0x12, 0x13
+SENSORS = {ABS_HAT0X: 0, ABS_HAT1X: 1, ABS_HAT0Y: 2, ABS_HAT1Y: 3}  # code -> index into (TR, TL, BR, BL)
+RECORDING_FORMAT = "balance-board-events"
+
+
+# --- Event sources ---
+# A source is an iterable of (timestamp, type, code, value); timestamps are time.time() seconds.
+def find_balance_board():
+    """Returns the board's evdev InputDevice, or None (no evdev, no board, no permission)."""
+    if evdev is None: return None
+    for path in evdev.list_devices():
+        try: device = evdev.InputDevice(path)
+        except OSError: continue
+        if device.name == BOARD_NAME:
+            print(f"Found Balance Board: {device.path}")
+            return device
+        device.close()
+    return None
+
+class EvdevSource:
+    """Reads a grabbed evdev device (exclusive access) until closed."""
+    def __init__(self, device): self.device = device
+
+    def __iter__(self):
+        self.device.grab()
+        try:
+            for event in self.device.read_loop(): yield event.timestamp(), event.type, event.code, event.value
+        finally:
+            try: self.device.ungrab()
+            except OSError: pass
+
+    def close(self): self.device.close()
+
+class ReplaySource:
+    """
+    Plays back events from a recording (or any list of events), rebased to
+    the current time. With realtime=True each event is released when it is
+    due, reproducing the original rate and spacing; otherwise as fast as possible.
+    """
+    def __init__(self, events, realtime=True):
+        self.events, self.realtime = events, realtime
+        self._closed = threading.Event()
+
+    @classmethod
+    def from_file(cls, path, realtime=True): return cls(load_recording(path), realtime)
+
+    def __iter__(self):
+        if not self.events: return
+        offset = time.time() - self.events[0][0]
+        for t, etype, code, value in self.events:
+            t += offset
+            if self.realtime:
+                delay = t - time.time()
+                if delay > 0 and self._closed.wait(delay): return
+            if self._closed.is_set(): return
+            yield t, etype, code, value
+
+    def close(self): self._closed.set()
+
+def synthetic_events(seconds, rate=100, weight=6000, seed=None):
+    """A rider swaying left and right (with sensor noise) as raw events, e.g. for replay benchmarks."""
+    rng = random.Random(seed); events = []
+    for i in range(int(seconds * rate)):
+        t = i / rate + rng.uniform(0, 0.2 / rate)
+        lean = math.sin(t * 1.3) * 0.6 + rng.gauss(0, 0.03)
+        right, left = weight * (1 + lean) / 2, weight * (1 - lean) / 2
+        for code, value in ((ABS_HAT0X, right * 0.5), (ABS_HAT1X, left * 0.5), (ABS_HAT0Y, right * 0.5), (ABS_HAT1Y, left * 0.5)):
+            events.append((t, EV_ABS, code, int(value + rng.gauss(0, 20))))
+        events.append((t, EV_SYN, 0, 0))
+    return events
+
+
+# --- Recording ---
+class EventRecorder:
+    """
+    Appends raw events to a JSONL file: a header line, then [t, type, code, value]
+    per event. The file is flushed every 'flush_interval' seconds, so a killed
+    or crashed game loses at most that much of the recording (load_recording
+    skips a torn last line). Writes after close() are ignored.
+    """
+    def __init__(self, path, flush_interval=1.0):
+        self.path, self.flush_interval = path, flush_interval
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write(json.dumps({"format": RECORDING_FORMAT, "version": 1, "started": time.time()}) + "\n")
+        self._lock = threading.Lock()  # the reader thread writes, the game thread closes
+        self._next_flush = time.monotonic() + flush_interval
+
+    def write(self, t, etype, code, value):
+        with self._lock:
+            if self._file.closed: return
+            self._file.write(json.dumps([round(t, 6), etype, code, value]) + "\n")
+            now = time.monotonic()
+            if now >= self._next_flush: self._file.flush(); self._next_flush = now + self.flush_interval
+
+    def close(self):
+        with self._lock: self._file.close()
+
+def load_recording(path):
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("format") != RECORDING_FORMAT: raise ValueError(f"{path} is not a balance board recording")
+        events = []
+        for line in f:
+            try: events.append(tuple(json.loads(line)))
+            except ValueError: break  # torn last line
+    return events
+
+
+# --- Samples ---
+class SampleRing:
+    """
+    Single-producer/single-consumer ring of (event_time, tr, tl, br, bl) samples.
+
+    The reader thread writes a slot and then bumps 'written'; the game thread
+    reads up to 'written'. Both are plain attribute stores (atomic under the
+    GIL), so neither side ever takes a lock. If the consumer falls more than
+    'capacity' behind, the oldest samples are dropped and counted in 'overruns'.
+    """
+    def __init__(self, capacity=512):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self.written, self.read, self.overruns = 0, 0, 0
+
+    def push(self, sample):
+        self._slots[self.written % self.capacity] = sample
+        self.written += 1
+
+    def drain(self):
+        written = self.written
+        if written - self.read > self.capacity:
+            self.overruns += written - self.read - self.capacity; self.read = written - self.capacity
+        samples = [self._slots[i % self.capacity] for i in range(self.read, written)]
+        self.read = written
+        return samples
+
+
+# --- Calibration ---
+class Calibration:
+    """
+    Per-rider lean mapping. The balance is (right - left) / total weight;
+    'center' is the rider's balance standing still, 'left'/'right' their
+    balance at a comfortable full lean. Leans inside 'deadzone' (a fraction
+    of full lean) read as 0. 'min_weight' is the total below which nobody is
+    on the board. This replaces the fixed TILT_THRESHOLD of raw units.
+    """
+    def __init__(self, center=0.0, left=-0.5, right=0.5, deadzone=0.15, min_weight=1000):
+        self.center, self.left, self.right, self.deadzone, self.min_weight = center, left, right, deadzone, min_weight
+
+    def lean(self, tr, tl, br, bl):
+        """Calibrated lean in -1 .. 1 for one sample (0 when nobody is on the board)."""
+        total = tr + tl + br + bl
+        if total < self.min_weight: return 0.0
+        offset = (tr + br - tl - bl) / total - self.center
+        span = (self.right - self.center) if offset > 0 else (self.center - self.left)
+        lean = min(1.0, abs(offset) / span) if span > 0 else 0.0
+        if lean < self.deadzone: return 0.0
+        lean = (lean - self.deadzone) / (1 - self.deadzone)
+        return lean if offset > 0 else -lean
+
+    def as_dict(self): return {"center": self.center, "left": self.left, "right": self.right, "deadzone": self.deadzone, "min_weight": self.min_weight}
+
+class CalibrationStore:
+    """Calibrations by rider name, persisted as one JSON file."""
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, encoding="utf-8") as f: self.riders = json.load(f)
+        except (OSError, ValueError):
+            self.riders = {}
+
+    def get(self, rider):
+        data = self.riders.get(rider)
+        return Calibration(**data) if data else None
+
+    def put(self, rider, calibration):
+        self.riders[rider] = calibration.as_dict()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f: json.dump(self.riders, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+class Calibrator:
+    """
+    Collects samples for the three calibration stages ('center', 'left',
+    'right') and builds a Calibration from them.
+    """
+    STAGES = ("center", "left", "right")
+
+    def __init__(self):
+        self.balance = {stage: [] for stage in self.STAGES}
+        self.center_weights = []
+
+    def add(self, stage, samples):
+        for _, tr, tl, br, bl in samples:
+            total = tr + tl + br + bl
+            if total <= 0: continue
+            self.balance[stage].append((tr + br - tl - bl) / total)
+            if stage == "center": self.center_weights.append(total)
+
+    def result(self, deadzone=0.15):
+        """Returns the Calibration, or None if a stage has no samples or the leans don't separate."""
+        if not all(self.balance[stage] for stage in self.STAGES): return None
+        def percentile(values, q): values = sorted(values); return values[min(len(values) - 1, int(len(values) * q))]
+        center = percentile(self.balance["center"], 0.5)
+        # The 80th percentile of each lean, so a momentary overshoot doesn't set the range
+        left, right = percentile(self.balance["left"], 0.2), percentile(self.balance["right"], 0.8)
+        if not left < center < right: return None
+        return Calibration(center, left, right, deadzone, min_weight=percentile(self.center_weights, 0.5) * 0.3)
+
+
+# --- Board ---
+class BalanceBoard:
+    """
+    The board as an input device. start() runs the reader thread over an
+    event source; poll() is called once per frame and returns the smoothed
+    lean. Smoothing is an exponential filter with time constant 'smoothing'
+    seconds, applied per sample, so it behaves the same at any sample rate.
+
+    Latency is measured from each sample's event timestamp to the poll()
+    that consumed it; jitter is the spread of the gaps between samples.
+    """
+    def __init__(self, source, calibration=None, smoothing=0.06, ring_capacity=512, recorder=None):
+        self.source, self.calibration = source, calibration or Calibration()
+        self.smoothing, self.recorder = smoothing, recorder
+        self.ring = SampleRing(ring_capacity)
+        self.lean, self.raw_lean = 0.0, 0.0
+        self.last_sample = None
+        self.error = None
+        self._last_time = None
+        self.latencies, self.intervals = [], []  # bounded to the last 'history' values
+        self.history = 2000
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="balance-board", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        weights = [0, 0, 0, 0]  # TR, TL, BR, BL
+        try:
+            for t, etype, code, value in self.source:
+                if self.recorder: self.recorder.write(t, etype, code, value)
+                if etype == EV_ABS and code in SENSORS: weights[SENSORS[code]] = value
+                elif etype == EV_SYN: self.ring.push((t, *weights))
+        except Exception as e:
+            self.error = e
+            print(f"Error reading from balance board: {e}")
+            print("Please ensure you are running this script with 'sudo'")
+        finally:
+            self.ring.push((time.time(), 0, 0, 0, 0))  # failsafe: nobody on the board
+
+    def running(self): return self._thread is not None and self._thread.is_alive()
+
+    def poll(self, now=None):
+        """Consumes the new samples and returns the smoothed lean (-1 left .. 1 right)."""
+        now = time.time() if now is None else now
+        lean, calibration = self.lean, self.calibration
+        for sample in self.ring.drain():
+            t = sample[0]
+            if self._last_time is not None:
+                dt = max(0.0, t - self._last_time); self._record(self.intervals, dt)
+                alpha = 1 - math.exp(-dt / self.smoothing) if self.smoothing > 0 else 1.0
+            else:
+                alpha = 1.0
+            self._last_time = t
+            self.raw_lean = calibration.lean(*sample[1:])
+            lean += (self.raw_lean - lean) * alpha
+            self._record(self.latencies, now - t)
+            self.last_sample = sample
+        self.lean = lean
+        return lean
+
+    def drain_samples(self):
+        """Consumes new samples without filtering (for calibration screens)."""
+        samples = self.ring.drain()
+        if samples: self.last_sample = samples[-1]
+        return samples
+
+    def _record(self, values, value):
+        values.append(value)
+        if len(values) > self.history: del values[:len(values) - self.history]
+
+    def stats(self):
+        def spread(values):
+            if not values: return None
+            ordered = sorted(values); mean = sum(values) / len(values)
+            return {"mean_ms": mean * 1000, "p95_ms": ordered[len(ordered) * 95 // 100] * 1000,
+                    "std_ms": math.sqrt(sum((v - mean) ** 2 for v in values) / len(values)) * 1000}
+        return {"samples": self.ring.written, "overruns": self.ring.overruns, "lean": self.lean,
+                "latency": spread(self.latencies), "interval": spread(self.intervals)}
+
+    def close(self):
+        self.source.close()
+        if self.recorder: self.recorder.close()
+
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record or replay balance board event streams.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="record raw events from the board")
+    record.add_argument("path"); record.add_argument("--seconds", type=float, default=30)
+    replay = commands.add_parser("replay", help="replay a recording and report latency/jitter")
+    replay.add_argument("path", nargs="?"); replay.add_argument("--synthetic", type=float, metavar="SECONDS", help="replay a generated sway instead")
+    replay.add_argument("--fps", type=int, default=60, help="poll rate of the simulated game loop")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        device = find_balance_board()
+        if device is None: parser.error("no balance board found (is evdev installed and the board connected?)")
+        board = BalanceBoard(EvdevSource(device), recorder=EventRecorder(args.path)).start()
+        print(f"Recording to {args.path} for {args.seconds:.0f}s. Step on the board!")
+        time.sleep(args.seconds); board.close()
+        print(f"Recorded {board.ring.written} samples.")
+        return
+
+    if not args.path and not args.synthetic: parser.error("give a recording or --synthetic SECONDS")
+    events = synthetic_events(args.synthetic, seed=1) if args.synthetic else load_recording(args.path)
+    board = BalanceBoard(ReplaySource(events)).start()
+    # Poll like the game loop does, once per frame
+    while board.running():
+        time.sleep(1 / args.fps); board.poll()
+    board.poll()
+    stats = board.stats()
+    print(f"{stats['samples']} samples, {stats['overruns']} overruns")
+    for name in ("latency", "interval"):
+        s = stats[name]
+        if s: print(f"{name:<9} mean {s['mean_ms']:6.2f} ms   p95 {s['p95_ms']:6.2f} ms   std {s['std_ms']:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import os
+# Headless by default: the dummy drivers still run every blit, scale and flip in software
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy"); os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import argparse
+import datetime
+import json
+import platform
+import random
+import subprocess
+import time
+import numpy as np
+import pygame
+import game
+from simulation import DESIGN_WIDTH, DESIGN_HEIGHT, questions, GameState, Obstacle, Powerup, start_firewall_event, step
+from tune import dodge_bot
+
+# Benchmark suite: drives the real game code (simulation step, particle
+# emitters, starfield, sprite/text caches, the presenter) through fixed,
+# seeded stress scenarios and reports frame time percentiles. Results go to a
+# JSON file; pass a previous file to --compare to see the change per scenario.
+#
+#   python benchmark.py --output before.json
+#   python benchmark.py --output after.json --compare before.json
+
+# --- Scenarios ---
+class Scenario:
+    """
+    One seeded benchmark run. setup(bench) runs once after the game state is
+    created and per_frame(bench) before every frame; both can add load. The
+    player is invulnerable so every scenario plays for its full length.
+    'quality' is the fixed quality level (see quality.py) the scenario runs at
+    and 'stars' the starfield density (stars per screen).
+    """
+    def __init__(self, name, description, frames=600, output_size=(1920, 1080), scaler='smooth', seed=1, setup=None, per_frame=None, quality=0, stars=150):
+        self.name, self.description, self.frames = name, description, frames
+        self.output_size, self.scaler, self.seed, self.quality, self.stars = output_size, scaler, seed, quality, stars
+        self.setup, self.per_frame = setup, per_frame
+
+
+def keep_obstacles(types, count):
+    """Tops the obstacle list up to 'count', spread over the whole playfield, every frame."""
+    def fill(bench):
+        obstacles, rng = bench.state.obstacles, bench.rng
+        while len(obstacles) < count:
+            y = rng.randint(-60, DESIGN_HEIGHT) if bench.frame == 0 else -60
+            obstacles.append(Obstacle(bench.state.game_time, obs_type=rng.choice(types), y_pos=y, rng=rng))
+    return fill
+
+def keep_powerups(count):
+    def fill(bench):
+        while len(bench.state.powerups) < count: bench.state.powerups.append(Powerup(bench.rng))
+    return fill
+
+def explosions(every, count):
+    def explode(bench):
+        if bench.frame % every == 0:
+            for _ in range(count):
+                game.create_explosion(bench.particles, bench.rng.randint(50, DESIGN_WIDTH - 50), bench.rng.randint(50, DESIGN_HEIGHT - 50))
+    return explode
+
+def firewall(every):
+    def start(bench):
+        if bench.frame % every == 0:
+            state = bench.state; state.is_firewall_event, state.firewall_warning_timer = True, 90
+            state.last_firewall_wall = start_firewall_event(state.obstacles, state.powerups, state.game_time, state.rng)
+    return start
+
+def combine(*funcs):
+    def run(bench):
+        for func in funcs: func(bench)
+    return run
+
+
+SCENARIOS = [
+    Scenario("baseline", "a normal seeded game played by the tuning bot"),
+    Scenario("200 asteroids", "200 rotating asteroids on screen", per_frame=keep_obstacles(['asteroid'], 200)),
+    Scenario("mixed swarm", "150 asteroids/drones/scouts plus 20 powerups",
+             per_frame=combine(keep_obstacles(['asteroid', 'drone', 'scout'], 150), keep_powerups(20))),
+    Scenario("firewall + 3 explosions", "a fire wall event every 5 s with 3 explosions every second",
+             per_frame=combine(firewall(300), explosions(60, 3))),
+    Scenario("firewall + 3 explosions (lowest)", "the same at the lowest quality level", quality=3,
+             per_frame=combine(firewall(300), explosions(60, 3))),
+    Scenario("5000 stars", "baseline with a 5000-star field", stars=5000),
+    Scenario("particle storm", "an explosion every 5 frames", per_frame=explosions(5, 1)),
+    Scenario("4K upscale (smooth)", "baseline presented at 3840x2160 with smoothscale", output_size=(3840, 2160), scaler='smooth'),
+    Scenario("4K upscale (integer)", "baseline presented at 3840x2160 with integer scaling", output_size=(3840, 2160), scaler='integer'),
+    Scenario("4K upscale (sdl2)", "baseline presented at 3840x2160 through the SDL2 renderer", output_size=(3840, 2160), scaler='sdl2'),
+]
+
+
+# --- Runner ---
+class Bench:
+    """The live objects a scenario's hooks can poke at."""
+    def __init__(self, scenario):
+        self.rng = random.Random(scenario.seed)
+        self.state = GameState(scenario.seed)
+        self.particles = game.ParticleSystem(seed=scenario.seed)
+        self.frame = 0
+
+
+def reset_game(seed):
+    """Puts the renderer-side globals in the same state before every scenario."""
+    random.seed(seed)
+    game.player_particles.clear(); game.obstacle_particles.clear()
+    game.player_particles.rng = np.random.default_rng(seed); game.obstacle_particles.rng = np.random.default_rng(seed + 1)
+    for cache in (game.sprite_cache, game.asteroid_cache, game.text_cache): cache.clear(); cache.reset_stats()
+    game.bake_asteroids()  # baked before play in the game too
+
+
+def percentiles(samples):
+    samples = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99), "mean": float(samples.mean()), "max": float(samples.max())}
+
+
+def run_scenario(scenario, frames=None, warmup=30):
+    """Plays one scenario and returns its result dict (times in milliseconds)."""
+    game.open_display(scenario.output_size, scenario.scaler, fullscreen=False)
+    reset_game(scenario.seed)
+    bench = Bench(scenario)
+    game.quality.set_level(scenario.quality); game.apply_quality(bench.particles)
+    game.starfield.rng = np.random.default_rng(scenario.seed); game.starfield.set_count(scenario.stars)
+    if scenario.setup: scenario.setup(bench)
+    frames = frames or scenario.frames
+    sim, draw, present, total = [], [], [], []
+    screen, perf = game.screen, time.perf_counter
+    for bench.frame in range(warmup + frames):
+        pygame.event.pump()
+        t0 = perf()
+        state = bench.state
+        if scenario.per_frame: scenario.per_frame(bench)
+        for event in step(state, dodge_bot(state)):
+            if event[0] == 'powerup': game.create_explosion(bench.particles, event[1], event[2])
+        while state.question_queue: step(state, answer=questions[state.question_queue[0]]["correct"])
+        state.game_over = False  # invulnerable
+        game.emit_particles(state.player, state.obstacles)
+        t1 = perf()
+        game.update_and_draw_starfield(screen)
+        bench.particles.update(); bench.particles.draw(screen)
+        game.draw_world(state); game.draw_hud(state)
+        t2 = perf()
+        game.presenter.present(screen)
+        t3 = perf()
+        if bench.frame >= warmup:
+            sim.append(t1 - t0); draw.append(t2 - t1); present.append(t3 - t2); total.append(t3 - t0)
+    frame = percentiles(total)
+    return {"name": scenario.name, "description": scenario.description, "seed": scenario.seed, "frames": frames,
+            "output_size": list(scenario.output_size), "quality": game.quality.settings["name"], "stars": scenario.stars, "presenter": game.presenter.describe(),
+            "frame_ms": frame, "sim_ms": percentiles(sim), "draw_ms": percentiles(draw), "present_ms": percentiles(present),
+            "fps_p50": 1000 / frame["p50"] if frame["p50"] else None,
+            "obstacles_end": len(bench.state.obstacles), "sprite_cache": game.sprite_cache.stats(),
+            "asteroid_cache": game.asteroid_cache.stats(), "text_cache": game.text_cache.stats()}
+
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(), "pygame": pygame.version.ver, "numpy": np.__version__,
+            "platform": platform.platform(), "video_driver": os.environ.get("SDL_VIDEODRIVER")}
+
+
+def compare(results, baseline):
+    """Text table of frame time percentiles against a previous results file."""
+    old = {r["name"]: r for r in baseline["scenarios"]}
+    lines = [f"Compared with {baseline['meta'].get('commit') or 'baseline'} ({baseline['meta'].get('timestamp')}):"]
+    for r in results:
+        if r["name"] not in old: lines.append(f"  {r['name']:<32} (new)"); continue
+        cells = []
+        for key in ("p50", "p95", "p99"):
+            before, after = old[r["name"]]["frame_ms"][key], r["frame_ms"][key]
+            change = (after - before) / before * 100 if before else 0.0
+            cells.append(f"{key} {before:6.2f} -> {after:6.2f} ms ({change:+5.1f}%)")
+        lines.append(f"  {r['name']:<32} " + "   ".join(cells))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the seeded benchmark scenarios and report frame times.")
+    parser.add_argument("--scenario", action="append", metavar="NAME", help="run only these scenarios (repeatable)")
+    parser.add_argument("--frames", type=int, help="measured frames per scenario (default: each scenario's own)")
+    parser.add_argument("--warmup", type=int, default=30, help="unmeasured frames before each scenario (default 30)")
+    parser.add_argument("--output", default="benchmark.json", help="results file (default benchmark.json)")
+    parser.add_argument("--compare", metavar="PATH", help="previous results file to compare against")
+    parser.add_argument("--list", action="store_true", help="list the scenarios and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for s in SCENARIOS: print(f"{s.name:<32} {s.description}")
+        return
+    selected = [s for s in SCENARIOS if not args.scenario or s.name in args.scenario]
+    unknown = set(args.scenario or ()) - {s.name for s in selected}
+    if unknown: parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    game.load_fonts()
+    results = []
+    for scenario in selected:
+        r = run_scenario(scenario, args.frames, args.warmup); results.append(r)
+        f = r["frame_ms"]
+        print(f"{r['name']:<32} p50 {f['p50']:6.2f}  p95 {f['p95']:6.2f}  p99 {f['p99']:6.2f}  max {f['max']:6.2f} ms"
+              f"   (sim {r['sim_ms']['p50']:.2f} / draw {r['draw_ms']['p50']:.2f} / present {r['present_ms']['p50']:.2f})")
+    report = {"meta": metadata(), "scenarios": results}
+    with open(args.output, "w", encoding="utf-8") as f: json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f: print(compare(results, json.load(f)))
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
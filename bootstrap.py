@@ -0,0 +1,84 @@
+import threading
+from contextlib import contextmanager
+import time
+
+
+class StartupTimer:
+    """
+    Records how long each startup phase takes, from the moment this module is
+    imported up to the first presented frame. mark() closes the current phase;
+    background tasks add their own durations when they finish.
+    """
+    def __init__(self):
+        self.start = self._last = time.perf_counter()
+        self.phases = []          # (name, ms) in order
+        self.background = []      # (name, ms) for tasks that ran on threads
+        self.first_frame_ms = None
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, (now - self._last) * 1000)); self._last = now
+
+    @contextmanager
+    def phase(self, name):
+        """Times a block as its own phase."""
+        start = time.perf_counter()
+        try: yield
+        finally:
+            self._last = time.perf_counter(); self.phases.append((name, (self._last - start) * 1000))
+
+    def record_background(self, name, ms):
+        with self._lock: self.background.append((name, ms))
+        print(f"[startup] {name} ready after {ms:.0f} ms (background)")
+
+    def first_frame(self):
+        """Call after every presented frame; logs the breakdown the first time."""
+        if self.first_frame_ms is not None: return
+        self.mark("first frame")
+        self.first_frame_ms = (time.perf_counter() - self.start) * 1000
+        print(self.report())
+
+    def report(self):
+        lines = ["[startup] time to first frame: " + (f"{self.first_frame_ms:.0f} ms" if self.first_frame_ms is not None else "not reached")]
+        lines += [f"[startup]   {name:<24} {ms:8.1f} ms" for name, ms in self.phases]
+        with self._lock:
+            lines += [f"[startup]   {name + ' (bg)':<24} {ms:8.1f} ms" for name, ms in self.background]
+        return "\n".join(lines)
+
+
+class BackgroundTask:
+    """
+    Runs a loader function on a daemon thread so slow services (Firebase,
+    audio) don't delay the first frame. get() never blocks: it returns the
+    result once the task has finished and 'default' until then (or if the
+    loader raised).
+    """
+    def __init__(self, name, func, timer=None):
+        self.name, self.func, self.timer = name, func, timer
+        self._done = threading.Event()
+        self._result, self.error = None, None
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"load-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        start = time.perf_counter()
+        try: self._result = self.func()
+        except Exception as e:
+            self.error = e; print(f"!! {self.name} failed to load: {e}")
+        finally:
+            self._done.set()
+            if self.timer: self.timer.record_background(self.name, (time.perf_counter() - start) * 1000)
+
+    def get(self, default=None):
+        return self._result if self._done.is_set() and self.error is None else default
+
+    def wait(self, timeout=None):
+        """Blocks until the task finishes and returns get() (for background workers, never the game loop)."""
+        self._done.wait(timeout)
+        return self.get()
@@ -0,0 +1,96 @@
+import numpy as np
+
+
+class EntityBounds:
+    """
+    A list of entities plus their axis-aligned bounds in contiguous NumPy
+    arrays (x, y, w, h), preallocated and updated in place.
+
+    Everything in the game moves downward and spawns at the top, so the rows
+    are kept roughly sorted by y; query() does a sorted sweep on y to find
+    the candidates whose y-range can overlap a rect, then tests x on just
+    those. Overlap follows pygame.Rect.colliderect (coordinates truncated to
+    ints, strict inequalities, empty rects never collide).
+
+    Entities must expose x, y and the attribute names given for width and
+    height. It behaves enough like a list (iteration, len, indexing, append,
+    extend, clear) to stand in for the old plain lists. Removal is an
+    in-place swap-remove (the last row fills the hole), so nothing is
+    reallocated per frame; removed entities go back to 'pool' if one is given.
+    """
+    def __init__(self, width_attr='width', height_attr='height', capacity=64, pool=None):
+        self.width_attr, self.height_attr, self.pool = width_attr, height_attr, pool
+        self.items = []
+        self.x = np.zeros(capacity); self.y = np.zeros(capacity)
+        self.w = np.zeros(capacity); self.h = np.zeros(capacity)
+
+    def __len__(self): return len(self.items)
+    def __iter__(self): return iter(self.items)
+    def __getitem__(self, i): return self.items[i]
+    def __bool__(self): return bool(self.items)
+
+    def _grow(self, needed):
+        capacity = len(self.x)
+        if needed <= capacity: return
+        capacity = max(needed, capacity * 2)
+        for name in ('x', 'y', 'w', 'h'):
+            old = getattr(self, name); grown = np.zeros(capacity); grown[:len(old)] = old; setattr(self, name, grown)
+
+    def append(self, item):
+        i = len(self.items); self._grow(i + 1); self.items.append(item)
+        self.x[i], self.y[i] = int(item.x), int(item.y)
+        self.w[i], self.h[i] = int(getattr(item, self.width_attr)), int(getattr(item, self.height_attr))
+
+    def extend(self, items):
+        for item in items: self.append(item)
+
+    def clear(self):
+        if self.pool is not None:
+            for item in self.items: self.pool.release(item)
+        self.items.clear()
+
+    def sync(self):
+        """Refreshes the y column after the entities have moved (x, w and h never change)."""
+        n = len(self.items)
+        if n: self.y[:n] = np.fromiter((item.y for item in self.items), float, n).astype(np.int64)
+
+    def keep(self, mask):
+        """Drops every row where mask is False by swap-remove (the order of the rest may change)."""
+        if mask.all(): return
+        items, pool, x, y, w, h = self.items, self.pool, self.x, self.y, self.w, self.h
+        last = len(items) - 1
+        # Highest index first, so the row moved into a hole is always one being kept
+        for i in reversed(np.flatnonzero(~mask).tolist()):
+            if pool is not None: pool.release(items[i])
+            if i != last:
+                items[i] = items[last]; x[i], y[i], w[i], h[i] = x[last], y[last], w[last], h[last]
+            items.pop(); last -= 1
+
+    def remove_off_screen(self, height):
+        """Removes entities whose off_screen() is true; only asks them once one is near 'height'."""
+        n = len(self.items)
+        if n and self.y[:n].max() >= height:
+            self.keep(np.fromiter((not item.off_screen() for item in self.items), bool, n))
+
+    def discard(self, items):
+        """Removes specific entities (e.g. an obstacle eaten by the shield)."""
+        gone = set(map(id, items))
+        self.keep(np.fromiter((id(item) not in gone for item in self.items), bool, len(self.items)))
+
+    def query(self, rect):
+        """Returns indices (in list order) of the entities whose bounds overlap rect."""
+        n = len(self.items)
+        if n == 0 or rect.width <= 0 or rect.height <= 0: return []
+        y = self.y[:n]
+        # Sorted sweep on y: the array is almost sorted (newest at the top), so
+        # a stable sort runs in near-linear time and searchsorted prunes rows.
+        order = np.argsort(y, kind='stable'); ys = y[order]
+        max_h = self.h[:n].max()
+        lo = np.searchsorted(ys, rect.top - max_h, side='right')
+        hi = np.searchsorted(ys, rect.bottom, side='left')
+        if lo >= hi: return []
+        cand = order[lo:hi]
+        x, w, h = self.x[cand], self.w[cand], self.h[cand]
+        hit = ((x < rect.right) & (rect.left < x + w) & (ys[lo:hi] < rect.bottom) & (rect.top < ys[lo:hi] + h)
+               & (w > 0) & (h > 0))
+        return np.sort(cand[hit]).tolist()
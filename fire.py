@@ -0,0 +1,44 @@
+import numpy as np
+
+
+def _smoothstep(t): return t * t * (3 - 2 * t)
+
+
+def _value_noise(rng, width, period, cell_x, cell_t):
+    """
+    One octave of 2D value noise over [0, width) x [0, period), wrapping in
+    time so the field loops seamlessly. Values are in [-1, 1].
+    """
+    cols, rows = width // cell_x + 2, period // cell_t
+    lattice = rng.uniform(-1, 1, (rows, cols))
+    xs = np.arange(width) / cell_x; ts = np.arange(period) / cell_t
+    x0 = xs.astype(np.int32); fx = _smoothstep(xs - x0)
+    t0 = ts.astype(np.int32); ft = _smoothstep(ts - t0)[:, None]
+    t1 = (t0 + 1) % rows
+    top = lattice[t0][:, x0] * (1 - fx) + lattice[t0][:, x0 + 1] * fx
+    bottom = lattice[t1][:, x0] * (1 - fx) + lattice[t1][:, x0 + 1] * fx
+    return top * (1 - ft) + bottom * ft
+
+
+class FireNoiseField:
+    """
+    Fire flicker noise baked once into a (period, width) table. Replaces the
+    per-segment PerlinNoise objects: sample_many() is one table lookup for a
+    batch of x positions (pixels) at a time (frames), and the table loops
+    every 'period' frames.
+    Scaled to roughly the same range as PerlinNoise(octaves=2).
+    """
+    def __init__(self, width, period=240, octaves=2, amplitude=0.55, seed=None):
+        rng = np.random.default_rng(seed)
+        self.width, self.period = width, period
+        field = np.zeros((period, width))
+        # Base octave: ~20px features, ~1s in time (matches the old 0.05/px, 0.001/ms scales)
+        cell_x, cell_t, weight, total = 20, 60, 1.0, 0.0
+        for _ in range(octaves):
+            field += _value_noise(rng, width, period, cell_x, cell_t) * weight; total += weight
+            cell_x, cell_t, weight = max(1, cell_x // 2), max(1, cell_t // 2), weight / 2
+        self.field = (field * (amplitude / total)).astype(np.float32)
+
+    def sample_many(self, xs, t):
+        """Noise at every x in 'xs'; 't' is one frame or an array of frames, one per x."""
+        return self.field[np.asarray(t, np.int32) % self.period, np.asarray(xs, np.int32) % self.width]
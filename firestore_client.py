@@ -0,0 +1,16 @@
+# Firestore access for the background workers (score submission, telemetry
+# upload, leaderboard sync).
+
+
+def client_getter(client):
+    """
+    Returns a zero-argument callable giving the Firestore client to use.
+
+    'client' is a Firestore client or such a callable already, e.g. the
+    game's firebase.wait, which blocks until Firebase has loaded and then
+    returns the client or None if it failed. A worker that gets None treats
+    Firebase as unavailable. Tests pass an in-memory fake
+    (tests/fake_firestore.py); the real client also works against the
+    Firestore emulator (FIRESTORE_EMULATOR_HOST).
+    """
+    return client if callable(client) else (lambda: client)
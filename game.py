@@ -1,16 +1,36 @@
+from bootstrap import StartupTimer, BackgroundTask
+startup_timer = StartupTimer()
 import pygame
+import atexit
 import random
 import sys
 import math
-from perlin_noise import PerlinNoise
-import datetime # NEW: For timestamp
-import firebase_admin
-from firebase_admin import credentials, firestore
+import os
+import json
+import time
+import numpy as np
+startup_timer.mark("import pygame")
+from particles import ParticleSystem
+from sprites import SpriteCache, quantize
+from fire import FireNoiseField
+from starfield import Starfield
+from presentation import Presenter, to_display_format, set_display_format
+from text_cache import GlyphAtlas, render_text
+from score_outbox import ScoreOutbox, ScoreSubmitter
+from profiler import FrameProfiler
+from pools import GCController
+from timestep import FixedTimestep, FramePacer
+from quality import QualityController
+from replay import ReplayRecorder
+from telemetry import Telemetry, GameTelemetry, firestore_uploader
+from leaderboard import Leaderboard, LeaderboardSync
+from simulation import (DESIGN_WIDTH, DESIGN_HEIGHT, FPS, ASTEROID_VARIANTS, INPUT_LEFT, INPUT_RIGHT,
+                        INPUT_BOARD_LEFT, INPUT_BOARD_RIGHT, INPUT_BOARD_LEVEL_SHIFT, questions, GameState, step, daily_seed)
+startup_timer.mark("import game modules")
 
 # --- WII BOARD INTEGRATION START ---
-# Make sure you have installed evdev: sudo apt install python3-evdev
-# import threading  # <-- DISABLED FOR TESTING
-# from evdev import InputDevice, categorize, ecodes, list_devices # <-- DISABLED FOR TESTING
+from balance_board import (BalanceBoard, CalibrationStore, Calibrator, EvdevSource, ReplaySource, EventRecorder,
+                           find_balance_board)
 # --- WII BOARD INTEGRATION END ---
 
 
@@ -19,44 +39,57 @@ from firebase_admin import credentials, firestore
 # with the actual path to the JSON file you downloaded and secured.
 SERVICE_ACCOUNT_KEY_PATH = "path/to/your/serviceAccountKey.json"
 
-# Global Firestore client variable
-db = None
-
-try:
-    # Initialize Firebase Admin SDK
-    # Ensure this runs only once
-    if not firebase_admin._apps:
-        cred = credentials.Certificate(SERVICE_ACCOUNT_KEY_PATH)
-        firebase_admin.initialize_app(cred)
-    db = firestore.client()
-    print("Firebase initialized successfully.")
-except Exception as e:
-    print(f"!! FIREBASE ERROR: Could not initialize Firebase. Check path and keys. Error: {e}")
-    # db remains None if initialization fails
+def init_firebase():
+    """
+    Imports and initializes the Firebase Admin SDK and returns a Firestore
+    client, or None if that fails. Runs on a background thread (see startup()).
+    """
+    try:
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+        # Initialize Firebase Admin SDK
+        # Ensure this runs only once
+        if not firebase_admin._apps:
+            cred = credentials.Certificate(SERVICE_ACCOUNT_KEY_PATH)
+            firebase_admin.initialize_app(cred)
+        db = firestore.client()
+        print("Firebase initialized successfully.")
+        return db
+    except Exception as e:
+        print(f"!! FIREBASE ERROR: Could not initialize Firebase. Check path and keys. Error: {e}")
+        return None
+
+# Global Firestore client, loaded in the background; firebase.get() is None until ready,
+# firebase.wait() blocks until it has loaded (for the background workers only)
+firebase = BackgroundTask("firebase", init_firebase, timer=startup_timer)
 # --- FIREBASE INTEGRATION END ---
 
 
-# Initialize Pygame
-pygame.init()
-pygame.mixer.init()
+def load_audio():
+    """Loads the sounds (the mixer is already up, see init_audio()). Returns the death sound (or None)."""
+    try:
+        dead_sound = pygame.mixer.Sound("dead.wav")
+        pygame.mixer.music.load("music loop.wav")
+        print("Sounds loaded successfully")
+        return dead_sound
+    except (pygame.error, FileNotFoundError) as e:
+        print(f"Sound files not found: {e}")
+        return None
+
+audio = BackgroundTask("audio", load_audio, timer=startup_timer)
 
-# Load sounds
-try:
-    dead_sound = pygame.mixer.Sound("dead.wav")
-    pygame.mixer.music.load("music loop.wav")
-    print("Sounds loaded successfully")
-except pygame.error as e:
-    print(f"Sound files not found: {e}")
-    dead_sound = None
+def init_audio():
+    """
+    Starts the mixer on the main thread, after the display (SDL subsystem init
+    isn't thread-safe), and loads the sounds in the background.
+    """
+    try: pygame.mixer.init()
+    except pygame.error as e:
+        print(f"Audio unavailable: {e}"); return
+    audio.start()
 
 # --- Constants ---
-# NEW: Renamed to reflect the "design" resolution
-DESIGN_WIDTH = 800
-DESIGN_HEIGHT = 600
-FPS = 60
-PLAYER_SPEED = 5
-OBSTACLE_SPEED = 3
-POWERUP_SPEED = 3
+# Gameplay constants (DESIGN_WIDTH/HEIGHT, FPS, speeds) live in simulation.py
 NEON_BLUE = (0, 255, 255)
 NEON_PINK = (255, 0, 255)
 NEON_GREEN = (0, 255, 0)
@@ -67,189 +100,312 @@ RED = (255, 0, 0)
 GOLD = (255, 215, 0)
 PURPLE = (180, 0, 255)
 GREY = (150, 150, 150)
-
-# --- NEW: Fullscreen and Scaling Setup ---
-# Get the native resolution of the monitor
-try:
-    info = pygame.display.Info()
-    FINAL_SCREEN_WIDTH = info.current_w
-    FINAL_SCREEN_HEIGHT = info.current_h
-except pygame.error:
-    # Fallback if display info is not available (e.g., no display server)
-    print("Could not get display info. Defaulting to 1920x1080.")
-    FINAL_SCREEN_WIDTH = 1920
-    FINAL_SCREEN_HEIGHT = 1080
-
-
-# Set up the *final* display in FULLSCREEN
-display_surface = pygame.display.set_mode((FINAL_SCREEN_WIDTH, FINAL_SCREEN_HEIGHT), pygame.FULLSCREEN)
-
-# Create the "virtual" screen (a Surface) that the game will draw on
-# All existing game logic is based on this 800x600 size
-screen = pygame.Surface((DESIGN_WIDTH, DESIGN_HEIGHT))
-
-pygame.display.set_caption("Neon Runner")
+# How the 800x600 canvas is scaled to the display: 'auto', 'integer', 'smooth' or 'sdl2'
+SCALER = 'auto'
+
+# Set by startup(): the display presenter, the 800x600 virtual 'screen' every
+# draw call targets, the fonts and the text caches built from them.
+presenter = screen = None
+base_scaler = None  # the presenter's scaler before quality changes
+font = big_font = small_font = None
+text_cache = SpriteCache(max_entries=256)  # rendered strings, see cached_text()
+score_digits = None
 clock = pygame.time.Clock()
 
-# NEW: Calculate scaling factors to fit 800x600 into the final resolution
-# This preserves the aspect ratio (letterboxing)
-scale_ratio = min(FINAL_SCREEN_WIDTH / DESIGN_WIDTH, FINAL_SCREEN_HEIGHT / DESIGN_HEIGHT)
-scaled_width = int(DESIGN_WIDTH * scale_ratio)
-scaled_height = int(DESIGN_HEIGHT * scale_ratio)
-
-# Calculate the top-left position to blit the scaled surface so it's centered
-blit_x = (FINAL_SCREEN_WIDTH - scaled_width) // 2
-blit_y = (FINAL_SCREEN_HEIGHT - scaled_height) // 2
-# --- End of Scaling Setup ---
+# --- Frame pacing ---
+# The simulation always steps at FPS; rendering runs at the display's pace and
+# interpolates between steps. GAME_PACING=fixed|uncapped|vsync|low-latency
+# (see timestep.py); GAME_REFRESH_HZ overrides the detected refresh rate.
+pacer = FramePacer(os.environ.get("GAME_PACING", "fixed"), FPS, refresh_rate=float(os.environ.get("GAME_REFRESH_HZ", 0)) or None)
+timestep = FixedTimestep(FPS)
+
+# --- Frame profiler ---
+# F3 toggles the timing overlay (and starts recording), F4 dumps the last
+# minute of frames to CSV. GAME_PROFILE=1 records from startup.
+profiler = FrameProfiler(capacity=FPS * 60, enabled=os.environ.get("GAME_PROFILE") == "1")
+
+# --- Garbage collection ---
+# GAME_GC=default|tuned|manual, see pools.py. Startup objects are frozen once
+# main() starts; 'manual' only collects between games.
+gc_controller = GCController(os.environ.get("GAME_GC", "tuned"))
+
+# --- Adaptive quality ---
+# GAME_QUALITY=auto lowers detail while frames run over budget and restores it
+# when there is headroom again (see quality.py); a level number pins it (0 = high).
+GAME_QUALITY = os.environ.get("GAME_QUALITY", "auto")
+QUALITY_BUDGET = 0.85  # share of the frame period a frame's work may take
+quality = QualityController(level=0 if GAME_QUALITY == "auto" else int(GAME_QUALITY), adaptive=GAME_QUALITY == "auto")
+
+def overlay_info(state):
+    """Overlay lines: frame pacing, entity pool usage, particle buffers, collector pauses, quality, caches and scaling cost."""
+    s = pacer.stats()
+    lines = [f"pacing {s['mode']} {s['refresh_hz']:.0f}Hz latency {s['latency_ms']:.1f} ms",
+             f"steps {timestep.steps} dropped {timestep.dropped_s:.2f}s"]
+    for name, pool in (("obst pool", state.obstacle_pool), ("pup pool", state.powerup_pool)):
+        s = pool.stats(); lines.append(f"{name:<10}{s['free']:4d} free {s['created']:4d} new {s['reused']:6d} reused")
+    for name, system in (("fx", player_particles), ("obst fx", obstacle_particles)):
+        s = system.stats(); lines.append(f"{name:<10}{s['count']:6d}/{s['capacity']}")
+    s = gc_controller.stats()
+    lines.append(f"gc {s['mode']:<7}{s['collections']:4d} runs max {s['max_pause_ms']:.1f} ms")
+    s = telemetry.stats()
+    lines.append(f"telemetry {s['buffered']:4d} buffered {s['written']:6d} written {s['dropped']} dropped")
+    s = quality.stats()
+    lines.append(f"quality {s['name']} ({'auto' if s['adaptive'] else 'fixed'}) {s['changes']} changes")
+    for name, cache in (("sprites", sprite_cache), ("text", text_cache)):
+        s = cache.stats(); lines.append(f"{name:<10}{s['entries']:4d} cached {s['hit_rate']:6.1%} hits {s['misses']:5d} misses")
+    s = presenter.stats()
+    lines.append(f"scaler {s['scaler']:<8}scale {s['scale_ms']:.2f} ms flip {s['flip_ms']:.2f} ms")
+    return lines
+
+def handle_debug_key(event):
+    if event.key == pygame.K_F3: profiler.toggle()
+    elif event.key == pygame.K_F4:
+        path = time.strftime("profile-%Y%m%d-%H%M%S.csv")
+        print(f"Profiler: wrote {profiler.dump(path)} frames to {path}")
+
+
+def startup():
+    """
+    Brings up only what the first frame (the username screen) needs: the
+    display, the virtual screen and the fonts. Firebase and the sound files
+    load on background threads. Phase timings are logged after the first frame.
+    """
+    firebase.start()
+    with startup_timer.phase("display"): open_display()
+    with startup_timer.phase("mixer"): init_audio()
+    with startup_timer.phase("fonts"): load_fonts()
+
+def open_display(output_size=None, scaler=None, fullscreen=True):
+    """Opens the display (native resolution unless output_size is given) and the virtual screen."""
+    global presenter, screen, base_scaler
+    pygame.display.init()
+    # --- NEW: Fullscreen and Scaling Setup ---
+    # Get the native resolution of the monitor
+    if output_size is None:
+        try:
+            info = pygame.display.Info()
+            output_size = info.current_w, info.current_h
+        except pygame.error:
+            # Fallback if display info is not available (e.g., no display server)
+            print("Could not get display info. Defaulting to 1920x1080.")
+            output_size = 1920, 1080
+
+    # Set up the *final* display in FULLSCREEN. The presenter owns the display
+    # and scales the virtual screen onto it (letterboxed, aspect preserved).
+    if presenter is not None: presenter.close()
+    presenter = Presenter((DESIGN_WIDTH, DESIGN_HEIGHT), output_size, scaler=scaler or SCALER, fullscreen=fullscreen, caption="Neon Runner",
+                          clear_color=BLACK, vsync=pacer.vsync)
+    base_scaler = presenter.scaler
+    print(f"Presentation: {presenter.describe()} (requested '{presenter.requested}')")
+
+    # Create the "virtual" screen (a Surface) that the game will draw on
+    # All existing game logic is based on this 800x600 size
+    screen = to_display_format(pygame.Surface((DESIGN_WIDTH, DESIGN_HEIGHT)))
+    # The SDL2 renderer has no display surface: sprites are converted to the screen's format instead
+    set_display_format(screen if presenter.renderer is not None else None)
+    # --- End of Scaling Setup ---
+
+def load_fonts():
+    global font, big_font, small_font, score_digits
+    pygame.font.init()
+    # --- Load Custom Font ---
+    try:
+        font = pygame.font.Font("PressStart2P-Regular.ttf", 20)
+        big_font = pygame.font.Font("PressStart2P-Regular.ttf", 40)
+        small_font = pygame.font.Font("PressStart2P-Regular.ttf", 14)
+    except (pygame.error, FileNotFoundError):
+        print("Font file 'PressStart2P-Regular.ttf' not found! Falling back to default.")
+        font = pygame.font.SysFont("monospace", 30)
+        big_font = pygame.font.SysFont("monospace", 60)
+        small_font = pygame.font.SysFont("monospace", 18)
+    # Rendered text is cached by (font id, text, color), so drop anything rendered
+    # with earlier fonts; the score digits come from a glyph atlas so a changing
+    # score never rasterizes a new string.
+    text_cache.clear()
+    score_digits = GlyphAtlas(font, WHITE, "0123456789")
+
+def cached_text(text_font, text, color):
+    """The rendered surface for 'text', from the text cache (font.render only runs on a miss)."""
+    return text_cache.get((id(text_font), text, color), render_text, text_font, text, color)
 
 
 # --- NEW: Display Helper Function ---
 def update_display():
     """
     Takes the 800x600 'screen' surface, scales it up,
-    and blits it onto the *real* fullscreen display.
+    and puts it on the *real* fullscreen display (see presentation.py).
     """
-    # Fill the letterbox/pillarbox areas with black
-    display_surface.fill(BLACK)
-    
-    # Scale the 800x600 virtual screen to the new calculated size
-    # Using smoothscale for better quality than transform.scale
-    scaled_surface = pygame.transform.smoothscale(screen, (scaled_width, scaled_height))
-    
-    # Blit the scaled surface onto the center of the real display
-    display_surface.blit(scaled_surface, (blit_x, blit_y))
-    
-    # Update the real display
-    pygame.display.flip()
+    if profiler.overlay: profiler.draw_overlay(screen, small_font); profiler.mark("overlay")
+    presenter.present(screen)
+    profiler.mark("scale", at=presenter.scaled_at); profiler.mark("flip")
+    startup_timer.first_frame()
 # -----------------------------------
 
 
-# --- Load Custom Font ---
-try:
-    font = pygame.font.Font("PressStart2P-Regular.ttf", 20)
-    big_font = pygame.font.Font("PressStart2P-Regular.ttf", 40)
-    small_font = pygame.font.Font("PressStart2P-Regular.ttf", 14)
-except pygame.error:
-    print("Font file 'PressStart2P-Regular.ttf' not found! Falling back to default.")
-    font = pygame.font.SysFont("monospace", 30)
-    big_font = pygame.font.SysFont("monospace", 60)
-    small_font = pygame.font.SysFont("monospace", 18)
-
-# Cybersecurity questions
-questions = [
-    {"question": "What does 'phishing' mean?", "options": ["A scam to steal personal info", "A type of fish", "A network protocol"], "correct": 0},
-    {"question": "What is a firewall?", "options": ["Blocks unauthorized access", "A wall that prevents fires", "A type of computer virus"], "correct": 0},
-    {"question": "What is a 'VPN' used for?", "options": ["Encrypting your connection", "A type of virus scan", "To speed up your PC"], "correct": 0},
-]
-
 # --- WII BOARD INTEGRATION START ---
-
-# --- Global Variables for Board Input ---
-# This dictionary will hold the raw weight values from the 4 sensors
-weights = {
-    'TR': 0, # Top-Right
-    'TL': 0, # Top-Left
-    'BR': 0, # Bottom-Right
-    'BL': 0  # Bottom-Left
-}
-# This will be updated by the thread: 0 = stop, -1 = left, 1 = right
-player_direction = 0
-TILT_THRESHOLD = 2000 # We will need to tune this!
-
-def find_balance_board():
-    """Finds the Wii Balance Board from the list of input devices."""
-    # --- DISABLED FOR TESTING ---
-    return None
-    # devices = [InputDevice(path) for path in list_devices()]
-    # for device in devices:
-    #     # This is the exact name your board reported
-    #     if device.name == "Nintendo Wii Remote Balance Board":
-    #         print(f"Found Balance Board: {device.path}")
-    #         return device
-    # return None
-
-def balance_board_reader(device):
-    """
-    This function runs in a separate thread to constantly read
-    data from the balance board.
-    """
-    # --- ENTIRE FUNCTION BODY DISABLED FOR TESTING ---
-    pass
-    # global player_direction, weights
-    # try:
-    #     # Get exclusive access to the device
-    #     device.grab()
-    #     print("Balance Board thread started. Step on the board!")
-    #     for event in device.read_loop():
-    #         if event.type == ecodes.EV_ABS:
-    #             # This is the exact sensor map we found for your board
-    #             if event.code == ecodes.ABS_HAT0X:      # Top-Right (TR)
-    #                 weights['TR'] = event.value
-    #             elif event.code == ecodes.ABS_HAT1X:    # Top-Left (TL)
-    #                 weights['TL'] = event.value
-    #             elif event.code == ecodes.ABS_HAT0Y:    # Bottom-Right (BR)
-    #                 weights['BR'] = event.value
-    #             elif event.code == ecodes.ABS_HAT1Y:    # Bottom-Left (BL)
-    #                 weights['BL'] = event.value
-    #             
-    #             # --- Calculate Tilt ---
-    #             left_total = weights['TL'] + weights['BL']
-    #             right_total = weights['TR'] + weights['BR']
-    #             total_weight = left_total + right_total
-
-    #             # Only register tilt if there is significant weight on the board
-    #             if total_weight > 1000: # Adjust if needed
-    #                 if left_total > right_total + TILT_THRESHOLD:
-    #                     player_direction = -1 # Go Left
-    #                 elif right_total > left_total + TILT_THRESHOLD:
-    #                     player_direction = 1  # Go Right
-    #                 else:
-    #                     player_direction = 0  # Stop
-    #             else:
-    #                 player_direction = 0 # No one on the board
-    #             
-    # except Exception as e:
-    #     print(f"Error reading from balance board: {e}")
-    #     print("Please ensure you are running this script with 'sudo'")
-    #     player_direction = 0 # Failsafe
-    # finally:
-    #     if 'device' in locals() and device:
-    #         device.ungrab()
+# The board reader lives in balance_board.py: samples go through a ring buffer
+# and the game polls a smoothed, per-rider calibrated lean once per frame.
+# BOARD_REPLAY=<file> plays a recorded event stream as if it were the board,
+# BOARD_RECORD=<file> records the live board's events.
+BOARD_CALIBRATION_PATH = "board_calibration.json"
+BOARD_MIN_LEAN = 0.1  # smoothed lean below this doesn't move the ship
+CALIBRATION_STAGE_SECONDS = 2.5
+board = None  # opened in main()
+calibrations = CalibrationStore(BOARD_CALIBRATION_PATH)
+
+def open_balance_board():
+    replay_path = os.environ.get("BOARD_REPLAY")
+    if replay_path: return BalanceBoard(ReplaySource.from_file(replay_path)).start()
+    device = find_balance_board()
+    if device is None: return None
+    record_path = os.environ.get("BOARD_RECORD")
+    return BalanceBoard(EvdevSource(device), recorder=EventRecorder(record_path) if record_path else None).start()
+
+def board_buttons(lean):
+    """Maps the analog lean to the INPUT_BOARD_* bits plus a strength level (see simulation.py)."""
+    strength = abs(lean)
+    if strength < BOARD_MIN_LEAN: return 0
+    level = int(strength * 4) + 1 if strength < 0.75 else 0
+    return (INPUT_BOARD_LEFT if lean < 0 else INPUT_BOARD_RIGHT) | (level << INPUT_BOARD_LEVEL_SHIFT)
+
+def calibrate_board(rider):
+    """Modal screen: stand still, lean left, lean right. Stores and applies the rider's calibration."""
+    calibrator = Calibrator()
+    prompts = {"center": "STAND STILL", "left": "LEAN LEFT", "right": "LEAN RIGHT"}
+    for stage in Calibrator.STAGES:
+        board.drain_samples(); stage_end = time.monotonic() + CALIBRATION_STAGE_SECONDS
+        while time.monotonic() < stage_end:
+            profiler.begin("calibration")
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT: pygame.quit(); sys.exit()
+                if event.type == pygame.KEYDOWN: handle_debug_key(event)
+            calibrator.add(stage, board.drain_samples())
+            update_and_draw_starfield(screen)
+            title = cached_text(font, f"CALIBRATING {rider}", NEON_BLUE); screen.blit(title, (DESIGN_WIDTH//2 - title.get_width()//2, 200))
+            prompt = cached_text(big_font, prompts[stage], NEON_GREEN); screen.blit(prompt, (DESIGN_WIDTH//2 - prompt.get_width()//2, 260))
+            profiler.mark("draw")
+            update_display()
+            clock.tick(FPS)
+            profiler.mark("wait"); profiler.end()
+    calibration = calibrator.result()
+    if calibration is None:
+        print("Calibration failed (no weight on the board or no clear lean); using the defaults.")
+        return
+    calibrations.put(rider, calibration); board.calibration = calibration
+
+def select_rider():
+    """Asks for the player's name and applies (or runs) their board calibration."""
+    rider = get_player_id()
+    if board is not None:
+        calibration = calibrations.get(rider)
+        if calibration is not None: board.calibration = calibration
+        else: calibrate_board(rider)
+    return rider
 # --- WII BOARD INTEGRATION END ---
 
 
-class Particle:
-    def __init__(self, x, y, color, size, life, angle, speed):
-        self.x, self.y, self.color, self.size, self.life, self.angle, self.speed = x, y, color, size, life, angle, speed
-    def update(self):
-        self.life -= 1; self.size = max(0, self.size - 0.1)
-        self.x += math.cos(self.angle) * self.speed; self.y += math.sin(self.angle) * self.speed
-    def draw(self, surface):
-        if self.life > 0: pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), int(self.size))
-
-def create_explosion(particles_list, x, y):
-    for _ in range(60):
-        angle, speed = random.uniform(0, 2 * math.pi), random.uniform(1, 7)
-        size, life = random.uniform(1, 5), random.randint(30, 60)
-        color = random.choice([NEON_BLUE, ORANGE, WHITE])
-        particles_list.append(Particle(x, y, color, size, life, angle, speed))
-
-# NEW: Using DESIGN_WIDTH/HEIGHT for object positions
-stars = [{"x": random.randint(0, DESIGN_WIDTH), "y": random.randint(0, DESIGN_HEIGHT), "speed": random.uniform(0.5, 2)} for _ in range(150)]
-def update_and_draw_starfield(surface):
-    surface.fill(BLACK)
-    for star in stars:
-        star["y"] += star["speed"]
-        # NEW: Check against DESIGN_HEIGHT
-        if star["y"] > DESIGN_HEIGHT: star["y"], star["x"] = 0, random.randint(0, DESIGN_WIDTH)
-        brightness = int(100 + star["speed"] * 75); color = (brightness, brightness, brightness)
-        pygame.draw.circle(surface, color, (star["x"], star["y"]), int(star["speed"]))
+# Particles are purely cosmetic, so they live on the rendering side (NumPy-backed,
+# see particles.py): one system for the player's exhaust and one shared by the
+# obstacle emitters (scout trails, fire walls). The simulation never sees them.
+player_particles = ParticleSystem(capacity=64)
+obstacle_particles = ParticleSystem()
+# Fire wall flicker noise, baked once and indexed by (x, frame), see fire.py
+fire_noise = FireNoiseField(DESIGN_WIDTH)
+FIRE_COLORS = np.array([obstacle_particles.color_index(c) for c in (RED, ORANGE, GOLD)], np.int16)  # palette indices
+
+def apply_quality(*systems):
+    """Applies the current quality level to the particle systems (the global ones plus 'systems'), stars and scaler."""
+    global star_layers, fire_wall_particles
+    settings = quality.settings
+    for system in (player_particles, obstacle_particles, *systems): system.max_particles = settings["max_particles"]
+    star_layers, fire_wall_particles = settings["star_layers"], settings["fire_wall_particles"]
+    # Only a smoothscale presenter is swapped (the SDL2 path is fixed, integer is already the cheapest)
+    if presenter is not None and base_scaler == 'smooth':
+        scaler = settings["scaler"] or base_scaler
+        if presenter.effective_scaler(scaler) != presenter.scaler: presenter.set_scaler(scaler)
+
+def create_explosion(particles, x, y):
+    particles.burst(x, y, 60, (NEON_BLUE, ORANGE, WHITE), size=(1, 5), life=(30, 60), angle=(0, 2 * math.pi), speed=(1, 7))
+
+# Parallax layers pre-rendered once (see starfield.py), so GAME_STARS (stars per
+# screen) can go into the thousands at about the same cost.
+starfield = Starfield(DESIGN_WIDTH, DESIGN_HEIGHT, count=int(os.environ.get("GAME_STARS", 150)), background=BLACK)
+star_layers = starfield.layers  # layers drawn at the current quality level
+fire_wall_particles = 3  # particles per fire wall segment per step
+def update_starfield(steps=1): starfield.update(steps)
+
+def draw_starfield(surface): starfield.draw(surface, star_layers)
+
+def update_and_draw_starfield(surface): update_starfield(); draw_starfield(surface)
+
+# --- Idle Rendering ---
+# The username, quiz and game-over screens wait for input with nothing but the
+# starfield moving, so they don't need to redraw at 60 fps.
+IDLE_FPS = 20  # starfield animation rate while a modal screen waits for input (0 = still)
+IDLE_BAKE_SECONDS = 0.01  # asteroid baking slice between input checks while a screen is idle
+
+def centered_text(text_font, text, color, y):
+    surface = cached_text(text_font, text, color)
+    return surface, (DESIGN_WIDTH//2 - surface.get_width()//2, y)
+
+class IdleScreen:
+    """
+    Redraw policy for a screen that waits for the player. events() blocks in
+    pygame.event.wait until input arrives or the next animation tick is due,
+    so an idle kiosk sleeps instead of spinning. The text is composed once
+    into a cached layer (set_layer) and present() only redraws and flips
+    when the layer changed, a key was pressed or the starfield ticked (the
+    stars move as far per tick as they would at FPS).
+    """
+    def __init__(self, mode, fps=IDLE_FPS):
+        self.mode, self.period = mode, 1 / fps if fps else None
+        self.layer, self.layer_key, self.dirty = None, None, True
+        self.frames = 0
+        self._last_tick = self._next_tick = time.monotonic()
+
+    def events(self):
+        """Waits for input or the next tick (baking asteroids until they're done); handles quitting and the debug keys."""
+        if self.dirty or not bake_asteroids(IDLE_BAKE_SECONDS): events = pygame.event.get()
+        else:
+            # event.wait() without a timeout sleeps until there is input
+            timeout = max(1, int((self._next_tick - time.monotonic()) * 1000) + 1) if self.period else 0
+            event = pygame.event.wait(timeout) if timeout else pygame.event.wait()
+            events = [event] + pygame.event.get() if event.type != pygame.NOEVENT else []
+        for event in events:
+            if event.type == pygame.QUIT: pygame.quit(); sys.exit()
+            if event.type == pygame.KEYDOWN: handle_debug_key(event); self.dirty = True
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE): presenter.invalidate(); self.dirty = True
+        return events
+
+    def set_layer(self, key, build):
+        """Composes the (surface, pos) pairs returned by build() into one cached layer, when 'key' changes."""
+        if self.layer is not None and key == self.layer_key: return
+        items = build()
+        bounds = pygame.Rect(items[0][1], items[0][0].get_size()).unionall([pygame.Rect(pos, surface.get_size()) for surface, pos in items[1:]])
+        layer = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        for surface, (x, y) in items: layer.blit(surface, (x - bounds.x, y - bounds.y))
+        self.layer, self.layer_key, self.dirty = (to_display_format(layer, alpha=True), bounds.topleft), key, True
+
+    def present(self):
+        """Redraws and flips if anything changed or a tick is due; returns True if it did."""
+        now = time.monotonic()
+        if self.period and now >= self._next_tick:
+            update_starfield(min(FPS, round((now - self._last_tick) * FPS)))
+            self._last_tick, self._next_tick, self.dirty = now, now + self.period, True
+        if not self.dirty: return False
+        profiler.begin(self.mode)
+        draw_starfield(screen); screen.blit(*self.layer)
+        profiler.mark("draw")
+        update_display()
+        profiler.end()
+        self.dirty = False; self.frames += 1
+        return True
 
 def get_player_id():
     player_id_str, input_active, error_message = "", True, ""
+    idle = IdleScreen("name_entry")
     while input_active:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(); sys.exit()
+        for event in idle.events():
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_RETURN and len(player_id_str) > 0:
                     input_active = False
@@ -258,211 +414,328 @@ def get_player_id():
                 elif event.unicode.isalpha() and len(player_id_str) < 4:
                     player_id_str += event.unicode.upper() # Use uppercase for consistent usernames
                     error_message = ""
-        # NEW: Draw to the virtual 'screen'
-        update_and_draw_starfield(screen)
-        prompt_text = font.render("ENTER USERNAME (4 CHAR MAX):", True, NEON_BLUE); screen.blit(prompt_text, (DESIGN_WIDTH//2 - prompt_text.get_width()//2, 200))
-        id_text = font.render(player_id_str, True, NEON_GREEN); screen.blit(id_text, (DESIGN_WIDTH//2 - id_text.get_width()//2, 260))
-        if error_message:
-            error_text = small_font.render(error_message, True, NEON_PINK); screen.blit(error_text, (DESIGN_WIDTH//2 - error_text.get_width()//2, 300))
-        
-        # NEW: Use the display helper to scale and flip
-        update_display()
-        clock.tick(FPS)
+        # NEW: Draw to the virtual 'screen' (the text layer is only rebuilt when it changes)
+        def layer():
+            items = [centered_text(font, "ENTER USERNAME (4 CHAR MAX):", NEON_BLUE, 200), centered_text(font, player_id_str, NEON_GREEN, 260)]
+            if error_message: items.append(centered_text(small_font, error_message, NEON_PINK, 300))
+            return items
+        idle.set_layer((player_id_str, error_message), layer)
+        idle.present()
     return player_id_str
 
-# --- Game Object Classes ---
-class Player:
-    def __init__(self):
-        self.width, self.height = 35, 35
-        # NEW: Use DESIGN_WIDTH/HEIGHT for positioning
-        self.x, self.y = DESIGN_WIDTH // 2, DESIGN_HEIGHT - 100
-        self.speed = PLAYER_SPEED; self.trail_particles = []
-        self.has_shield = False; self.tilt, self.target_tilt = 0, 0
-    def move(self, direction):
-        if direction == "left": self.x -= self.speed; self.target_tilt = 20
-        elif direction == "right": self.x += self.speed; self.target_tilt = -20
-        # NEW: Use DESIGN_WIDTH for boundary check
-        self.x = max(self.width, min(DESIGN_WIDTH - self.width, self.x))
-    def update(self):
-        self.tilt += (self.target_tilt - self.tilt) * 0.1
-        if abs(self.tilt) < 0.1: self.tilt = 0
-        self.target_tilt = 0
-        exhaust_color = GOLD if self.has_shield else NEON_BLUE
-        self.trail_particles.append(Particle(self.x, self.y + 20, exhaust_color, random.uniform(2, 4), 20, math.pi / 2 + random.uniform(-0.2, 0.2), random.uniform(2, 4)))
-        [p.update() for p in self.trail_particles]; self.trail_particles = [p for p in self.trail_particles if p.life > 0]
-    def draw(self):
-        # All drawing commands already use 'screen' (which is now the virtual surface)
-        [p.draw(screen) for p in self.trail_particles]
-        ship_surface = pygame.Surface((50, 50), pygame.SRCALPHA); center = 25
-        body_points = [(center, center - 18), (center - 15, center + 15), (center + 15, center + 15)]
-        engine_points = [(center - 8, center + 12), (center + 8, center + 12), (center + 6, center + 18), (center - 6, center + 18)]
-        wing_points_l = [(center - 13, center + 13), (center - 22, center + 10), (center - 10, center + 2)]
-        wing_points_r = [(center + 13, center + 13), (center + 22, center + 10), (center + 10, center + 2)]
-        pygame.draw.polygon(ship_surface, (40, 40, 40), engine_points)
-        pygame.draw.polygon(ship_surface, NEON_BLUE, wing_points_l); pygame.draw.polygon(ship_surface, NEON_BLUE, wing_points_r)
-        pygame.draw.polygon(ship_surface, (80, 80, 255), body_points)
-        pygame.draw.polygon(ship_surface, WHITE, [(center, center - 12), (center - 3, center - 2), (center + 3, center - 2)])
-        rotated_surface = pygame.transform.rotate(ship_surface, self.tilt)
-        new_rect = rotated_surface.get_rect(center=(self.x, self.y + 10))
-        screen.blit(rotated_surface, new_rect.topleft)
-        if self.has_shield:
-            shield_surface = pygame.Surface((80, 80), pygame.SRCALPHA)
-            pygame.draw.circle(shield_surface, (*GOLD, 100), (40, 40), 38, 2)
-            pygame.draw.circle(shield_surface, (*GOLD, 50), (40, 40), 40)
-            screen.blit(shield_surface, (self.x - 40, self.y - 15))
-
-class Obstacle:
-    def __init__(self, game_time, obs_type=None, x_pos=None, y_pos=None, width=None, is_fire_wall=False):
-        self.is_fire_wall = is_fire_wall
-        self.type = obs_type if obs_type is not None else random.choice(['asteroid', 'drone', 'scout'])
-        self.size = random.randint(35, 60)
-        self.rotation_angle = random.randint(0, 360); self.rotation_speed = random.uniform(-2, 2)
-        self.anim_timer = random.randint(0, 120)
-        if self.type == 'asteroid': self.width, self.height = self.size, self.size; self.points = self._generate_asteroid_points()
-        elif self.type == 'drone': self.width, self.height = 45, 35
-        elif self.type == 'scout': self.width, self.height = 25, 35; self.trail_particles = []
-        elif self.type == 'fire_wall_segment': self.width, self.height = width, 25; self.fire_particles = []; self.noise = PerlinNoise(octaves=2, seed=random.randint(0, 10000))
-        # NEW: Use DESIGN_WIDTH for positioning
-        self.x = x_pos if x_pos is not None else random.randint(0, DESIGN_WIDTH - self.width)
-        self.y = y_pos if y_pos is not None else -self.height
-        self.speed = 4 if self.is_fire_wall else OBSTACLE_SPEED + (game_time // 1000) * 0.5
-    def _generate_asteroid_points(self):
-        points = []; num_vertices = random.randint(7, 12)
+# --- Sprite Cache ---
+# Ship, shield and powerup sprites are rendered once and their rotations are
+# stored quantized, so the draw path only blits cached surfaces.
+sprite_cache = SpriteCache(max_entries=256)
+TILT_STEP = 1   # degrees between cached ship rotations
+SPIN_STEP = 5   # degrees between cached powerup rotations (powerups spin 5/frame)
+
+def _render_ship():
+    ship_surface = pygame.Surface((50, 50), pygame.SRCALPHA); center = 25
+    body_points = [(center, center - 18), (center - 15, center + 15), (center + 15, center + 15)]
+    engine_points = [(center - 8, center + 12), (center + 8, center + 12), (center + 6, center + 18), (center - 6, center + 18)]
+    wing_points_l = [(center - 13, center + 13), (center - 22, center + 10), (center - 10, center + 2)]
+    wing_points_r = [(center + 13, center + 13), (center + 22, center + 10), (center + 10, center + 2)]
+    pygame.draw.polygon(ship_surface, (40, 40, 40), engine_points)
+    pygame.draw.polygon(ship_surface, NEON_BLUE, wing_points_l); pygame.draw.polygon(ship_surface, NEON_BLUE, wing_points_r)
+    pygame.draw.polygon(ship_surface, (80, 80, 255), body_points)
+    pygame.draw.polygon(ship_surface, WHITE, [(center, center - 12), (center - 3, center - 2), (center + 3, center - 2)])
+    return to_display_format(ship_surface, alpha=True)
+
+def _render_rotated_ship(tilt):
+    return to_display_format(pygame.transform.rotate(sprite_cache.get(('ship',), _render_ship), tilt), alpha=True)
+
+def _render_shield():
+    shield_surface = pygame.Surface((80, 80), pygame.SRCALPHA)
+    pygame.draw.circle(shield_surface, (*GOLD, 100), (40, 40), 38, 2)
+    pygame.draw.circle(shield_surface, (*GOLD, 50), (40, 40), 40)
+    return to_display_format(shield_surface, alpha=True)
+
+def _render_powerup_glow(size, glow_radius):
+    glow_surface = pygame.Surface((size + 20, size + 20), pygame.SRCALPHA)
+    pygame.draw.circle(glow_surface, (*NEON_GREEN, 50), (glow_surface.get_width()//2, glow_surface.get_height()//2), size//2 + glow_radius)
+    return to_display_format(glow_surface, alpha=True)
+
+def _render_powerup_cross(size):
+    cross_surf = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.rect(cross_surf, NEON_GREEN, (0, size//2 - 2, size, 4)); pygame.draw.rect(cross_surf, NEON_GREEN, (size//2 - 2, 0, 4, size))
+    return to_display_format(cross_surf, alpha=True)
+
+def _render_rotated_cross(size, angle):
+    return to_display_format(pygame.transform.rotate(sprite_cache.get(('cross', size), _render_powerup_cross, size), angle), alpha=True)
+
+# Asteroids share a small library of shapes per size class. All rotations of
+# every (class, variant) shape are baked before play, a slice at a time while
+# the idle screens wait for input (see bake_asteroids()), so drawing an
+# asteroid is a single blit and never rasterizes mid-game.
+ASTEROID_SIZE_STEP = 5  # sizes are drawn with the nearest class's shape (35, 40, ... 60)
+ASTEROID_CLASSES = range(35, 61, ASTEROID_SIZE_STEP)
+ASTEROID_ROTATION_STEP = 6  # degrees between cached asteroid frames
+ASTEROID_ANGLES = 360 // ASTEROID_ROTATION_STEP
+# One entry per (size class, variant), each the list of its rotated frames; sized to never evict
+asteroid_cache = SpriteCache(max_entries=len(ASTEROID_CLASSES) * ASTEROID_VARIANTS)
+_asteroid_shapes = {}
+_asteroid_partial = {}  # (size class, variant) -> its frames baked so far, until the set is complete
+
+def get_asteroid_shape(size, variant):
+    """Returns the (x, y) vertex offsets for an asteroid shape, generating them once."""
+    points = _asteroid_shapes.get((size, variant))
+    if points is None:
+        rng = random.Random(size * ASTEROID_VARIANTS + variant)
+        points = []; num_vertices = rng.randint(7, 12)
         for i in range(num_vertices):
-            angle = (i / num_vertices) * 2 * math.pi; dist = self.size / 2 * random.uniform(0.8, 1.2)
+            angle = (i / num_vertices) * 2 * math.pi; dist = size / 2 * rng.uniform(0.8, 1.2)
             points.append((dist * math.cos(angle), dist * math.sin(angle)))
-        return points
-    def update(self):
-        self.y += self.speed; self.rotation_angle = (self.rotation_angle + self.rotation_speed) % 360; self.anim_timer += 1
-        if self.type == 'scout':
-            self.trail_particles.append(Particle(self.x + self.width/2, self.y, ORANGE, 2, 15, -math.pi/2, 2))
-            [p.update() for p in self.trail_particles]; self.trail_particles = [p for p in self.trail_particles if p.life > 0]
-        if self.type == 'fire_wall_segment':
-            for _ in range(3):
-                px = self.x + random.uniform(0, self.width); py = self.y + self.height
-                noise_val = self.noise([px * 0.05, pygame.time.get_ticks() * 0.001])
-                life, speed = 10 + int(abs(noise_val * 15)), 1 + abs(noise_val * 3)
-                size, color = 2 + abs(noise_val * 4), random.choice([RED, ORANGE, GOLD])
-                self.fire_particles.append(Particle(px, py, color, size, life, math.pi/2, speed))
-            [p.update() for p in self.fire_particles]; self.fire_particles = [p for p in self.fire_particles if p.life > 0]
-    def draw(self):
-        center_x, center_y = self.x + self.width / 2, self.y + self.height / 2
-        if self.type == 'asteroid':
-            rotated_points = [(center_x + px*math.cos(math.radians(self.rotation_angle)) - py*math.sin(math.radians(self.rotation_angle)), center_y + px*math.sin(math.radians(self.rotation_angle)) + py*math.cos(math.radians(self.rotation_angle))) for px, py in self.points]
-            pygame.draw.polygon(screen, (50, 50, 60), rotated_points); pygame.draw.polygon(screen, (180, 180, 220), rotated_points, 3)
-            pygame.draw.circle(screen, NEON_BLUE, (center_x, center_y), 4)
-        elif self.type == 'drone':
-            pincer_angle = 20 + math.sin(self.anim_timer * 0.05) * 8
-            pygame.draw.polygon(screen, (80,0,0), [(center_x, self.y), (self.x, self.y + self.height), (self.x+self.width, self.y + self.height)])
-            pygame.draw.line(screen, RED, (center_x, self.y), (self.x - pincer_angle, self.y + self.height/1.5), 4)
-            pygame.draw.line(screen, RED, (center_x, self.y), (self.x + self.width + pincer_angle, self.y + self.height/1.5), 4)
-            eye_size = 4 + math.sin(self.anim_timer * 0.1) * 2
-            pygame.draw.circle(screen, ORANGE, (center_x, self.y + 15), eye_size)
-        elif self.type == 'scout':
-            [p.draw(screen) for p in self.trail_particles]
-            points = [(center_x, self.y), (self.x, self.y + self.height), (self.x + self.width, self.y + self.height)]
-            pygame.draw.polygon(screen, PURPLE, points); pygame.draw.polygon(screen, NEON_PINK, points, 2)
-        elif self.type == 'fire_wall_segment':
-            [p.draw(screen) for p in self.fire_particles]
-            pygame.draw.rect(screen, (40,0,0), (self.x, self.y, self.width, self.height))
-    # NEW: Check against DESIGN_HEIGHT
-    def off_screen(self): return self.y > DESIGN_HEIGHT
-
-class Powerup:
-    def __init__(self):
+        _asteroid_shapes[(size, variant)] = points
+    return points
+
+def _render_asteroid(size, variant, angle):
+    half = int(size / 2 * 1.2) + 3
+    frame = pygame.Surface((half * 2, half * 2), pygame.SRCALPHA)
+    cos_a, sin_a = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+    rotated_points = [(half + px*cos_a - py*sin_a, half + px*sin_a + py*cos_a) for px, py in get_asteroid_shape(size, variant)]
+    pygame.draw.polygon(frame, (50, 50, 60), rotated_points); pygame.draw.polygon(frame, (180, 180, 220), rotated_points, 3)
+    pygame.draw.circle(frame, NEON_BLUE, (half, half), 4)
+    return to_display_format(frame, alpha=True)
+
+def _render_asteroid_frames(size, variant):
+    return [_render_asteroid(size, variant, i * ASTEROID_ROTATION_STEP) for i in range(ASTEROID_ANGLES)]
+
+def bake_asteroids(budget=None):
+    """
+    Bakes asteroid frames into asteroid_cache for up to 'budget' seconds
+    (None: until done), resuming where the last call stopped. Returns True
+    once every (class, variant) is cached. Needs the display to be open.
+    """
+    deadline = None if budget is None else time.perf_counter() + budget
+    for size in ASTEROID_CLASSES:
+        for variant in range(ASTEROID_VARIANTS):
+            key = (size, variant)
+            if key in asteroid_cache: continue
+            frames = _asteroid_partial.setdefault(key, [])
+            while len(frames) < ASTEROID_ANGLES:
+                if deadline is not None and time.perf_counter() >= deadline: return False
+                frames.append(_render_asteroid(size, variant, len(frames) * ASTEROID_ROTATION_STEP))
+            asteroid_cache.get(key, _asteroid_partial.pop, key)
+    return True
+
+# The drone's pincer and eye animation repeats every 2*pi/0.05 frames;
+# it is baked into DRONE_ANIM_FRAMES frames over that period.
+DRONE_ANIM_FRAMES = 64
+DRONE_ANIM_PERIOD = 2 * math.pi / 0.05
+DRONE_MARGIN = 30  # room for the pincers (up to 28px) outside the body
+
+def _render_drone(width, height, frame_index):
+    anim_timer = frame_index * DRONE_ANIM_PERIOD / DRONE_ANIM_FRAMES
+    frame = pygame.Surface((width + DRONE_MARGIN * 2, height + 4), pygame.SRCALPHA)
+    x, y = DRONE_MARGIN, 0; center_x = x + width / 2
+    pincer_angle = 20 + math.sin(anim_timer * 0.05) * 8
+    pygame.draw.polygon(frame, (80,0,0), [(center_x, y), (x, y + height), (x+width, y + height)])
+    pygame.draw.line(frame, RED, (center_x, y), (x - pincer_angle, y + height/1.5), 4)
+    pygame.draw.line(frame, RED, (center_x, y), (x + width + pincer_angle, y + height/1.5), 4)
+    eye_size = 4 + math.sin(anim_timer * 0.1) * 2
+    pygame.draw.circle(frame, ORANGE, (center_x, y + 15), eye_size)
+    return to_display_format(frame, alpha=True)
+
+# --- Rendering of the simulation objects (see simulation.py) ---
+def emit_particles(player, obstacles):
+    """Feeds the cosmetic particle emitters from the current simulation state."""
+    exhaust_color = GOLD if player.has_shield else NEON_BLUE
+    player_particles.emit(player.x, player.y + 20, exhaust_color, random.uniform(2, 4), 20, math.pi / 2 + random.uniform(-0.2, 0.2), random.uniform(2, 4))
+    player_particles.update()
+    walls = []
+    for obs in obstacles:
+        if obs.type == 'scout':
+            obstacle_particles.emit(obs.x + obs.width/2, obs.y, ORANGE, 2, 15, -math.pi/2, 2)
+        elif obs.type == 'fire_wall_segment':
+            walls.append((obs.x, obs.width, obs.y + obs.height, obs.anim_timer))
+    if walls:
+        # Every fire wall segment's particles in one batch: noise lookup and emission are array ops
+        x, width, y, t = np.repeat(np.array(walls, np.float32), fire_wall_particles, axis=0).T
+        rng = obstacle_particles.rng; n = len(x)
+        x += rng.uniform(0, 1, n) * width
+        noise = np.abs(fire_noise.sample_many(x, t))
+        obstacle_particles.emit_many(x, y, FIRE_COLORS[rng.integers(0, len(FIRE_COLORS), n)],
+                                     2 + noise * 4, 10 + (noise * 15).astype(np.int32), math.pi/2, 1 + noise * 3)
+    obstacle_particles.update()
+
+# 'alpha' is how far rendering is between the previous and the latest simulation
+# step (see timestep.py); positions are interpolated by it. 1.0 draws the latest.
+def draw_player(player, alpha=1.0):
+    # All drawing commands already use 'screen' (which is now the virtual surface)
+    player_particles.draw(screen)
+    x = player.prev_x + (player.x - player.prev_x) * alpha
+    tilt = quantize(player.tilt, TILT_STEP)
+    rotated_surface = sprite_cache.get(('ship', tilt), _render_rotated_ship, tilt)
+    screen.blit(rotated_surface, (x - rotated_surface.get_width()//2, player.y + 10 - rotated_surface.get_height()//2))
+    if player.has_shield:
+        screen.blit(sprite_cache.get(('shield',), _render_shield), (x - 40, player.y - 15))
+
+def draw_obstacle(obs, alpha=1.0):
+    y = obs.prev_y + (obs.y - obs.prev_y) * alpha
+    center_x, center_y = obs.x + obs.width / 2, y + obs.height / 2
+    if obs.type == 'asteroid':
+        size = quantize(obs.size, ASTEROID_SIZE_STEP)
+        frames = asteroid_cache.get((size, obs.variant), _render_asteroid_frames, size, obs.variant)
+        frame = frames[round(obs.rotation_angle / ASTEROID_ROTATION_STEP) % ASTEROID_ANGLES]
+        screen.blit(frame, (center_x - frame.get_width()//2, center_y - frame.get_height()//2))
+    elif obs.type == 'drone':
+        frame_index = int(obs.anim_timer * DRONE_ANIM_FRAMES / DRONE_ANIM_PERIOD) % DRONE_ANIM_FRAMES
+        frame = sprite_cache.get(('drone', obs.width, obs.height, frame_index), _render_drone, obs.width, obs.height, frame_index)
+        screen.blit(frame, (obs.x - DRONE_MARGIN, y))
+    elif obs.type == 'scout':
+        points = [(center_x, y), (obs.x, y + obs.height), (obs.x + obs.width, y + obs.height)]
+        pygame.draw.polygon(screen, PURPLE, points); pygame.draw.polygon(screen, NEON_PINK, points, 2)
+    elif obs.type == 'fire_wall_segment':
+        pygame.draw.rect(screen, (40,0,0), (obs.x, y, obs.width, obs.height))
+
+def draw_powerup(pup, alpha=1.0):
+    y = pup.prev_y + (pup.y - pup.prev_y) * alpha
+    center_x, center_y = pup.x + pup.size // 2, y + pup.size // 2
+    glow_surface = sprite_cache.get(('glow', pup.size, pup.glow_radius), _render_powerup_glow, pup.size, pup.glow_radius)
+    screen.blit(glow_surface, (center_x - glow_surface.get_width()//2, center_y - glow_surface.get_height()//2))
+    angle = quantize(pup.rotation_angle, SPIN_STEP) % 360
+    rotated_surf = sprite_cache.get(('cross', pup.size, angle), _render_rotated_cross, pup.size, angle)
+    screen.blit(rotated_surf, (center_x - rotated_surf.get_width()//2, center_y - rotated_surf.get_height()//2))
+
+def draw_world(state, alpha=1.0):
+    """Draws the live playfield: the ship, obstacle particles, obstacles and powerups."""
+    draw_player(state.player, alpha); obstacle_particles.draw(screen)
+    [draw_obstacle(obs, alpha) for obs in state.obstacles]; [draw_powerup(pup, alpha) for pup in state.powerups]
+
+def draw_hud(state):
+    score_label = cached_text(font, "SCORE: ", WHITE); screen.blit(score_label, (10, 10))
+    score_digits.draw(screen, str(int(state.score)), (10 + score_label.get_width(), 10))
+    if not state.is_firewall_event:
+        combo_color = GOLD if state.combo_multiplier >= 5.0 else ORANGE
         # NEW: Use DESIGN_WIDTH
-        self.size = 25; self.x, self.y = random.randint(0, DESIGN_WIDTH - self.size), -self.size
-        self.speed = POWERUP_SPEED; self.rotation_angle, self.glow_radius, self.glow_direction = 0, 0, 1
-    def move(self):
-        self.y += self.speed; self.rotation_angle = (self.rotation_angle + 5) % 360; self.glow_radius += self.glow_direction
-        if self.glow_radius >= 10 or self.glow_radius <= 0: self.glow_direction *= -1
-    def draw(self):
-        center_x, center_y = self.x + self.size // 2, self.y + self.size // 2
-        glow_surface = pygame.Surface((self.size + 20, self.size + 20), pygame.SRCALPHA)
-        pygame.draw.circle(glow_surface, (*NEON_GREEN, 50), (glow_surface.get_width()//2, glow_surface.get_height()//2), self.size//2 + self.glow_radius)
-        screen.blit(glow_surface, (center_x - glow_surface.get_width()//2, center_y - glow_surface.get_height()//2))
-        cross_surf = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
-        pygame.draw.rect(cross_surf, NEON_GREEN, (0, self.size//2 - 2, self.size, 4)); pygame.draw.rect(cross_surf, NEON_GREEN, (self.size//2 - 2, 0, 4, self.size))
-        rotated_surf = pygame.transform.rotate(cross_surf, self.rotation_angle)
-        screen.blit(rotated_surf, rotated_surf.get_rect(center=(center_x, center_y)))
-    # NEW: Check against DESIGN_HEIGHT
-    def off_screen(self): return self.y > DESIGN_HEIGHT
-
-def ask_question():
-    q = random.choice(questions); selected = None
+        combo_text = cached_text(font, f"{state.combo_multiplier:.1f}x", combo_color); screen.blit(combo_text, (DESIGN_WIDTH - combo_text.get_width() - 10, 10))
+    if state.firewall_warning_timer > 0:
+        warning_text = cached_text(big_font, "!! FIRE WALL !!", RED)
+        # NEW: Use DESIGN_WIDTH/HEIGHT
+        screen.blit(warning_text, (DESIGN_WIDTH//2 - warning_text.get_width()//2, DESIGN_HEIGHT//2 - 50))
+
+def ask_question(q):
+    """Shows quiz question 'q' until an option is picked; returns the selected index."""
+    selected = None
+    idle = IdleScreen("quiz")
+    idle.set_layer(q["question"], lambda: [centered_text(small_font, q["question"], NEON_BLUE, 100)] +
+                   [centered_text(small_font, f"{i+1}. {opt}", NEON_PINK, 150 + i*40) for i, opt in enumerate(q["options"])])
     while selected is None:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(); sys.exit()
+        for event in idle.events():
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_1: selected = 0
                 elif event.key == pygame.K_2: selected = 1
                 elif event.key == pygame.K_3: selected = 2
-        
-        # NEW: Draw to the virtual 'screen'
-        update_and_draw_starfield(screen)
-        q_text = small_font.render(q["question"], True, NEON_BLUE); screen.blit(q_text, (DESIGN_WIDTH//2 - q_text.get_width()//2, 100))
-        for i, opt in enumerate(q["options"]):
-            opt_text = small_font.render(f"{i+1}. {opt}", True, NEON_PINK); screen.blit(opt_text, (DESIGN_WIDTH//2 - opt_text.get_width()//2, 150 + i*40))
-        
-        # NEW: Use the display helper to scale and flip
-        update_display()
-        clock.tick(FPS)
-    return selected == q["correct"]
-
-def start_firewall_event(obstacles_list, powerups_list, game_time):
-    obstacles_list.clear(); powerups_list.clear()
-    # NEW: Use DESIGN_WIDTH
-    num_walls, gap_width, last_gap_x = 5, 140, DESIGN_WIDTH // 2
-    last_wall = None
-    for i in range(num_walls):
-        min_x = max(50, last_gap_x - 200)
-        max_x = min(DESIGN_WIDTH - gap_width - 50, last_gap_x + 200)
-        gap_x = random.randint(min_x, max_x)
-        last_gap_x = gap_x
-        y_pos = -100 - (i * 300)
-        left_wall = Obstacle(game_time, obs_type='fire_wall_segment', x_pos=0, y_pos=y_pos, width=gap_x, is_fire_wall=True)
-        # NEW: Use DESIGN_WIDTH
-        right_wall = Obstacle(game_time, obs_type='fire_wall_segment', x_pos=gap_x + gap_width, y_pos=y_pos, width=DESIGN_WIDTH - (gap_x + gap_width), is_fire_wall=True)
-        obstacles_list.extend([left_wall, right_wall])
-        if i == num_walls - 1: last_wall = left_wall
-    return last_wall
+        idle.present()
+    return selected
+
+def game_over_layer(score, player):
+    """The game-over texts, with the top scores from the local leaderboard once it has any."""
+    top = leaderboard.top() if leaderboard is not None else []
+    if not top:
+        return [centered_text(font, "GAME OVER", NEON_PINK, 220), centered_text(small_font, f"Final Score: {int(score)}", WHITE, 270),
+                centered_text(small_font, "R to Play Again", NEON_BLUE, 320)]
+    items = [centered_text(font, "GAME OVER", NEON_PINK, 50), centered_text(small_font, f"Final Score: {int(score)}", WHITE, 95),
+             centered_text(small_font, "HIGH SCORES", NEON_BLUE, 150)]
+    for i, (name, best) in enumerate(top):
+        items.append(centered_text(small_font, f"{i+1:2d}. {name:<4} {best:7d}", GOLD if name == player else WHITE, 185 + i*26))
+    rank = leaderboard.rank(player)
+    if rank is not None and rank > len(top): items.append(centered_text(small_font, f"{player} is #{rank} of {len(leaderboard)}", GOLD, 185 + len(top)*26 + 15))
+    items.append(centered_text(small_font, "R to Play Again", NEON_BLUE, 540))
+    return items
+
+def game_over_screen(score, player):
+    """Shows the final score and the leaderboard until R is pressed (ESC quits)."""
+    idle = IdleScreen("game_over")
+    while True:
+        # Rebuilt only when the background sync changes the leaderboard
+        idle.set_layer(leaderboard.version if leaderboard is not None else 0, lambda: game_over_layer(score, player))
+        for event in idle.events():
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE: pygame.quit(); sys.exit()
+                if event.key == pygame.K_r: return
+        idle.present()
 
 # --- NEW: SCORE SUBMISSION FUNCTION ---
-def submit_score_to_firebase(user_id, score):
+# Scores are written to a local append-only outbox first and uploaded by a
+# background thread, so a slow or missing network never freezes the game and
+# scores survive until Firebase is reachable again (see score_outbox.py).
+SCORE_OUTBOX_PATH = "score_outbox.jsonl"
+# Every finished game is saved as a replay (see replay.py); GAME_ATTACH_REPLAYS=1 uploads it with the score
+REPLAY_DIR = "replays"
+ATTACH_REPLAYS = os.environ.get("GAME_ATTACH_REPLAYS") == "1"
+# Gameplay events are buffered and written to rotating files by a background
+# thread (see telemetry.py); GAME_TELEMETRY_UPLOAD=1 uploads finished files to
+# the Firestore 'telemetry' collection.
+TELEMETRY_DIR = "telemetry"
+telemetry = None
+# The game-over leaderboard is read from a local copy that a background thread
+# keeps in sync with 'highscores' (see leaderboard.py)
+LEADERBOARD_PATH = "leaderboard.json"
+leaderboard = leaderboard_sync = None
+# GAME_DAILY=1 makes every game today's daily run: the same seed, and so the same
+# spawn schedule, on every kiosk. Curated seeds can be listed per date in
+# daily_seeds.json ({"2026-12-24": 12345}).
+DAILY_SEEDS_PATH = "daily_seeds.json"
+
+def game_seed():
+    """None (a random seed) unless GAME_DAILY=1, then today's daily seed."""
+    if os.environ.get("GAME_DAILY") != "1": return None
+    try:
+        with open(DAILY_SEEDS_PATH, encoding="utf-8") as f: curated = json.load(f)
+    except (OSError, ValueError):
+        curated = None
+    try: return daily_seed(curated=curated)
+    except ValueError as e:
+        print(f"{DAILY_SEEDS_PATH}: {e}; using the default daily seed.")
+        return daily_seed()
+score_submitter = None  # started in main()
+
+def submit_score_to_firebase(user_id, score, replay=None):
     """
-    Submits the player's final score, username ('name'), and a timestamp to Firestore.
-    Uses the 'highscores' collection to match the database structure.
+    Queues the player's final score, username ('name'), and a timestamp for the
+    Firestore 'highscores' collection. Returns immediately.
+    The game's replay is saved to REPLAY_DIR under the score's document id and
+    attached to the submission when ATTACH_REPLAYS is set.
     """
-    global db # Use the initialized Firestore client
-
-    if db is None:
-        print("Score submission failed: Firebase not initialized.")
-        return
-
-    try:
-        score_data = {
-            # MATCHING YOUR DB STRUCTURE: 'name' and 'score'
-            'name': user_id,
-            'score': int(score),
-            'timestamp': datetime.datetime.now()
-        }
-        
-        # Add a new document to the 'highscores' collection
-        db.collection('highscores').add(score_data)
-        print(f"Score for {user_id} ({int(score)}) submitted to Firebase successfully!")
-        
-    except Exception as e:
-        print(f"Error submitting score to Firebase: {e}")
+    data = replay.to_bytes() if replay is not None else None
+    doc_id = score_submitter.submit(user_id, score, replay=data if ATTACH_REPLAYS else None)
+    if data is not None:
+        try:
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+            with open(os.path.join(REPLAY_DIR, f"{doc_id}.replay"), "wb") as f: f.write(data)
+        except OSError as e: print(f"Could not save replay: {e}")
+    return doc_id
+
+SCORE_FLUSH_SECONDS = 3.0  # how long quitting waits for queued scores to upload
+
+def close_score_submitter():
+    """Gives queued scores a moment to upload when the game quits; any left over stay in the outbox."""
+    if not score_submitter.flush(SCORE_FLUSH_SECONDS): print(f"{len(score_submitter.outbox)} score(s) left in the outbox.")
+    score_submitter.close()
 # --------------------------------------
 
 
 def main():
-    user_id = get_player_id()
+    global score_submitter, board, telemetry, leaderboard, leaderboard_sync
+    # Also uploads any scores left in the outbox by a previous session; the
+    # worker waits for Firebase to load and gives up if it fails
+    score_submitter = ScoreSubmitter(ScoreOutbox(SCORE_OUTBOX_PATH), firebase.wait)
+    atexit.register(close_score_submitter)
+    # get, not wait: the telemetry writer must keep flushing while Firebase loads
+    telemetry = Telemetry(TELEMETRY_DIR, uploader=firestore_uploader(firebase.get) if os.environ.get("GAME_TELEMETRY_UPLOAD") == "1" else None)
+    atexit.register(telemetry.close)  # final flush when the game quits
+    leaderboard, cursor = Leaderboard.load(LEADERBOARD_PATH)
+    leaderboard_sync = LeaderboardSync(leaderboard, firebase.wait, LEADERBOARD_PATH, cursor)
+    atexit.register(leaderboard_sync.close)  # saves a score added just before quitting
+    gc_controller.startup_done()
 
     # --- WII BOARD INTEGRATION START ---
     # Try to find and connect to the board
-    board = find_balance_board()
-    
+    board = open_balance_board()
+    if board is not None: atexit.register(board.close)  # releases the device and closes any recording
+
     if board is None:
         print("\n" + "="*40)
         print("!! ERROR: No Wii Balance Board found. !!")
@@ -470,125 +743,118 @@ def main():
         print("You may need to run this with 'sudo'.")
         print("Falling back to keyboard controls.")
         print("="*40 + "\n")
-    else:
-        # Start the balance board reader in its own thread
-        # --- DISABLED FOR TESTING ---
-        # reader_thread = threading.Thread(target=balance_board_reader, args=(board,), daemon=True)
-        # reader_thread.start()
-        print("Wii board found, but reader thread is DISABLED for testing.")
     # --- WII BOARD INTEGRATION END ---
+    user_id = select_rider()
 
+    games_played = 0
     while True:
-        player = Player(); obstacles = []; powerups = []; particles = []
-        # Cleaned variable initialization to prevent editor warnings
-        score, game_time, combo_multiplier, combo_reset_timer, MAX_COMBO_TIME = 0.0, 0, 1.0, 0, FPS * 1.5
-        game_over, is_firewall_event, last_firewall_wall, firewall_warning_timer = False, False, None, 0
+        state = GameState(game_seed()); particles = ParticleSystem()
+        recorder = ReplayRecorder(state.seed, user_id)
+        games_played += 1
+        game_telemetry = GameTelemetry(telemetry, games_played, seed=state.seed, player=user_id, board=board is not None, quality=quality.settings["name"])
+        apply_quality(particles)
+        profiler.info = lambda: overlay_info(state)
+        gc_controller.game_started()
+        player_particles.clear(); obstacle_particles.clear()
         score_submitted = False # NEW: Flag to ensure score is only submitted once
+        bake_asteroids()  # whatever the idle screens didn't get to, before play rather than mid-game
 
-        try: pygame.mixer.music.play(-1)
-        except pygame.error: print("Could not play music loop.")
+        # Audio loads in the background; music starts with the first game after it is ready
+        dead_sound = audio.get()
+        if dead_sound is not None:
+            try: pygame.mixer.music.play(-1)
+            except pygame.error: print("Could not play music loop.")
         explosion_created, death_sound_played = False, False
-        running = True
-        while running:
-            clock.tick(FPS)
+        pacer.resync(); timestep.reset()
+        while True:
+            profiler.begin("game")
+            elapsed = pacer.begin(); work_start = time.perf_counter()
+            profiler.mark("wait")
             for event in pygame.event.get():
                 if event.type == pygame.QUIT: pygame.quit(); sys.exit()
                 # NEW: Add a key to exit fullscreen (e.g., ESC)
                 if event.type == pygame.KEYDOWN:
+                    handle_debug_key(event)
                     if event.key == pygame.K_ESCAPE:
                         pygame.quit()
                         sys.exit()
-                    if game_over and len(particles) == 0:
-                        if event.key == pygame.K_r: user_id = get_player_id(); running = False
-                
-            if not game_over:
-                game_time += 1; keys = pygame.key.get_pressed()
-                player.target_tilt = 0
-
-                # --- WII BOARD INTEGRATION START ---
-                # Check for Wii Board movement
-                if player_direction == -1: # Leaning left
-                    player.move("left")
-                elif player_direction == 1: # Leaning right
-                    player.move("right")
-                
-                # Keyboard controls (as a fallback)
-                if keys[pygame.K_LEFT]: player.move("left")
-                if keys[pygame.K_RIGHT]: player.move("right")
-                # --- WII BOARD INTEGRATION END ---
-                
-                player.update()
-                if is_firewall_event:
-                    # NEW: Check against DESIGN_HEIGHT
-                    if last_firewall_wall and last_firewall_wall.y > DESIGN_HEIGHT: is_firewall_event = False
-                else:
-                    if random.randint(1, 100) < 4: # Reduced spawn rate
-                        obstacles.append(Obstacle(game_time))
-                    if random.randint(1, 600) < 2: powerups.append(Powerup())
-                    if score >= 200 and random.randint(1, 1500) == 1:
-                        is_firewall_event, firewall_warning_timer = True, 90
-                        last_firewall_wall = start_firewall_event(obstacles, powerups, game_time)
-                score += (1 / FPS) * combo_multiplier
-                [obs.update() for obs in obstacles]; obstacles = [obs for obs in obstacles if not obs.off_screen()]
-                [pup.move() for pup in powerups]; powerups = [pup for pup in powerups if not pup.off_screen()]
-                player_rect = pygame.Rect(player.x - player.width/2, player.y, player.width, player.height)
-                graze_rect = player_rect.inflate(60, 60)
-                grazed_this_frame = False
-                for obs in obstacles[:]:
-                    obs_rect = pygame.Rect(obs.x, obs.y, obs.width, obs.height)
-                    if player_rect.colliderect(obs_rect):
-                        if player.has_shield: obstacles.remove(obs); player.has_shield = False
-                        else: game_over = True
-                    elif graze_rect.colliderect(obs_rect) and not is_firewall_event:
-                        combo_multiplier = min(5.0, combo_multiplier + 0.05); combo_reset_timer = MAX_COMBO_TIME
-                        grazed_this_frame = True
-                if not grazed_this_frame and not is_firewall_event:
-                    combo_reset_timer -= 1
-                    if combo_reset_timer <= 0: combo_multiplier = max(1.0, combo_multiplier - 0.05)
-                for pup in powerups[:]:
-                    if player_rect.colliderect(pygame.Rect(pup.x, pup.y, pup.size, pup.size)):
-                        powerups.remove(pup)
-                        create_explosion(particles, pup.x + pup.size/2, pup.y + pup.size/2)
-                        if ask_question(): score += 50; player.has_shield = True
-                        
+            profiler.mark("events")
+
+            # Polled every frame (also after game over) so the board's ring buffer never backs up
+            lean = board.poll() if board is not None else 0.0
+            keys = pygame.key.get_pressed()
+            # --- WII BOARD INTEGRATION START ---
+            # Wii Board lean plus keyboard controls (as a fallback). Read once per
+            # frame and applied to every simulation step the frame runs.
+            buttons = board_buttons(lean)
+            if keys[pygame.K_LEFT]: buttons |= INPUT_LEFT
+            if keys[pygame.K_RIGHT]: buttons |= INPUT_RIGHT
+            # --- WII BOARD INTEGRATION END ---
+            for _ in range(timestep.advance(elapsed)):
+                if not state.game_over:
+                    recorder.step(buttons)
+                    sim_events = step(state, buttons); game_telemetry.on_step(state, sim_events)
+                    for sim_event in sim_events:
+                        if sim_event[0] == 'powerup': create_explosion(particles, sim_event[1], sim_event[2])
+                    # The quiz is modal: the simulation stays paused until every pending question is answered
+                    # (the quiz frames are profiled separately and its time is never simulated)
+                    if state.question_queue:
+                        while state.question_queue:
+                            answer = ask_question(questions[state.question_queue[0]])
+                            recorder.answer(answer); game_telemetry.on_step(state, step(state, answer=answer))
+                        pacer.resync(); timestep.reset(); profiler.begin("game")
+                    emit_particles(state.player, state.obstacles)
+                # Cosmetic motion advances with the simulation clock too, so it keeps its speed at any frame rate
+                particles.update(); update_starfield()
+            profiler.mark("sim")
+            player, score, game_over = state.player, state.score, state.game_over
+            alpha = timestep.alpha if not game_over else 1.0
+
             # NEW: Draw everything to the virtual 'screen'
-            update_and_draw_starfield(screen)
+            draw_starfield(screen)
+            profiler.mark("starfield")
             
             if game_over and not explosion_created:
                 create_explosion(particles, player.x, player.y + 15)
-                explosion_created = True; pygame.mixer.music.stop()
+                explosion_created = True; dead_sound = audio.get()
+                if dead_sound: pygame.mixer.music.stop()
                 if dead_sound and not death_sound_played: dead_sound.play(); death_sound_played = True
                 
-            [p.update() for p in particles]; [p.draw(screen) for p in particles]
-            particles = [p for p in particles if p.life > 0]
+            particles.draw(screen)
+            profiler.mark("particles")
             
             if not game_over:
-                player.draw(); [obs.draw() for obs in obstacles]; [pup.draw() for pup in powerups]
-                score_text = font.render(f"SCORE: {int(score)}", True, WHITE); screen.blit(score_text, (10, 10))
-                if not is_firewall_event:
-                    combo_color = GOLD if combo_multiplier >= 5.0 else ORANGE
-                    # NEW: Use DESIGN_WIDTH
-                    combo_text = font.render(f"{combo_multiplier:.1f}x", True, combo_color); screen.blit(combo_text, (DESIGN_WIDTH - combo_text.get_width() - 10, 10))
-                if firewall_warning_timer > 0:
-                    warning_text = big_font.render("!! FIRE WALL !!", True, RED)
-                    # NEW: Use DESIGN_WIDTH/HEIGHT
-                    screen.blit(warning_text, (DESIGN_WIDTH//2 - warning_text.get_width()//2, DESIGN_HEIGHT//2 - 50))
-                    firewall_warning_timer -= 1
+                draw_world(state, alpha); profiler.mark("draw")
+                draw_hud(state); profiler.mark("hud")
             
             elif game_over and len(particles) == 0:
                 # --- SCORE SUBMISSION TRIGGER ---
                 if not score_submitted:
-                    submit_score_to_firebase(user_id, score)
+                    submit_score_to_firebase(user_id, score, recorder.finish(score))
+                    # Shown straight away; the sync thread saves it (and later reads it back from Firestore)
+                    leaderboard.add(user_id, score, time.strftime("%Y-%m-%dT%H:%M:%S")); leaderboard_sync.wake()
+                    game_telemetry.end(state)
                     score_submitted = True
+                    gc_controller.game_ended()
+                    profiler.mark("submit")
                 # --------------------------------
+                # Close this frame before the game-over screen profiles its own
+                profiler.end(obstacle_count=len(state.obstacles), powerup_count=len(state.powerups),
+                             particle_count=len(particles) + len(player_particles) + len(obstacle_particles))
                 
-                # NEW: Use DESIGN_WIDTH
-                game_over_text = font.render("GAME OVER", True, NEON_PINK); screen.blit(game_over_text, (DESIGN_WIDTH//2 - game_over_text.get_width()//2, 220))
-                final_score_text = small_font.render(f"Final Score: {int(score)}", True, WHITE); screen.blit(final_score_text, (DESIGN_WIDTH//2 - final_score_text.get_width()//2, 270))
-                restart_text = small_font.render("R to Play Again", True, NEON_BLUE); screen.blit(restart_text, (DESIGN_WIDTH//2 - restart_text.get_width()//2, 320))
+                # Nothing moves on the game-over screen any more, so the idle renderer takes over until R
+                game_over_screen(score, user_id)
+                user_id = select_rider()
+                break
             
             # NEW: Use the display helper to scale and flip
-            update_display()
+            pacer.rendered(); update_display(); pacer.presented()
+            if quality.update((presenter.scaled_at - work_start) * 1000, pacer.period * 1000 * QUALITY_BUDGET):
+                apply_quality(particles); print(f"Quality: {quality.settings['name']}")
+                telemetry.record("quality", level=quality.settings["name"], work_ms=round(pacer.work_ms, 2))
+            profiler.end(obstacle_count=len(state.obstacles), powerup_count=len(state.powerups),
+                         particle_count=len(particles) + len(player_particles) + len(obstacle_particles))
 
 if __name__ == "__main__":
+    startup()
     main()
\ No newline at end of file
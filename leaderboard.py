@@ -0,0 +1,207 @@
+import argparse
+import datetime
+import heapq
+import json
+import os
+import threading
+from firestore_client import client_getter
+
+# Local leaderboard for the Firestore 'highscores' collection. The game only
+# ever reads the local copy (so the game-over screen shows it instantly); a
+# background thread pulls new scores incrementally and persists the copy.
+#
+#   python leaderboard.py show leaderboard.json --top 20
+#   python leaderboard.py sync leaderboard.json --project <id>   (honours FIRESTORE_EMULATOR_HOST)
+
+
+class Leaderboard:
+    """
+    Best score per name plus the top 'size' names.
+
+    'best' maps every name to its best (score, timestamp). The top names are
+    kept in a min-heap of (score, name) with at most 'size' entries: a new
+    best either replaces that name's entry, fills a free slot or evicts the
+    lowest entry. Bests only ever go up, so an evicted name can only come
+    back with a new best and the heap is always exactly the top 'size'.
+    Adding a score is O(size) at worst, reading the table O(size log size),
+    whatever the number of names.
+
+    Reads and writes take a lock, since the sync thread adds scores while
+    the game reads. 'version' changes whenever the table does.
+    """
+    def __init__(self, size=10):
+        self.size = size
+        self.best = {}
+        self._heap, self._in_heap = [], set()
+        self.version, self.dirty = 0, False
+        self._lock = threading.Lock()
+
+    def add(self, name, score, timestamp=None):
+        """Records a score; returns True if it is a new best for 'name'."""
+        score = int(score)
+        with self._lock:
+            current = self.best.get(name)
+            if current is not None and current[0] >= score: return False
+            self.best[name] = (score, timestamp)
+            heap = self._heap
+            if name in self._in_heap:
+                heap[:] = [(score, name) if entry[1] == name else entry for entry in heap]; heapq.heapify(heap)
+            elif len(heap) < self.size:
+                heapq.heappush(heap, (score, name)); self._in_heap.add(name)
+            elif (score, name) > heap[0]:
+                _, evicted = heapq.heapreplace(heap, (score, name))
+                self._in_heap.discard(evicted); self._in_heap.add(name)
+            self.version += 1; self.dirty = True
+            return True
+
+    def top(self):
+        """The top [(name, score)], best first."""
+        with self._lock: return [(name, score) for score, name in sorted(self._heap, reverse=True)]
+
+    def rank(self, name):
+        """1-based rank of 'name' among all names (None if it has no score). Scans every name."""
+        with self._lock:
+            entry = self.best.get(name)
+            if entry is None: return None
+            return 1 + sum(1 for score, _ in self.best.values() if score > entry[0])
+
+    def __len__(self): return len(self.best)
+
+    # --- Persistence ---
+    def to_dict(self, cursor=None):
+        with self._lock:
+            entries = {name: [score, timestamp] for name, (score, timestamp) in self.best.items()}
+            self.dirty = False
+        return {"version": 1, "cursor": cursor, "entries": entries}
+
+    def save(self, path, cursor=None):
+        """Writes the table atomically (a crash leaves the previous file)."""
+        data = self.to_dict(cursor)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f: json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, size=10):
+        """Returns (leaderboard, cursor); an empty board and no cursor if the file is missing or unreadable."""
+        board = cls(size)
+        try:
+            with open(path, encoding="utf-8") as f: data = json.load(f)
+        except (OSError, ValueError):
+            return board, None
+        for name, (score, timestamp) in data.get("entries", {}).items(): board.add(name, score, timestamp)
+        board.dirty = False
+        return board, data.get("cursor")
+
+
+def _parse_time(value): return datetime.datetime.fromisoformat(value) if value else None
+
+
+class LeaderboardSync:
+    """
+    Keeps a Leaderboard up to date from the 'highscores' collection on a
+    background thread and saves it to 'path'.
+
+    Every 'interval' seconds (or after wake()) it pages through the scores
+    ordered by (timestamp, document id) from the cursor (the newest timestamp
+    seen) minus 'overlap', 'page_size' documents per query. Each page starts
+    after the previous page's last document, so a run of scores with the same
+    timestamp is never cut off at a page boundary. The overlap re-reads recent
+    scores so ones that reach Firestore late (a kiosk's outbox flushing after
+    an outage) are still picked up; re-reading is harmless since adding a
+    score that isn't a new best changes nothing. The first sync reads the
+    whole collection.
+
+    'client' is passed to client_getter() (see firestore_client.py); while it
+    gives None only local changes are saved. Queries use
+    collection(name).order_by(field).order_by("__name__").start_after({field: value}
+    or a snapshot).limit(n).stream().
+    """
+    def __init__(self, leaderboard, client, path, cursor=None, collection="highscores", interval=60.0,
+                 page_size=500, overlap=datetime.timedelta(days=1), start=True):
+        self.leaderboard, self.path, self.collection = leaderboard, path, collection
+        self._client = client_getter(client)
+        self.cursor = _parse_time(cursor) if isinstance(cursor, str) else cursor
+        self.interval, self.page_size, self.overlap = interval, page_size, overlap
+        self.syncs, self.fetched, self.failures, self.error = 0, 0, 0, None
+        self._wake, self._stop = threading.Event(), threading.Event()
+        self._thread = threading.Thread(target=self._run, name="leaderboard-sync", daemon=True)
+        if start: self._thread.start()
+
+    def wake(self): self._wake.set()
+
+    def close(self, timeout=2.0):
+        """Stops the worker and saves any local changes it hadn't saved yet."""
+        self._stop.set(); self._wake.set()
+        if self._thread.is_alive(): self._thread.join(timeout)
+        if self._thread.is_alive() or not self.leaderboard.dirty: return
+        try: self.save()
+        except OSError as e: print(f"Could not save the leaderboard: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                db = self._client()
+                if db is not None: self.sync(db)
+                self.error = None
+            except Exception as e:
+                self.failures += 1; self.error = e
+                print(f"Leaderboard sync failed: {e}")
+            try:
+                if self.leaderboard.dirty: self.save()
+            except OSError as e:
+                print(f"Could not save the leaderboard: {e}")
+            self._wake.wait(self.interval); self._wake.clear()
+
+    def sync(self, db):
+        """Pulls every score newer than the cursor (minus the overlap); returns how many were read."""
+        query = db.collection(self.collection).order_by("timestamp").order_by("__name__")
+        start, count = {"timestamp": self.cursor - self.overlap} if self.cursor is not None else None, 0
+        while True:
+            page = query.start_after(start) if start is not None else query
+            docs = list(page.limit(self.page_size).stream())
+            if docs: start = docs[-1]  # the next page continues after this document, ties included
+            for doc in docs:
+                data = doc.to_dict()
+                name, score, timestamp = data.get("name"), data.get("score"), data.get("timestamp")
+                if timestamp is None: continue
+                if self.cursor is None or timestamp > self.cursor: self.cursor = timestamp
+                if isinstance(name, str) and isinstance(score, (int, float)): self.leaderboard.add(name, score, timestamp.isoformat())
+            count += len(docs)
+            if len(docs) < self.page_size: break
+        self.syncs += 1; self.fetched += count
+        return count
+
+    def save(self):
+        self.leaderboard.save(self.path, self.cursor.isoformat() if self.cursor is not None else None)
+
+    def stats(self):
+        return {"entries": len(self.leaderboard), "syncs": self.syncs, "fetched": self.fetched,
+                "failures": self.failures, "cursor": self.cursor.isoformat() if self.cursor else None}
+
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show or sync the local leaderboard.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("show", help="print the local top scores")
+    show.add_argument("path"); show.add_argument("--top", type=int, default=10)
+    pull = commands.add_parser("sync", help="sync once from Firestore (or the emulator) and save")
+    pull.add_argument("path"); pull.add_argument("--project", help="Google Cloud project id")
+    args = parser.parse_args(argv)
+
+    if args.command == "show":
+        board, cursor = Leaderboard.load(args.path, size=args.top)
+        print(f"{len(board)} names, synced up to {cursor or 'never'}")
+        for i, (name, score) in enumerate(board.top(), 1): print(f"{i:3d}. {name:<8}{score:8d}")
+        return
+    from google.cloud import firestore
+    board, cursor = Leaderboard.load(args.path)
+    db = firestore.Client(project=args.project)
+    sync = LeaderboardSync(board, db, args.path, cursor, start=False)
+    print(f"Fetched {sync.sync(db)} scores, {len(board)} names.")
+    sync.save()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import math
+import numpy as np
+import pygame
+from presentation import to_display_format
+
+
+def _head(values, n):
+    """Scalars broadcast as-is; arrays are trimmed to the n rows that fit."""
+    return values[:n] if np.ndim(values) else values
+
+
+class ParticleSystem:
+    """
+    Array-backed particle engine. Every particle lives in a row of a set of
+    NumPy arrays (struct-of-arrays), so update is a handful of vector ops and
+    dead particles are removed with one boolean compaction per frame.
+    Drawing uses cached circle sprites and a single surface.blits() call.
+    """
+    MAX_RADIUS = 63
+
+    def __init__(self, capacity=1024, max_particles=None, seed=None):
+        self.capacity, self.count = capacity, 0
+        self.max_particles = max_particles  # None = grow without limit
+        self.rng = np.random.default_rng(seed)
+        self.x = np.zeros(capacity, np.float32); self.y = np.zeros(capacity, np.float32)
+        self.angle = np.zeros(capacity, np.float32); self.speed = np.zeros(capacity, np.float32)
+        self.size = np.zeros(capacity, np.float32); self.life = np.zeros(capacity, np.int32)
+        self.color = np.zeros(capacity, np.int16)
+        # Per-frame velocity, derived from angle/speed once at emit time
+        self.dx = np.zeros(capacity, np.float32); self.dy = np.zeros(capacity, np.float32)
+        self.palette, self._palette_index, self._sprites = [], {}, {}
+
+    _FIELDS = ('x', 'y', 'angle', 'speed', 'size', 'life', 'color', 'dx', 'dy')
+
+    def __len__(self): return self.count
+
+    def color_index(self, color):
+        """Returns the palette index for an RGB tuple, registering it if new."""
+        idx = self._palette_index.get(color)
+        if idx is None:
+            idx = self._palette_index[color] = len(self.palette); self.palette.append(color)
+        return idx
+
+    def clear(self): self.count = 0
+
+    def stats(self): return {"count": self.count, "capacity": self.capacity}
+
+    def _reserve(self, extra):
+        """Makes room for 'extra' new rows; returns how many actually fit."""
+        needed = self.count + extra
+        if self.max_particles is not None: needed = min(needed, self.max_particles)
+        if needed > self.capacity:
+            new_capacity = max(needed, self.capacity * 2)
+            for name in self._FIELDS:
+                old = getattr(self, name); grown = np.zeros(new_capacity, old.dtype)
+                grown[:self.count] = old[:self.count]; setattr(self, name, grown)
+            self.capacity = new_capacity
+        return max(0, needed - self.count)
+
+    def emit_many(self, x, y, color_idx, size, life, angle, speed):
+        """Appends a batch of particles. Every argument is a scalar or an array."""
+        n = max(np.size(a) for a in (x, y, color_idx, size, life, angle, speed))
+        n = self._reserve(n)
+        if n == 0: return
+        s = slice(self.count, self.count + n)
+        self.x[s], self.y[s], self.color[s] = _head(x, n), _head(y, n), _head(color_idx, n)
+        self.size[s], self.life[s] = _head(size, n), _head(life, n)
+        self.angle[s], self.speed[s] = _head(angle, n), _head(speed, n)
+        self.dx[s] = np.cos(self.angle[s]) * self.speed[s]; self.dy[s] = np.sin(self.angle[s]) * self.speed[s]
+        self.count += n
+
+    def emit(self, x, y, color, size, life, angle, speed):
+        """Appends a single particle (same arguments as the old Particle class)."""
+        if self._reserve(1) == 0: return
+        i = self.count
+        self.x[i], self.y[i], self.color[i] = x, y, self.color_index(color)
+        self.size[i], self.life[i], self.angle[i], self.speed[i] = size, life, angle, speed
+        self.dx[i] = math.cos(angle) * speed; self.dy[i] = math.sin(angle) * speed
+        self.count += 1
+
+    def burst(self, x, y, count, colors, size, life, angle, speed):
+        """
+        Emits 'count' particles at (x, y). size/angle/speed are (low, high) float
+        ranges, life is an inclusive (low, high) int range and the colour of each
+        particle is picked uniformly from 'colors'.
+        """
+        rng = self.rng
+        palette = np.array([self.color_index(c) for c in colors], np.int16)
+        self.emit_many(x, y, palette[rng.integers(0, len(palette), count)],
+                       rng.uniform(size[0], size[1], count), rng.integers(life[0], life[1] + 1, count),
+                       rng.uniform(angle[0], angle[1], count), rng.uniform(speed[0], speed[1], count))
+
+    def update(self):
+        n = self.count
+        if n == 0: return
+        self.life[:n] -= 1
+        np.maximum(self.size[:n] - 0.1, 0, out=self.size[:n])
+        self.x[:n] += self.dx[:n]; self.y[:n] += self.dy[:n]
+        alive = self.life[:n] > 0
+        k = int(np.count_nonzero(alive))
+        if k != n:
+            for name in self._FIELDS:
+                arr = getattr(self, name); arr[:k] = arr[:n][alive]
+            self.count = k
+
+    def _sprite(self, key):
+        color = self.palette[key // (self.MAX_RADIUS + 1)]; radius = key % (self.MAX_RADIUS + 1)
+        colorkey = (0, 0, 0) if color != (0, 0, 0) else (1, 1, 1)
+        sprite = pygame.Surface((radius * 2 + 1, radius * 2 + 1))
+        sprite.fill(colorkey); sprite.set_colorkey(colorkey, pygame.RLEACCEL)
+        pygame.draw.circle(sprite, color, (radius, radius), radius)
+        sprite = self._sprites[key] = to_display_format(sprite)
+        return sprite
+
+    def draw(self, surface):
+        n = self.count
+        if n == 0: return
+        radius = np.minimum(self.size[:n].astype(np.int32), self.MAX_RADIUS)
+        visible = radius > 0
+        if not visible.all():
+            if not visible.any(): return
+            radius = radius[visible]
+        else: visible = slice(None)
+        keys = (self.color[:n][visible].astype(np.int32) * (self.MAX_RADIUS + 1) + radius).tolist()
+        px = (self.x[:n][visible].astype(np.int32) - radius).tolist()
+        py = (self.y[:n][visible].astype(np.int32) - radius).tolist()
+        sprites = self._sprites
+        for key in set(keys).difference(sprites): self._sprite(key)
+        surface.blits(list(zip(map(sprites.__getitem__, keys), zip(px, py))), doreturn=False)
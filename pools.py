@@ -0,0 +1,81 @@
+import gc
+import time
+
+
+class EntityPool:
+    """
+    Free list of dead entities for reuse. acquire() pops a dead instance and
+    calls its reset() with the constructor's arguments (or constructs a new one
+    when the free list is empty); release() hands an instance back once it has
+    left play. Entity classes use __slots__ and do all their setup in reset(),
+    so a reused instance is indistinguishable from a fresh one.
+    """
+    def __init__(self, cls, max_free=256):
+        self.cls, self.max_free = cls, max_free
+        self.free = []
+        self.created, self.reused, self.released, self.dropped = 0, 0, 0, 0
+
+    def acquire(self, *args, **kwargs):
+        if self.free:
+            item = self.free.pop(); item.reset(*args, **kwargs); self.reused += 1
+            return item
+        self.created += 1
+        return self.cls(*args, **kwargs)
+
+    def release(self, item):
+        if len(self.free) < self.max_free: self.free.append(item); self.released += 1
+        else: self.dropped += 1
+
+    def stats(self):
+        return {"free": len(self.free), "created": self.created, "reused": self.reused,
+                "released": self.released, "dropped": self.dropped}
+
+
+class GCController:
+    """
+    Keeps Python's cyclic garbage collector out of gameplay frames.
+
+    Modes:
+      'default' - leave the collector alone
+      'tuned'   - freeze everything allocated during startup (so collections
+                  never rescan it) and raise the generation-0 threshold
+      'manual'  - like 'tuned', but automatic collection is disabled while a
+                  game is running; collect() runs between games instead
+    Reference counting still frees everything without cycles immediately,
+    so with pooled entities 'manual' only defers the rare cyclic garbage.
+
+    Collector pauses are timed through gc.callbacks and reported by stats().
+    """
+    MODES = ('default', 'tuned', 'manual')
+
+    def __init__(self, mode='tuned', threshold=50000):
+        if mode not in self.MODES: raise ValueError(f"Unknown GC mode '{mode}', expected one of {self.MODES}")
+        self.mode, self.threshold = mode, threshold
+        self.collections, self.pause_ms, self.max_pause_ms = 0, 0.0, 0.0
+        self._start = None
+        self._default_threshold = gc.get_threshold()
+        gc.callbacks.append(self._callback)
+
+    def _callback(self, phase, info):
+        if phase == "start": self._start = time.perf_counter()
+        elif self._start is not None:
+            pause = (time.perf_counter() - self._start) * 1000; self._start = None
+            self.collections += 1; self.pause_ms += pause; self.max_pause_ms = max(self.max_pause_ms, pause)
+
+    def startup_done(self):
+        """Call once the game has loaded: moves startup objects out of the collector's reach."""
+        if self.mode == 'default': return
+        gc.collect(); gc.freeze()
+        gc.set_threshold(self.threshold, *self._default_threshold[1:])
+
+    def game_started(self):
+        if self.mode == 'manual': gc.disable()
+
+    def game_ended(self):
+        """Between games: catch up on deferred collection while nothing is moving."""
+        if self.mode == 'manual':
+            gc.collect(); gc.enable()
+
+    def stats(self):
+        return {"mode": self.mode, "collections": self.collections, "pause_ms": self.pause_ms,
+                "max_pause_ms": self.max_pause_ms, "enabled": gc.isenabled(), "frozen": gc.get_freeze_count()}
@@ -0,0 +1,161 @@
+import time
+import pygame
+
+SCALERS = ('integer', 'smooth', 'sdl2')
+
+
+# (opaque, per-pixel alpha) surfaces to convert to when there is no display surface
+_format_references = None
+
+
+def set_display_format(surface):
+    """
+    Makes to_display_format() convert to 'surface's pixel format (and 32-bit
+    per-pixel alpha) while there is no display surface, e.g. to the virtual
+    screen on the SDL2 renderer path. None turns this off again.
+    """
+    global _format_references
+    _format_references = None if surface is None else (surface, pygame.Surface((1, 1), pygame.SRCALPHA, 32))
+
+
+def to_display_format(surface, alpha=False):
+    """
+    Converts a surface to the display's pixel format for fast blits, or to the
+    set_display_format() surface's when there is no display surface. Returns
+    it unchanged when there is neither (a headless run).
+    """
+    if pygame.display.get_surface() is None:
+        if _format_references is None: return surface
+        return surface.convert(_format_references[1] if alpha else _format_references[0])
+    return surface.convert_alpha() if alpha else surface.convert()
+
+
+class Presenter:
+    """
+    Puts the fixed-size design canvas on the real display.
+
+    Scalers:
+      'integer' - nearest-neighbour scale by the largest whole factor that fits
+                  ('smooth' on outputs smaller than the design size)
+      'smooth'  - smoothscale to the largest aspect-correct size, written
+                  straight into the display via the dest_surface argument
+      'sdl2'    - streaming texture on an SDL2 renderer with a logical size,
+                  so the GPU (or SDL's renderer) does the scaling
+      'auto'    - 'integer' when the display is an exact multiple of the design
+                  size, otherwise 'sdl2' if available, otherwise 'smooth'
+
+    Letterbox bars are only cleared when the output rectangle changes.
+    stats() reports the chosen scaler and its per-frame cost.
+    """
+    def __init__(self, design_size, output_size, scaler='auto', fullscreen=True, caption="", clear_color=(0, 0, 0), vsync=False):
+        self.design_size, self.output_size = design_size, output_size
+        self.fullscreen, self.caption, self.clear_color, self.vsync = fullscreen, caption, clear_color, vsync
+        self.display_surface = self.window = self.renderer = self.texture = None
+        self.scale_ms, self.flip_ms, self.frames = 0.0, 0.0, 0
+        self.scaled_at = 0.0  # perf_counter() when the last frame finished scaling, before the flip
+        self.scaler, self.requested = None, scaler  # the chosen scaler, and what the caller asked for
+        if scaler == 'auto':
+            scaler = 'integer' if self._exact_integer_fit() else 'sdl2'
+        if scaler == 'sdl2':
+            try: self._open_renderer()
+            except Exception as e:  # pygame built without _sdl2, no renderer available, ...
+                print(f"SDL2 renderer unavailable ({e}), falling back to smoothscale.")
+                scaler = 'smooth'
+        if scaler != 'sdl2': self._open_display()
+        self.set_scaler(scaler)
+
+    def _exact_integer_fit(self):
+        (dw, dh), (ow, oh) = self.design_size, self.output_size
+        factor = min(ow // dw, oh // dh)
+        return factor >= 1 and (dw * factor == ow or dh * factor == oh)
+
+    def _open_display(self):
+        flags = pygame.FULLSCREEN if self.fullscreen else 0
+        self.display_surface = pygame.display.set_mode(self.output_size, flags, vsync=int(self.vsync))
+        if self.caption: pygame.display.set_caption(self.caption)
+
+    def _open_renderer(self):
+        from pygame._sdl2.video import Window, Renderer, Texture
+        self.window = Window(self.caption or "pygame", self.output_size, fullscreen_desktop=self.fullscreen)
+        self.renderer = Renderer(self.window, vsync=self.vsync)
+        self.renderer.logical_size = self.design_size
+        self.renderer.draw_color = (*self.clear_color, 255)
+        self.texture = Texture(self.renderer, self.design_size, streaming=True)
+
+    def set_scaler(self, scaler):
+        """Switches between software scalers at runtime (the SDL2 path is fixed at open time)."""
+        if scaler not in SCALERS: raise ValueError(f"Unknown scaler '{scaler}', expected one of {SCALERS}")
+        if (scaler == 'sdl2') != (self.renderer is not None):
+            raise ValueError(f"Cannot switch from '{self.scaler}' to '{scaler}' without reopening the display")
+        if scaler == 'sdl2':
+            self.scaler = scaler
+            self.dest_rect, self._dest, self._buffer, self._bars_dirty = None, None, None, False
+            return
+        (dw, dh), (ow, oh) = self.design_size, self.display_surface.get_size()
+        factor = min(ow // dw, oh // dh)
+        self.scaler = scaler = self.effective_scaler(scaler)
+        if scaler == 'integer':
+            size = (dw * factor, dh * factor)
+        else:
+            ratio = min(ow / dw, oh / dh); size = (int(dw * ratio), int(dh * ratio))
+        self.dest_rect = pygame.Rect(((ow - size[0]) // 2, (oh - size[1]) // 2), size)
+        self._dest = self.display_surface.subsurface(self.dest_rect)
+        self._buffer = None
+        self._bars_dirty = True
+
+    def effective_scaler(self, scaler):
+        """The scaler set_scaler(scaler) would actually use on this display."""
+        if scaler != 'integer' or self.display_surface is None: return scaler
+        (dw, dh), (ow, oh) = self.design_size, self.display_surface.get_size()
+        # An output smaller than the design size has no whole factor: shrink it smoothly instead
+        return scaler if min(ow // dw, oh // dh) > 0 else 'smooth'
+
+    def invalidate(self):
+        """Forces the letterbox bars to be cleared on the next frame (e.g. after a window expose)."""
+        if self.renderer is None: self._bars_dirty = True
+
+    def present(self, surface):
+        start = time.perf_counter()
+        if self.renderer is not None:
+            self.texture.update(surface)
+            self.renderer.clear(); self.texture.draw()
+            scaled = time.perf_counter()
+            self.renderer.present()
+        else:
+            if self._bars_dirty:
+                self.display_surface.fill(self.clear_color); self._bars_dirty = False
+            self._scale(surface)
+            scaled = time.perf_counter()
+            pygame.display.flip()
+        end = time.perf_counter(); self.scaled_at = scaled
+        # Exponential moving averages, in milliseconds
+        self.scale_ms += ((scaled - start) * 1000 - self.scale_ms) * 0.05
+        self.flip_ms += ((end - scaled) * 1000 - self.flip_ms) * 0.05
+        self.frames += 1
+
+    def _scale(self, surface):
+        size = self.dest_rect.size
+        scale = pygame.transform.scale if self.scaler == 'integer' else pygame.transform.smoothscale
+        if self._buffer is None:
+            try:
+                scale(surface, size, self._dest); return
+            except ValueError:
+                # Source and display formats differ; scale into a reused buffer instead
+                self._buffer = pygame.Surface(size, 0, surface)
+        scale(surface, size, self._buffer)
+        self.display_surface.blit(self._buffer, self.dest_rect.topleft)
+
+    def close(self):
+        """Releases the SDL2 window (the classic display is reused by the next set_mode)."""
+        if self.window is not None:
+            self.texture = self.renderer = None; self.window.destroy(); self.window = None
+
+    def describe(self):
+        if self.renderer is not None:
+            return f"sdl2 renderer, logical size {self.design_size[0]}x{self.design_size[1]} on {self.output_size[0]}x{self.output_size[1]}"
+        w, h = self.dest_rect.size
+        return f"{self.scaler} scale to {w}x{h} at {self.dest_rect.topleft}"
+
+    def stats(self):
+        return {"scaler": self.scaler, "description": self.describe(), "scale_ms": self.scale_ms,
+                "flip_ms": self.flip_ms, "frames": self.frames}
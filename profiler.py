@@ -0,0 +1,131 @@
+import csv
+import json
+import time
+import numpy as np
+import pygame
+
+
+class FrameProfiler:
+    """
+    Per-phase frame timings in a fixed-size ring buffer.
+
+    Each loop iteration calls begin(mode), then mark(phase) after every phase
+    (the time since the previous mark is charged to that phase) and end(**counts)
+    with entity counts. Phases are registered the first time they are marked.
+    While disabled every call returns straight away, so the instrumentation can
+    stay in the loops permanently.
+
+    The last 'capacity' frames can be dumped to CSV or JSONL (dump()), and
+    draw_overlay() shows rolling per-phase averages on screen, followed by
+    the lines returned by 'info' (a callable, e.g. pool and GC stats).
+    """
+    MAX_PHASES = 24
+
+    def __init__(self, capacity=3600, counters=("obstacle_count", "powerup_count", "particle_count"), enabled=False):
+        self.enabled, self.overlay = enabled, False
+        self.capacity, self.counters = capacity, tuple(counters)
+        self.phases, self._columns = [], {}
+        self.times = np.zeros((capacity, self.MAX_PHASES), np.float32)  # ms per phase
+        self.totals = np.zeros(capacity, np.float32)                    # ms per frame
+        self.counts = np.zeros((capacity, len(self.counters)), np.int32)
+        self.frame_ids = np.zeros(capacity, np.int64)
+        self.modes = [None] * capacity
+        self.head, self.size, self.frame = 0, 0, 0
+        self._start = self._last = 0.0; self._mode = None
+        self._overlay_surface, self._overlay_age = None, 0
+        self.info = None
+
+    # --- Recording ---
+    def begin(self, mode="game"):
+        if not self.enabled: return
+        self.times[self.head] = 0; self._mode = mode
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, phase, at=None):
+        """Charges the time since the previous mark (or begin) to 'phase'. 'at' is a perf_counter() timestamp."""
+        if not self.enabled or self._mode is None: return
+        now = time.perf_counter() if at is None else at
+        column = self._columns.get(phase)
+        if column is None: column = self._add_phase(phase)
+        self.times[self.head, column] += (now - self._last) * 1000; self._last = now
+
+    def end(self, **counts):
+        if not self.enabled or self._mode is None: return
+        head = self.head
+        self.totals[head] = (time.perf_counter() - self._start) * 1000
+        row = self.counts[head]
+        for i, name in enumerate(self.counters): row[i] = counts.get(name, 0)
+        self.frame_ids[head], self.modes[head] = self.frame, self._mode
+        self.frame += 1; self._mode = None
+        self.head = (head + 1) % self.capacity; self.size = min(self.size + 1, self.capacity)
+
+    def _add_phase(self, phase):
+        if phase in self.counters: raise ValueError(f"Profiler phase '{phase}' clashes with a counter")
+        if len(self.phases) == self.MAX_PHASES: raise ValueError(f"Too many profiler phases (max {self.MAX_PHASES})")
+        self._columns[phase] = len(self.phases); self.phases.append(phase)
+        return self._columns[phase]
+
+    def toggle(self):
+        """Shows/hides the overlay; recording is switched on with it (and stays on for dumps)."""
+        self.overlay = not self.overlay
+        if self.overlay: self.enabled = True
+        return self.overlay
+
+    def clear(self): self.head, self.size = 0, 0
+
+    # --- Reading ---
+    def _order(self, last=None):
+        """Ring indices of the most recent 'last' frames (default: all), oldest first."""
+        n = self.size if last is None else min(last, self.size)
+        return (np.arange(self.head - n, self.head)) % self.capacity
+
+    def summary(self, last=60):
+        """{phase: (mean_ms, max_ms)} over the last frames, plus 'frame' for the whole frame."""
+        order = self._order(last)
+        if not len(order): return {}
+        times = self.times[order]
+        result = {name: (float(times[:, i].mean()), float(times[:, i].max())) for i, name in enumerate(self.phases)}
+        totals = self.totals[order]; result["frame"] = (float(totals.mean()), float(totals.max()))
+        return result
+
+    def rows(self):
+        """Yields one dict per recorded frame, oldest first."""
+        for i in self._order():
+            row = {"frame": int(self.frame_ids[i]), "mode": self.modes[i], "total_ms": round(float(self.totals[i]), 3)}
+            row.update((name, round(float(self.times[i, c]), 3)) for c, name in enumerate(self.phases))
+            row.update((name, int(self.counts[i, c])) for c, name in enumerate(self.counters))
+            yield row
+
+    def dump(self, path):
+        """Writes the buffered frames to 'path' as JSONL if it ends in .jsonl, otherwise CSV. Returns the row count."""
+        rows = list(self.rows())
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            if path.endswith(".jsonl"):
+                for row in rows: f.write(json.dumps(row) + "\n")
+            else:
+                writer = csv.DictWriter(f, fieldnames=["frame", "mode", "total_ms", *self.phases, *self.counters])
+                writer.writeheader(); writer.writerows(rows)
+        return len(rows)
+
+    # --- Overlay ---
+    def draw_overlay(self, surface, font, pos=(8, 40), refresh=15):
+        """
+        Draws rolling timings (mean/max over the last second) and the entity
+        counts of the latest frame. The text is re-rendered every 'refresh'
+        frames and blitted from a cached surface in between.
+        """
+        self._overlay_age -= 1
+        if self._overlay_surface is None or self._overlay_age <= 0:
+            self._overlay_age = refresh
+            lines = [f"{name:<10}{mean:6.2f} {peak:6.2f}" for name, (mean, peak) in self.summary(60).items()]
+            if self.size:
+                latest = self.counts[(self.head - 1) % self.capacity]
+                lines += [f"{name:<15}{int(value):6d}" for name, value in zip(self.counters, latest)]
+            if self.info is not None: lines += self.info()
+            rendered = [font.render(line, True, (0, 255, 0)) for line in ["phase      mean    max", *lines]]
+            width = max(r.get_width() for r in rendered) + 8; height = sum(r.get_height() for r in rendered) + 8
+            panel = pygame.Surface((width, height), pygame.SRCALPHA); panel.fill((0, 0, 0, 170))
+            y = 4
+            for r in rendered: panel.blit(r, (4, y)); y += r.get_height()
+            self._overlay_surface = panel
+        surface.blit(self._overlay_surface, pos)
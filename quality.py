@@ -0,0 +1,73 @@
+from collections import deque
+
+# Detail levels, best first. max_particles caps every particle system,
+# fire_wall_particles is the emission per fire wall segment per step,
+# star_layers is how many starfield layers are drawn and scaler (when
+# set) replaces a 'smooth' presenter scaler.
+QUALITY_LEVELS = (
+    {"name": "high",   "max_particles": None, "fire_wall_particles": 3, "star_layers": 4, "scaler": None},
+    {"name": "medium", "max_particles": 400,  "fire_wall_particles": 2, "star_layers": 4, "scaler": None},
+    {"name": "low",    "max_particles": 200,  "fire_wall_particles": 1, "star_layers": 3, "scaler": None},
+    {"name": "lowest", "max_particles": 100,  "fire_wall_particles": 1, "star_layers": 2, "scaler": "integer"},
+)
+
+
+class QualityController:
+    """
+    Picks a detail level from measured frame work time (input to scaled
+    frame, without the wait for the next frame or the vsync flip).
+
+    update() is fed every frame with that frame's work and budget. When at
+    least 'degrade_ratio' of the last 'window' frames went over budget the
+    level drops one step; after 'restore_after' consecutive frames under
+    'headroom' times the budget it rises one step. The gap between the two
+    thresholds is the hysteresis. If a restored level goes over budget again
+    before 'restore_after' frames have passed, the wait before the next
+    restore doubles (up to 'max_restore_after'), so a level that doesn't fit
+    isn't retried every few seconds. A single slow frame (a modal screen, a
+    GC pause) never changes the level on its own.
+
+    With adaptive=False the level stays where set_level() put it.
+    """
+    def __init__(self, levels=QUALITY_LEVELS, level=0, adaptive=True, window=30, degrade_ratio=0.5,
+                 headroom=0.7, restore_after=180, max_restore_after=3600):
+        self.levels, self.adaptive = levels, adaptive
+        self.window, self.degrade_ratio, self.headroom = window, degrade_ratio, headroom
+        self.restore_after, self.max_restore_after = restore_after, max_restore_after
+        self.level, self.frames, self.changes = 0, 0, 0
+        self._recent, self._over, self._calm = deque(), 0, 0
+        self._restored_at = None
+        self.set_level(level)
+
+    @property
+    def settings(self): return self.levels[self.level]
+
+    def set_level(self, level):
+        if not 0 <= level < len(self.levels): raise ValueError(f"Quality level {level} out of range 0..{len(self.levels) - 1}")
+        self.level = level
+        self._recent.clear(); self._over, self._calm = 0, 0
+
+    def update(self, work_ms, budget_ms):
+        """Feeds one frame; returns True if the level changed."""
+        if not self.adaptive: return False
+        self.frames += 1
+        over = work_ms > budget_ms
+        self._recent.append(over); self._over += over
+        if len(self._recent) > self.window: self._over -= self._recent.popleft()
+        self._calm = self._calm + 1 if work_ms < budget_ms * self.headroom else 0
+
+        if self.level < len(self.levels) - 1 and len(self._recent) == self.window and self._over >= self.window * self.degrade_ratio:
+            if self._restored_at is not None and self.frames - self._restored_at < self.restore_after:
+                self.restore_after = min(self.restore_after * 2, self.max_restore_after)
+            self._restored_at = None
+            self.set_level(self.level + 1); self.changes += 1
+            return True
+        if self.level > 0 and self._calm >= self.restore_after:
+            self._restored_at = self.frames
+            self.set_level(self.level - 1); self.changes += 1
+            return True
+        return False
+
+    def stats(self):
+        return {"level": self.level, "name": self.settings["name"], "adaptive": self.adaptive,
+                "changes": self.changes, "restore_after": self.restore_after}
@@ -0,0 +1,182 @@
+import argparse
+import glob
+import json
+import struct
+import sys
+import time
+import zlib
+from simulation import DEFAULT_TUNING, FPS, GameState, questions, step
+
+# Compact game replays: the seed, the per-step input bitmask (run-length
+# encoded, board level bits included) and the quiz answers are all it takes
+# to re-run a game exactly, because the simulation is deterministic. The game
+# saves one per finished run; the verifier re-simulates them headless and
+# checks the final score.
+#
+#   python replay.py info replays/<id>.replay
+#   python replay.py verify replays/*.replay
+#   python replay.py verify run.replay --score 1234
+
+MAGIC = b"PVRP"
+VERSION = 2
+# magic, version, seed, rules checksum, steps, final score, name length
+HEADER = struct.Struct("<4sBIIIIB")
+
+
+class ReplayError(ValueError):
+    """A replay that can't be decoded or doesn't play out as recorded."""
+
+
+def rules_checksum(tuning=DEFAULT_TUNING):
+    """CRC of everything besides the inputs that decides a game: the tuning and the quiz."""
+    rules = {"tuning": tuning.as_dict(), "questions": [(len(q["options"]), q["correct"]) for q in questions]}
+    return zlib.crc32(json.dumps(rules, sort_keys=True).encode())
+
+
+def _varint(value, out):
+    while value >= 0x80: out.append(value & 0x7F | 0x80); value >>= 7
+    out.append(value)
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        if pos >= len(data): raise ReplayError("truncated input runs")
+        byte = data[pos]; pos += 1
+        value |= (byte & 0x7F) << shift; shift += 7
+        if byte < 0x80: return value, pos
+
+
+class Replay:
+    """
+    One recorded game. 'runs' is a list of [buttons, count] pairs covering
+    every simulation step in order; 'answers' are the chosen quiz options in
+    the order the questions were asked.
+    """
+    def __init__(self, seed, runs=None, answers=None, score=0, name="", rules=None):
+        self.seed, self.score, self.name = seed, score, name
+        self.runs, self.answers = runs if runs is not None else [], answers if answers is not None else []
+        self.rules = rules_checksum() if rules is None else rules
+
+    @property
+    def steps(self): return sum(count for _, count in self.runs)
+
+    def to_bytes(self):
+        name = self.name.encode()[:255]
+        runs = bytearray()
+        for buttons, count in self.runs: runs.append(buttons); _varint(count, runs)
+        return b"".join((HEADER.pack(MAGIC, VERSION, self.seed, self.rules, self.steps, int(self.score), len(name)), name,
+                         struct.pack("<H", len(self.answers)), bytes(self.answers), zlib.compress(bytes(runs), 9)))
+
+    @classmethod
+    def from_bytes(cls, data):
+        try:
+            magic, version, seed, rules, steps, score, name_len = HEADER.unpack_from(data)
+            if magic != MAGIC: raise ReplayError("not a replay")
+            if version != VERSION: raise ReplayError(f"unsupported replay version {version}")
+            pos = HEADER.size
+            name = data[pos:pos + name_len].decode(); pos += name_len
+            (answer_count,) = struct.unpack_from("<H", data, pos); pos += 2
+            answers = list(data[pos:pos + answer_count]); pos += answer_count
+            encoded = zlib.decompress(data[pos:])
+        except (struct.error, UnicodeDecodeError, zlib.error) as e:
+            raise ReplayError(f"corrupt replay: {e}") from None
+        runs, pos = [], 0
+        while pos < len(encoded):
+            buttons = encoded[pos]; count, pos = _read_varint(encoded, pos + 1)
+            runs.append([buttons, count])
+        replay = cls(seed, runs, answers, score, name, rules)
+        if replay.steps != steps: raise ReplayError(f"header says {steps} steps, runs hold {replay.steps}")
+        return replay
+
+    def save(self, path):
+        with open(path, "wb") as f: f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f: return cls.from_bytes(f.read())
+
+
+class ReplayRecorder:
+    """Builds a Replay while a game runs: call step(buttons) before every simulation step and answer(option) for every quiz answer."""
+    def __init__(self, seed, name=""):
+        self.replay = Replay(seed, name=name)
+
+    def step(self, buttons):
+        runs = self.replay.runs
+        if runs and runs[-1][0] == buttons: runs[-1][1] += 1
+        else: runs.append([buttons, 1])
+
+    def answer(self, option): self.replay.answers.append(option)
+
+    def finish(self, score):
+        self.replay.score = int(score)
+        return self.replay
+
+
+def play(replay, tuning=DEFAULT_TUNING):
+    """
+    Re-simulates a replay the way the game loop drives step(): one step per
+    recorded input, with pending questions answered right after the step
+    that raised them. Returns the final GameState.
+    """
+    state = GameState(replay.seed, tuning); answers = iter(replay.answers)
+    for buttons, count in replay.runs:
+        for _ in range(count):
+            if state.game_over: raise ReplayError(f"inputs continue after game over at step {state.game_time}")
+            step(state, buttons)
+            while state.question_queue:
+                answer = next(answers, None)
+                if answer is None: raise ReplayError(f"ran out of quiz answers at step {state.game_time}")
+                step(state, answer=answer)
+    if next(answers, None) is not None: raise ReplayError("unused quiz answers left over")
+    return state
+
+
+def verify(replay, claimed_score=None, tuning=DEFAULT_TUNING):
+    """
+    Checks that a replay is a complete game under the current rules that ends
+    with its recorded score (and 'claimed_score', e.g. the submitted one).
+    Returns (ok, message).
+    """
+    if replay.rules != rules_checksum(tuning): return False, "recorded under different rules (tuning or quiz changed)"
+    try: state = play(replay, tuning)
+    except ReplayError as e: return False, str(e)
+    score = int(state.score)
+    if not state.game_over: return False, f"game still running after {state.game_time} steps"
+    if score != replay.score: return False, f"replays to {score}, recorded {replay.score}"
+    if claimed_score is not None and score != int(claimed_score): return False, f"replays to {score}, claimed {int(claimed_score)}"
+    return True, f"score {score} after {state.game_time} steps ({state.game_time / FPS:.0f}s of play)"
+
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and verify game replays.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    info = commands.add_parser("info", help="show what a replay contains")
+    info.add_argument("paths", nargs="+")
+    check = commands.add_parser("verify", help="re-simulate replays and check their scores")
+    check.add_argument("paths", nargs="+"); check.add_argument("--score", type=int, help="score the replay was submitted with")
+    args = parser.parse_args(argv)
+
+    paths = [p for pattern in args.paths for p in (glob.glob(pattern) or [pattern])]
+    failed = 0
+    for path in paths:
+        try: replay = Replay.load(path)
+        except (OSError, ReplayError) as e:
+            print(f"{path}: {e}"); failed += 1
+            continue
+        if args.command == "info":
+            print(f"{path}: {replay.name or '?'} score {replay.score}, seed {replay.seed}, {replay.steps} steps "
+                  f"in {len(replay.runs)} input runs, {len(replay.answers)} answers, {len(replay.to_bytes())} bytes")
+            continue
+        start = time.perf_counter()
+        ok, message = verify(replay, args.score)
+        elapsed = time.perf_counter() - start
+        speed = replay.steps / FPS / elapsed if elapsed else 0
+        print(f"{path}: {'OK' if ok else 'FAILED'} {message} [{elapsed * 1000:.0f} ms, {speed:.0f}x real time]")
+        failed += not ok
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import base64
+import datetime
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from firestore_client import client_getter
+
+
+class ScoreOutbox:
+    """
+    Durable, append-only log of scores waiting to be uploaded.
+
+    Each line is a JSON record: {"op": "add", "id": ..., "name": ..., "score": ...,
+    "timestamp": ..., "replay": ...} when a score is queued (the replay, base64,
+    only when one is attached) and {"op": "done", "id": ...} once
+    it has been written to Firestore. Every append is flushed to the OS, so a
+    crash of the game loses at most the line being written; a torn final line
+    is ignored on load. add() runs on the game thread and leaves the fsync to
+    sync(), which the submitter calls from its worker thread as soon as it
+    wakes: until then a power loss (not a crash) can still lose the score.
+    Everything else is fsync'd as it is written. When nothing is pending the
+    log is truncated.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.pending = {}  # id -> record, in insertion order
+        self._unsynced = False  # add()ed lines not fsync'd yet
+        self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        if not os.path.exists(self.path): return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try: record = json.loads(line)
+                except ValueError: continue  # torn write from a crash
+                if record.get("op") == "add": self.pending[record["id"]] = record
+                elif record.get("op") == "done": self.pending.pop(record["id"], None)
+        # Rewrite the log with only the pending records so it doesn't grow forever
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in self.pending.values(): f.write(json.dumps(record) + "\n")
+            f.flush(); os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _append(self, record, sync=True):
+        self._file.write(json.dumps(record) + "\n"); self._file.flush()
+        if sync: os.fsync(self._file.fileno()); self._unsynced = False
+
+    def add(self, name, score, timestamp=None, replay=None):
+        """Queues a score (optionally with its replay bytes) and returns its document id (stable across retries)."""
+        timestamp = timestamp or datetime.datetime.now()
+        record = {"op": "add", "id": uuid.uuid4().hex, "name": name, "score": int(score), "timestamp": timestamp.isoformat()}
+        if replay is not None: record["replay"] = base64.b64encode(replay).decode("ascii")
+        with self._lock:
+            self._append(record, sync=False); self._unsynced = True; self.pending[record["id"]] = record
+        return record["id"]
+
+    def sync(self):
+        """fsyncs the scores add() has written since the last sync (for a background thread)."""
+        with self._lock:
+            if self._unsynced: os.fsync(self._file.fileno()); self._unsynced = False
+
+    def mark_done(self, ids):
+        with self._lock:
+            for doc_id in ids:
+                if self.pending.pop(doc_id, None) is not None: self._append({"op": "done", "id": doc_id})
+            if not self.pending:
+                self._file.truncate(0); os.fsync(self._file.fileno())
+
+    def peek(self, limit):
+        with self._lock: return list(self.pending.values())[:limit]
+
+    def __len__(self):
+        with self._lock: return len(self.pending)
+
+    def close(self):
+        self.sync(); self._file.close()
+
+
+class ScoreSubmitter:
+    """
+    Background worker that drains a ScoreOutbox into the Firestore 'highscores'
+    collection without ever blocking the game loop.
+
+    'client' is passed to client_getter() (see firestore_client.py). If it
+    gives None, Firebase is unavailable for this session and the worker stops
+    uploading after saying so once, leaving the scores in the outbox for the
+    next session (it still syncs newly queued ones to disk). Each score is written with document(id).set(), using the id
+    generated when it was queued, so a retry after a lost response overwrites
+    instead of duplicating. Several queued scores go out in one batch()
+    commit. Failures back off exponentially, also while new scores arrive.
+    """
+    MAX_BATCH = 500  # Firestore limit on writes per batch
+
+    def __init__(self, outbox, client, collection="highscores", base_delay=1.0, max_delay=60.0):
+        self.outbox, self.collection = outbox, collection
+        self._client = client_getter(client)
+        self.base_delay, self.max_delay = base_delay, max_delay
+        self.failures, self.submitted, self.unavailable = 0, 0, False
+        self._wake = threading.Event(); self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="score-submitter", daemon=True)
+        self._thread.start()
+
+    def submit(self, name, score, replay=None):
+        """Queues a score durably and returns immediately. 'replay' (bytes) is uploaded with it as a 'replay' field."""
+        doc_id = self.outbox.add(name, score, replay=replay)
+        self._wake.set()
+        return doc_id
+
+    def flush(self, timeout=None):
+        """Waits until the outbox is empty (or the timeout expires). Returns True if it drained."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._wake.set()
+        while len(self.outbox):
+            if self.unavailable or not self._thread.is_alive() or deadline is not None and time.monotonic() >= deadline: return False
+            time.sleep(0.05)
+        return True
+
+    def close(self, timeout=2.0):
+        """Stops the worker; the outbox is closed once it has exited."""
+        self._stop.set(); self._wake.set(); self._thread.join(timeout)
+        if not self._thread.is_alive(): self.outbox.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.outbox.sync()  # make the newly queued scores durable before anything else
+            records = self.outbox.peek(self.MAX_BATCH)
+            if not records or self.unavailable:
+                self._wake.wait(); self._wake.clear()
+                continue
+            delay = 0
+            try:
+                db = self._client()
+                if db is None:
+                    print(f"Firebase unavailable: {len(self.outbox)} score(s) stay in the outbox for the next session.")
+                    self.unavailable = True
+                    continue
+                self._write(db, records)
+            except Exception as e:
+                self.failures += 1
+                delay = min(self.max_delay, self.base_delay * 2 ** (self.failures - 1)) * random.uniform(0.5, 1.0)
+                print(f"Score submission failed ({len(records)} queued, retrying in {delay:.1f}s): {e}")
+            else:
+                self.outbox.mark_done([r["id"] for r in records])
+                self.submitted += len(records); self.failures = 0
+                for r in records: print(f"Score for {r['name']} ({r['score']}) submitted to Firebase successfully!")
+            # Only close() cuts a backoff short: new scores wait for the retry instead of forcing one
+            if delay: self._stop.wait(delay)
+
+    def _write(self, db, records):
+        collection = db.collection(self.collection)
+        def data(r):
+            doc = {'name': r['name'], 'score': r['score'], 'timestamp': datetime.datetime.fromisoformat(r['timestamp'])}
+            if 'replay' in r: doc['replay'] = base64.b64decode(r['replay'])
+            return doc
+        if len(records) == 1:
+            collection.document(records[0]['id']).set(data(records[0]))
+            return
+        batch = db.batch()
+        for r in records: batch.set(collection.document(r['id']), data(r))
+        batch.commit()
+
+    def stats(self):
+        return {"pending": len(self.outbox), "submitted": self.submitted, "failures": self.failures}
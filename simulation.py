@@ -0,0 +1,384 @@
+import datetime
+import math
+import random
+import zlib
+from collections import deque, namedtuple
+from broadphase import EntityBounds
+from pools import EntityPool
+
+# Headless, deterministic game core. Everything that affects gameplay lives
+# here: the player, obstacles, powerups, score/combo, firewall events and the
+# quiz. It has no pygame dependency, draws nothing and reads no devices;
+# game.py renders a GameState and feeds step() the player's input.
+
+# --- Constants ---
+DESIGN_WIDTH = 800
+DESIGN_HEIGHT = 600
+FPS = 60
+PLAYER_SPEED = 5
+OBSTACLE_SPEED = 3
+POWERUP_SPEED = 3
+ASTEROID_VARIANTS = 4  # shapes per asteroid size (rendering picks the shape, see game.py)
+
+# Input bits for step(). Keyboard and balance board are separate sources and
+# both move the player when set, exactly like the original main loop.
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_BOARD_LEFT = 4
+INPUT_BOARD_RIGHT = 8
+# Balance board lean strength, 2 bits above the direction bits: 0 = full speed
+# (a plain INPUT_BOARD_* press), 1..3 = 25%, 50%, 75% of PLAYER_SPEED.
+INPUT_BOARD_LEVEL_SHIFT = 4
+INPUT_BOARD_LEVEL_MASK = 3 << INPUT_BOARD_LEVEL_SHIFT
+
+
+class Tuning:
+    """
+    The hand-tuned difficulty constants. The class attributes are the shipped
+    values; pass keyword overrides to try others (see tune.py).
+    """
+    obstacle_speed = OBSTACLE_SPEED
+    speed_ramp_interval = 1000      # frames between obstacle speed increases
+    speed_ramp_step = 0.5           # speed added per interval
+    obstacle_spawn_chance = 3 / 100 # per frame, outside firewall events
+    powerup_spawn_chance = 1 / 600
+    firewall_chance = 1 / 1500
+    firewall_min_score = 200
+    max_combo_time = FPS * 1.5      # frames a graze keeps the combo from decaying
+    graze_margin = 60               # px the player rect is inflated by for grazes
+
+    def __init__(self, **overrides):
+        for name, value in overrides.items():
+            if name.startswith('_') or not hasattr(Tuning, name) or callable(getattr(Tuning, name)):
+                raise TypeError(f"Unknown tuning parameter '{name}'")
+            setattr(self, name, value)
+
+    @classmethod
+    def parameter_names(cls):
+        return [name for name, value in vars(cls).items() if not name.startswith('_') and not callable(value) and not isinstance(value, classmethod)]
+
+    def as_dict(self): return {name: getattr(self, name) for name in self.parameter_names()}
+
+DEFAULT_TUNING = Tuning()
+
+# Cybersecurity questions
+questions = [
+    {"question": "What does 'phishing' mean?", "options": ["A scam to steal personal info", "A type of fish", "A network protocol"], "correct": 0},
+    {"question": "What is a firewall?", "options": ["Blocks unauthorized access", "A wall that prevents fires", "A type of computer virus"], "correct": 0},
+    {"question": "What is a 'VPN' used for?", "options": ["Encrypting your connection", "A type of virus scan", "To speed up your PC"], "correct": 0},
+]
+
+
+class Rect:
+    """
+    The subset of pygame.Rect the simulation needs (int coordinates truncated
+    like pygame, inflate, colliderect), so it runs without pygame at all.
+    """
+    __slots__ = ('left', 'top', 'width', 'height')
+    def __init__(self, left, top, width, height):
+        self.left, self.top, self.width, self.height = int(left), int(top), int(width), int(height)
+    @property
+    def right(self): return self.left + self.width
+    @property
+    def bottom(self): return self.top + self.height
+    def inflate(self, x, y): return Rect(self.left - x // 2, self.top - y // 2, self.width + x, self.height + y)
+    def colliderect(self, other):
+        return (self.width > 0 and self.height > 0 and other.width > 0 and other.height > 0
+                and self.left < other.left + other.width and other.left < self.left + self.width
+                and self.top < other.top + other.height and other.top < self.top + self.height)
+
+
+# --- Game Object Classes ---
+# Obstacles and powerups are pooled (see pools.py): all setup lives in reset(),
+# so a recycled instance starts exactly like a new one. prev_x/prev_y hold the
+# position before the last step, for the renderer to interpolate from.
+class Player:
+    __slots__ = ('width', 'height', 'x', 'y', 'prev_x', 'speed', 'has_shield', 'tilt', 'target_tilt')
+    def __init__(self):
+        self.width, self.height = 35, 35
+        self.x, self.y = DESIGN_WIDTH // 2, DESIGN_HEIGHT - 100; self.prev_x = self.x
+        self.speed = PLAYER_SPEED
+        self.has_shield = False; self.tilt, self.target_tilt = 0, 0
+    def move(self, direction, factor=1.0):
+        if direction == "left": self.x -= self.speed * factor; self.target_tilt = 20
+        elif direction == "right": self.x += self.speed * factor; self.target_tilt = -20
+        self.x = max(self.width, min(DESIGN_WIDTH - self.width, self.x))
+    def update(self):
+        self.tilt += (self.target_tilt - self.tilt) * 0.1
+        if abs(self.tilt) < 0.1: self.tilt = 0
+        self.target_tilt = 0
+
+OBSTACLE_TYPES = ('asteroid', 'drone', 'scout')
+
+def obstacle_size(obs_type, size, width=None):
+    if obs_type == 'asteroid': return size, size
+    if obs_type == 'drone': return 45, 35
+    if obs_type == 'scout': return 25, 35
+    return width, 25  # fire_wall_segment
+
+class Obstacle:
+    __slots__ = ('is_fire_wall', 'type', 'size', 'rotation_angle', 'rotation_speed', 'anim_timer', 'variant',
+                 'width', 'height', 'x', 'y', 'prev_y', 'speed')
+    def __init__(self, *args, **kwargs): self.reset(*args, **kwargs)
+    def reset(self, game_time, obs_type=None, x_pos=None, y_pos=None, width=None, is_fire_wall=False, rng=random, tuning=DEFAULT_TUNING, spawn=None):
+        """'spawn' is a SpawnRecord from the wave schedule: it supplies every random value, so no rng is used."""
+        self.is_fire_wall = is_fire_wall
+        if spawn is not None:
+            self.type, self.size, self.rotation_angle, self.rotation_speed, self.anim_timer, self.variant = spawn.type, spawn.size, spawn.rotation, spawn.spin, spawn.anim, spawn.variant
+            self.width, self.height = obstacle_size(spawn.type, spawn.size)
+            x_pos = spawn.x
+        else:
+            self.type = obs_type if obs_type is not None else rng.choice(OBSTACLE_TYPES)
+            self.size = rng.randint(35, 60)
+            self.rotation_angle = rng.randint(0, 360); self.rotation_speed = rng.uniform(-2, 2)
+            self.anim_timer = rng.randint(0, 120)
+            self.variant = rng.randrange(ASTEROID_VARIANTS) if self.type == 'asteroid' else None
+            self.width, self.height = obstacle_size(self.type, self.size, width)
+        self.x = x_pos if x_pos is not None else rng.randint(0, DESIGN_WIDTH - self.width)
+        self.y = self.prev_y = y_pos if y_pos is not None else -self.height
+        self.speed = 4 if self.is_fire_wall else tuning.obstacle_speed + (game_time // tuning.speed_ramp_interval) * tuning.speed_ramp_step
+    def update(self):
+        self.prev_y = self.y; self.y += self.speed; self.rotation_angle = (self.rotation_angle + self.rotation_speed) % 360; self.anim_timer += 1
+    def off_screen(self): return self.y > DESIGN_HEIGHT
+
+class Powerup:
+    __slots__ = ('size', 'x', 'y', 'prev_y', 'speed', 'rotation_angle', 'glow_radius', 'glow_direction')
+    def __init__(self, rng=random, x_pos=None): self.reset(rng, x_pos)
+    def reset(self, rng=random, x_pos=None):
+        self.size = 25; self.x = x_pos if x_pos is not None else rng.randint(0, DESIGN_WIDTH - self.size)
+        self.y = self.prev_y = -self.size
+        self.speed = POWERUP_SPEED; self.rotation_angle, self.glow_radius, self.glow_direction = 0, 0, 1
+    def move(self):
+        self.prev_y = self.y; self.y += self.speed; self.rotation_angle = (self.rotation_angle + 5) % 360; self.glow_radius += self.glow_direction
+        if self.glow_radius >= 10 or self.glow_radius <= 0: self.glow_direction *= -1
+    def off_screen(self): return self.y > DESIGN_HEIGHT
+
+FIREWALL_WALLS, FIREWALL_GAP_WIDTH = 5, 140
+
+def firewall_gaps(rng):
+    """The x of each wall's gap; every gap is within 200 px of the previous one."""
+    gaps, last_gap_x = [], DESIGN_WIDTH // 2
+    for _ in range(FIREWALL_WALLS):
+        min_x = max(50, last_gap_x - 200)
+        max_x = min(DESIGN_WIDTH - FIREWALL_GAP_WIDTH - 50, last_gap_x + 200)
+        last_gap_x = rng.randint(min_x, max_x); gaps.append(last_gap_x)
+    return tuple(gaps)
+
+def start_firewall_event(obstacles_list, powerups_list, game_time, rng=random, pool=None, gaps=None):
+    obstacles_list.clear(); powerups_list.clear()
+    num_walls, gap_width = FIREWALL_WALLS, FIREWALL_GAP_WIDTH
+    last_wall = None
+    new_obstacle = pool.acquire if pool is not None else Obstacle
+    if gaps is None: gaps = firewall_gaps(rng)
+    for i, gap_x in enumerate(gaps):
+        y_pos = -100 - (i * 300)
+        left_wall = new_obstacle(game_time, obs_type='fire_wall_segment', x_pos=0, y_pos=y_pos, width=gap_x, is_fire_wall=True, rng=rng)
+        right_wall = new_obstacle(game_time, obs_type='fire_wall_segment', x_pos=gap_x + gap_width, y_pos=y_pos, width=DESIGN_WIDTH - (gap_x + gap_width), is_fire_wall=True, rng=rng)
+        obstacles_list.extend([left_wall, right_wall])
+        if i == num_walls - 1: last_wall = left_wall
+    return last_wall
+
+
+# --- Spawn schedule ---
+# Spawns are generated ahead of time from the seed instead of rolled every
+# frame. Each kind (obstacles, powerups, fire walls) is its own stream with its
+# own RNG: the frame of the next spawn is drawn from the geometric distribution
+# of the old per-frame chance, so the spawn rates are unchanged and generating
+# costs O(spawns) instead of O(frames). Spawns that fall due during a fire
+# wall event are skipped, as the per-frame rolls were, and a fire wall due
+# before the score reaches firewall_min_score is dropped.
+SpawnRecord = namedtuple('SpawnRecord', 'frame type x size rotation spin anim variant')
+SPAWN_CHUNK = FPS * 10  # frames generated per chunk
+_SPAWN_ORDER = {'obstacle': 0, 'powerup': 1, 'fire_wall': 2}  # same-frame order of the old rolls
+
+def _next_spawn(rng, frame, chance):
+    """The frame of the next event after 'frame' for a per-frame probability 'chance'."""
+    if chance <= 0: return math.inf
+    if chance >= 1: return frame + 1
+    return frame + 1 + int(math.log(1 - rng.random()) / math.log(1 - chance))
+
+def spawn_timeline(seed, tuning=DEFAULT_TUNING, chunk=SPAWN_CHUNK):
+    """
+    Lazily yields the spawn schedule of a seed, one list of SpawnRecords per
+    'chunk' frames, in frame order. Obstacle records carry all of an
+    obstacle's random values; powerups only x; a fire wall's x is the tuple
+    of its gap positions.
+    """
+    obstacle_rng, powerup_rng, firewall_rng = (random.Random(f"{seed}:{kind}") for kind in _SPAWN_ORDER)
+    next_obstacle = _next_spawn(obstacle_rng, 0, tuning.obstacle_spawn_chance)
+    next_powerup = _next_spawn(powerup_rng, 0, tuning.powerup_spawn_chance)
+    next_firewall = _next_spawn(firewall_rng, 0, tuning.firewall_chance)
+    end = 1
+    while True:
+        end += chunk; records = []
+        while next_obstacle < end:
+            rng = obstacle_rng
+            obs_type = rng.choice(OBSTACLE_TYPES); size = rng.randint(35, 60)
+            rotation, spin, anim = rng.randint(0, 360), rng.uniform(-2, 2), rng.randint(0, 120)
+            variant = rng.randrange(ASTEROID_VARIANTS) if obs_type == 'asteroid' else None
+            x = rng.randint(0, DESIGN_WIDTH - obstacle_size(obs_type, size)[0])
+            records.append(SpawnRecord(next_obstacle, obs_type, x, size, rotation, spin, anim, variant))
+            next_obstacle = _next_spawn(rng, next_obstacle, tuning.obstacle_spawn_chance)
+        while next_powerup < end:
+            records.append(SpawnRecord(next_powerup, 'powerup', powerup_rng.randint(0, DESIGN_WIDTH - 25), 25, 0, 0, 0, None))
+            next_powerup = _next_spawn(powerup_rng, next_powerup, tuning.powerup_spawn_chance)
+        while next_firewall < end:
+            records.append(SpawnRecord(next_firewall, 'fire_wall', firewall_gaps(firewall_rng), 0, 0, 0, 0, None))
+            next_firewall = _next_spawn(firewall_rng, next_firewall, tuning.firewall_chance)
+        records.sort(key=lambda r: (r.frame, _SPAWN_ORDER.get(r.type, 0)))
+        yield records
+
+class WaveScheduler:
+    """The spawn schedule of one game: due(frame) pops the records that are due by 'frame'."""
+    def __init__(self, seed, tuning=DEFAULT_TUNING, chunk=SPAWN_CHUNK):
+        self._chunks = spawn_timeline(seed, tuning, chunk)
+        self._queue, self._horizon, self.chunk = deque(), 1, chunk
+        self.next_frame = math.inf
+        self.spawned, self.skipped = 0, 0
+
+    def _fill(self, frame):
+        while self._horizon <= frame:
+            self._queue.extend(next(self._chunks)); self._horizon += self.chunk
+        self.next_frame = self._queue[0].frame if self._queue else math.inf
+
+    def due(self, frame):
+        if frame < self.next_frame and frame < self._horizon: return ()
+        self._fill(frame)
+        queue, records = self._queue, []
+        while queue and queue[0].frame <= frame: records.append(queue.popleft())
+        self.next_frame = queue[0].frame if queue else math.inf
+        self.spawned += len(records)
+        return records
+
+    def skip(self, frame):
+        """Drops the records due by 'frame' (spawns during a fire wall event)."""
+        records = self.due(frame); self.spawned -= len(records); self.skipped += len(records)
+
+
+DAILY_SEED_SALT = "neon-runner-daily"
+
+def daily_seed(date=None, curated=None):
+    """
+    The seed of a date's daily run (default today): the 'curated' mapping of
+    ISO date -> seed wins, otherwise a hash of the date, so every kiosk plays
+    the same daily game without coordination. Raises ValueError for a curated
+    seed outside 0..2**32-1 (seeds are stored as uint32 in replays).
+    """
+    date = date or datetime.date.today()
+    if curated and date.isoformat() in curated:
+        seed = curated[date.isoformat()]
+        if not isinstance(seed, int) or isinstance(seed, bool) or not 0 <= seed < 2**32:
+            raise ValueError(f"Curated seed for {date.isoformat()} must be an integer in 0..{2**32 - 1}, got {seed!r}")
+        return seed
+    return zlib.crc32(f"{DAILY_SEED_SALT}:{date.isoformat()}".encode())
+
+
+class GameState:
+    """
+    Everything one run of the game depends on. All randomness comes from
+    the seed, through the spawn schedule in self.waves and self.rng (quiz
+    questions, fire wall segments), so the same seed and inputs always replay
+    the same game.
+    """
+    def __init__(self, seed=None, tuning=DEFAULT_TUNING):
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed); self.tuning = tuning
+        self.waves = WaveScheduler(self.seed, tuning)
+        self.obstacle_pool, self.powerup_pool = EntityPool(Obstacle), EntityPool(Powerup)
+        self.player = Player()
+        self.obstacles = EntityBounds(pool=self.obstacle_pool); self.powerups = EntityBounds('size', 'size', pool=self.powerup_pool)
+        self.score, self.game_time, self.combo_multiplier, self.combo_reset_timer = 0.0, 0, 1.0, 0
+        self.game_over, self.is_firewall_event, self.last_firewall_wall, self.firewall_warning_timer = False, False, None, 0
+        # Indexes into 'questions' waiting for an answer; the world is paused while any are pending
+        self.question_queue = []
+        # (name, ...) tuples produced by the last step(), for the renderer/telemetry
+        self.events = []
+
+
+def step(state, buttons=0, answer=None):
+    """
+    Advances the game by one frame and returns the events it produced.
+
+    'buttons' is a bitmask of INPUT_* flags. While a quiz question is pending
+    the world does not advance; pass the selected option index as 'answer'
+    to resolve the oldest pending question instead (a question picked up on
+    the frame the player dies is still asked, as before).
+    """
+    events = state.events = []
+    if state.question_queue:
+        if answer is not None:
+            q_index = state.question_queue.pop(0); correct = answer == questions[q_index]["correct"]
+            if correct: state.score += 50; state.player.has_shield = True
+            events.append(('answer', q_index, answer, correct))
+        return events
+    if state.game_over: return events
+
+    player, obstacles, powerups, rng, tuning = state.player, state.obstacles, state.powerups, state.rng, state.tuning
+    state.game_time += 1
+    if state.firewall_warning_timer > 0: state.firewall_warning_timer -= 1
+    player.target_tilt = 0; player.prev_x = player.x
+    board_level = (buttons & INPUT_BOARD_LEVEL_MASK) >> INPUT_BOARD_LEVEL_SHIFT
+    board_factor = board_level / 4 if board_level else 1.0
+    if buttons & INPUT_BOARD_LEFT: player.move("left", board_factor)
+    elif buttons & INPUT_BOARD_RIGHT: player.move("right", board_factor)
+    if buttons & INPUT_LEFT: player.move("left")
+    if buttons & INPUT_RIGHT: player.move("right")
+    player.update()
+
+    if state.is_firewall_event:
+        if state.last_firewall_wall and state.last_firewall_wall.y > DESIGN_HEIGHT: state.is_firewall_event = False
+        state.waves.skip(state.game_time)
+    else:
+        for spawn in state.waves.due(state.game_time):
+            if spawn.type == 'powerup': powerups.append(state.powerup_pool.acquire(rng, spawn.x))
+            elif spawn.type != 'fire_wall':
+                obstacles.append(state.obstacle_pool.acquire(state.game_time, tuning=tuning, spawn=spawn))
+            elif state.score >= tuning.firewall_min_score:
+                state.is_firewall_event, state.firewall_warning_timer = True, 90
+                state.last_firewall_wall = start_firewall_event(obstacles, powerups, state.game_time, rng, state.obstacle_pool, spawn.x)
+                events.append(('firewall',))
+    state.score += (1 / FPS) * state.combo_multiplier
+    [obs.update() for obs in obstacles]; obstacles.sync(); obstacles.remove_off_screen(DESIGN_HEIGHT)
+    [pup.move() for pup in powerups]; powerups.sync(); powerups.remove_off_screen(DESIGN_HEIGHT)
+
+    player_rect = Rect(player.x - player.width/2, player.y, player.width, player.height)
+    graze_rect = player_rect.inflate(tuning.graze_margin, tuning.graze_margin)
+    grazed_this_frame = False
+    # Broadphase: only obstacles overlapping the graze area (which contains player_rect) are tested
+    shielded_hits = []
+    for i in obstacles.query(graze_rect):
+        obs = obstacles[i]
+        if player_rect.colliderect(Rect(obs.x, obs.y, obs.width, obs.height)):
+            if player.has_shield:
+                shielded_hits.append(obs); player.has_shield = False; events.append(('shield_hit', obs.type))
+            else:
+                state.game_over = True; events.append(('game_over', obs.type))
+        elif not state.is_firewall_event:
+            state.combo_multiplier = min(5.0, state.combo_multiplier + 0.05); state.combo_reset_timer = tuning.max_combo_time
+            grazed_this_frame = True; events.append(('graze', state.combo_multiplier))
+    if shielded_hits: obstacles.discard(shielded_hits)
+    if not grazed_this_frame and not state.is_firewall_event:
+        state.combo_reset_timer -= 1
+        if state.combo_reset_timer <= 0: state.combo_multiplier = max(1.0, state.combo_multiplier - 0.05)
+    collected = [powerups[i] for i in powerups.query(player_rect)]
+    for pup in collected:
+        events.append(('powerup', pup.x + pup.size/2, pup.y + pup.size/2))
+        state.question_queue.append(rng.randrange(len(questions)))
+    if collected: powerups.discard(collected)
+    return events
+
+
+def simulate(seed, policy, answer_policy=None, max_frames=FPS * 60 * 10, tuning=DEFAULT_TUNING):
+    """
+    Runs one game headless until game over (or max_frames) and returns the
+    final GameState. policy(state) returns the INPUT_* bitmask for each frame;
+    answer_policy(state, question) returns the chosen option (default: correct).
+    """
+    state = GameState(seed, tuning)
+    while (not state.game_over or state.question_queue) and state.game_time < max_frames:
+        if state.question_queue:
+            q = questions[state.question_queue[0]]
+            step(state, answer=answer_policy(state, q) if answer_policy else q["correct"])
+        else:
+            step(state, policy(state))
+    return state
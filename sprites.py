@@ -0,0 +1,44 @@
+from collections import OrderedDict
+
+
+def quantize(value, step):
+    """Snaps a rotation angle / animation value to the nearest multiple of step."""
+    return round(value / step) * step
+
+
+class SpriteCache:
+    """
+    LRU cache of pre-rendered surfaces. Keys are hashable tuples such as
+    ('ship', tilt) and values are built on a miss by calling factory(*args).
+    The hit/miss counters make it easy to check that steady-state frames
+    render without allocating any new surfaces (misses stop increasing).
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits, self.misses, self.evictions = 0, 0, 0
+
+    def __len__(self): return len(self._entries)
+
+    def __contains__(self, key): return key in self._entries
+
+    def get(self, key, factory, *args):
+        entries = self._entries
+        surface = entries.get(key)
+        if surface is not None:
+            self.hits += 1; entries.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = entries[key] = factory(*args)
+        if len(entries) > self.max_entries:
+            entries.popitem(last=False); self.evictions += 1
+        return surface
+
+    def clear(self): self._entries.clear()
+
+    def reset_stats(self): self.hits, self.misses, self.evictions = 0, 0, 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": self.hits / lookups if lookups else 0.0}
@@ -0,0 +1,86 @@
+import numpy as np
+import pygame
+from presentation import to_display_format
+
+TRANSPARENT = (0, 0, 0)  # colour key of the layer tiles (the background colour must differ)
+
+
+class Starfield:
+    """
+    Parallax starfield made of a few pre-rendered layers.
+
+    Stars get random positions and speeds in NumPy arrays and are grouped
+    into 'layers' speed bands; every star in a band scrolls at the band's
+    mean speed. Each layer is drawn once onto a tile 'tile_screens' screens
+    tall (stars crossing the seam are drawn on both edges, so it wraps
+    cleanly), and a frame is just two blits per layer at the layer's scroll
+    offset. The slowest layer is opaque and includes the background, so no
+    separate fill is needed; the others are colour-keyed and RLE encoded.
+    The cost depends on the number of layers, not on 'count' (the stars
+    visible on one screen), so the field can hold thousands of stars.
+
+    Brightness and size follow speed like the original per-star drawing
+    (100 + speed * 75 grey, radius int(speed)); radius-0 stars are single pixels.
+    """
+    def __init__(self, width, height, count=150, layers=4, speed=(0.5, 2.0), background=(10, 10, 10), tile_screens=2, seed=None):
+        self.width, self.height, self.layers = width, height, layers
+        self.speed_range, self.background = speed, background
+        self.tile_height = height * tile_screens
+        self.rng = np.random.default_rng(seed)
+        self.set_count(count)
+
+    def set_count(self, count):
+        """Re-seeds the field with 'count' stars per screen (the tiles are re-rendered on the next draw)."""
+        self.count = count
+        total = count * self.tile_height // self.height
+        low, high = self.speed_range
+        self.x = self.rng.integers(0, self.width, total)
+        self.y = self.rng.integers(0, self.tile_height, total)
+        speed = self.rng.uniform(low, high, total)
+        self.layer = np.minimum(((speed - low) / (high - low) * self.layers).astype(np.int32), self.layers - 1)
+        band_centers = low + (np.arange(self.layers) + 0.5) * (high - low) / self.layers
+        counts = np.bincount(self.layer, minlength=self.layers)
+        sums = np.bincount(self.layer, weights=speed, minlength=self.layers)
+        self.speeds = np.where(counts > 0, sums / np.maximum(counts, 1), band_centers)
+        self.offsets = np.zeros(self.layers)
+        self.tiles = None
+
+    def update(self, steps=1):
+        """Scrolls every layer by 'steps' simulation steps."""
+        self.offsets = (self.offsets + self.speeds * steps) % self.tile_height
+
+    def _render_layer(self, index):
+        speed = self.speeds[index]
+        brightness = int(100 + speed * 75); color = (brightness, brightness, brightness); radius = int(speed)
+        opaque = index == 0
+        tile = pygame.Surface((self.width, self.tile_height), 0, 32)
+        tile.fill(self.background if opaque else TRANSPARENT)
+        members = self.layer == index
+        xs, ys = self.x[members], self.y[members]
+        if radius == 0:
+            pixels = pygame.surfarray.pixels2d(tile); pixels[xs, ys] = tile.map_rgb(color); del pixels
+        else:
+            sprite = pygame.Surface((radius * 2 + 1, radius * 2 + 1), 0, 32)
+            key = (1, 1, 1) if opaque else TRANSPARENT
+            sprite.fill(key); sprite.set_colorkey(key)
+            pygame.draw.circle(sprite, color, (radius, radius), radius)
+            # Stars within 'radius' of the top or bottom edge are also drawn across the seam
+            wrap_up, wrap_down = ys < radius, ys >= self.tile_height - radius
+            xs = np.concatenate((xs, xs[wrap_up], xs[wrap_down])) - radius
+            ys = np.concatenate((ys, ys[wrap_up] + self.tile_height, ys[wrap_down] - self.tile_height)) - radius
+            tile.blits([(sprite, pos) for pos in zip(xs.tolist(), ys.tolist())], doreturn=False)
+        tile = to_display_format(tile)
+        if not opaque: tile.set_colorkey(TRANSPARENT, pygame.RLEACCEL)
+        return tile
+
+    def draw(self, surface, layers=None):
+        """
+        Draws the field over the whole surface. With 'layers' below the layer
+        count only the background layer and the fastest layers are drawn.
+        """
+        if self.tiles is None: self.tiles = [self._render_layer(i) for i in range(self.layers)]
+        shown = range(self.layers) if layers is None or layers >= self.layers else [0, *range(self.layers - layers + 1, self.layers)]
+        tile_height = self.tile_height
+        for i in shown:
+            y = int(self.offsets[i]); tile = self.tiles[i]
+            surface.blits(((tile, (0, y)), (tile, (0, y - tile_height))), doreturn=False)
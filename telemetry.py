@@ -0,0 +1,175 @@
+import datetime
+import glob
+import gzip
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from firestore_client import client_getter
+
+# Gameplay telemetry. The game loop only appends events to a bounded
+# in-memory buffer; a background thread writes them in batches to rotating,
+# gzip-compressed JSONL files and, optionally, uploads finished files.
+#
+# Each line is {"t": unix time, "event": name, ...fields}. Files are named
+# telemetry-<session>-<n>.jsonl.gz and every batch is appended as its own gzip
+# member, so a file is readable (gzip.open / zcat) even if the game dies
+# mid-session.
+
+
+class Telemetry:
+    """
+    record() is safe to call from the game loop: it appends to a deque and
+    returns (no lock, no I/O). When the buffer holds 'capacity' events the
+    oldest are dropped and counted, so memory stays bounded even if the disk
+    stalls. The writer thread flushes every 'flush_interval' seconds (or
+    sooner once 'batch_size' events are waiting), starts a new file when the
+    current one reaches 'max_file_bytes' and deletes the oldest files beyond
+    'max_files'.
+
+    'uploader' is an optional callable(path) -> bool run on the writer thread
+    for every finished file (including ones left by earlier sessions); a file
+    is deleted once its upload succeeds and retried later otherwise.
+    """
+    def __init__(self, directory, capacity=8192, batch_size=512, flush_interval=2.0,
+                 max_file_bytes=256 * 1024, max_files=50, uploader=None, retry_interval=60.0):
+        self.directory, self.capacity, self.batch_size = directory, capacity, batch_size
+        self.flush_interval, self.max_file_bytes, self.max_files = flush_interval, max_file_bytes, max_files
+        self.uploader, self.retry_interval = uploader, retry_interval
+        self.session = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        self.buffer = deque(maxlen=capacity)
+        self.recorded, self.dropped, self.written, self.uploaded, self.upload_failures = 0, 0, 0, 0, 0
+        self.error = None
+        self._file_index, self._next_upload = 0, 0.0
+        self._wake, self._stop = threading.Event(), threading.Event()
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+
+    def record(self, event, **fields):
+        """Queues one event; never blocks."""
+        fields["t"], fields["event"] = round(time.time(), 3), event
+        if len(self.buffer) == self.capacity: self.dropped += 1
+        self.buffer.append(fields); self.recorded += 1
+        if len(self.buffer) >= self.batch_size: self._wake.set()
+
+    def close(self, timeout=2.0):
+        """Stops the writer after a final flush."""
+        self._stop.set(); self._wake.set(); self._thread.join(timeout)
+
+    # --- Writer thread ---
+    def _path(self, index): return os.path.join(self.directory, f"telemetry-{self.session}-{index:04d}.jsonl.gz")
+
+    def _run(self):
+        while True:
+            stopping = self._stop.is_set()
+            try:
+                self._flush()
+                if self.uploader is not None and (stopping or time.monotonic() >= self._next_upload): self._upload()
+            except Exception as e:  # a full disk or a bad uploader must not kill the thread
+                self.error = e
+            if stopping: return
+            self._wake.wait(self.flush_interval); self._wake.clear()
+
+    def _flush(self):
+        buffer, lines = self.buffer, []
+        while buffer:
+            try: lines.append(json.dumps(buffer.popleft(), separators=(",", ":")))
+            except IndexError: break
+        if not lines: return
+        path = self._path(self._file_index)
+        if os.path.exists(path) and os.path.getsize(path) >= self.max_file_bytes:
+            self._file_index += 1; path = self._path(self._file_index)
+            self._prune()
+        with gzip.open(path, "ab") as f: f.write(("\n".join(lines) + "\n").encode())
+        self.written += len(lines)
+
+    def _finished_files(self):
+        """Telemetry files no writer is appending to any more, oldest first."""
+        current = self._path(self._file_index)
+        return [p for p in sorted(glob.glob(os.path.join(self.directory, "telemetry-*.jsonl.gz"))) if p != current]
+
+    def _prune(self):
+        files = self._finished_files()
+        for path in files[:max(0, len(files) + 1 - self.max_files)]: os.remove(path)
+
+    def _upload(self):
+        for path in self._finished_files() + ([self._path(self._file_index)] if self._stop.is_set() else []):
+            if not os.path.exists(path): continue
+            try: ok = self.uploader(path)
+            except Exception as e: ok = False; print(f"Telemetry upload failed: {e}")
+            if not ok:
+                self.upload_failures += 1; self._next_upload = time.monotonic() + self.retry_interval
+                return
+            os.remove(path); self.uploaded += 1
+
+    def stats(self):
+        return {"buffered": len(self.buffer), "recorded": self.recorded, "dropped": self.dropped,
+                "written": self.written, "uploaded": self.uploaded, "upload_failures": self.upload_failures}
+
+
+def read_events(path):
+    """Yields the events of one telemetry file (stops quietly at a torn final batch)."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try: yield json.loads(line)
+                except ValueError: return
+    except (EOFError, gzip.BadGzipFile):
+        return
+
+
+def firestore_uploader(client, collection="telemetry"):
+    """
+    Uploader that stores each telemetry file as one Firestore document (the
+    compressed bytes plus its event count), named after the file so a retry
+    overwrites instead of duplicating. 'client' is passed to client_getter()
+    (see firestore_client.py); while it gives None the upload is retried later.
+    """
+    get_client = client_getter(client)
+    def upload(path):
+        db = get_client()
+        if db is None: return False
+        with open(path, "rb") as f: data = f.read()
+        name = os.path.basename(path)
+        db.collection(collection).document(name).set({"file": name, "events": sum(1 for _ in read_events(path)),
+                                                      "data": data, "uploaded": datetime.datetime.now()})
+        return True
+    return upload
+
+
+class GameTelemetry:
+    """
+    Turns one game's simulation events into telemetry: powerup pickups, quiz
+    answers, shield hits, fire wall starts and survivals and the cause of
+    death, plus a summary at the end with the graze count and combo peak.
+    Grazes are only counted, since they fire every frame of a close pass.
+    """
+    def __init__(self, telemetry, game_id, **start_fields):
+        self.telemetry, self.game_id = telemetry, game_id
+        self.grazes, self.combo_peak, self.firewalls, self.in_firewall = 0, 1.0, 0, False
+        telemetry.record("game_start", game=game_id, **start_fields)
+
+    def on_step(self, state, events):
+        record, game_id = self.telemetry.record, self.game_id
+        for event in events:
+            name = event[0]
+            if name == 'graze':
+                self.grazes += 1
+                if event[1] > self.combo_peak: self.combo_peak = event[1]
+            elif name == 'powerup': record("powerup", game=game_id, frame=state.game_time)
+            elif name == 'answer': record("answer", game=game_id, question=event[1], option=event[2], correct=event[3])
+            elif name == 'shield_hit': record("shield_hit", game=game_id, frame=state.game_time, obstacle=event[1])
+            elif name == 'firewall':
+                self.firewalls += 1; record("firewall_start", game=game_id, frame=state.game_time, score=int(state.score))
+            elif name == 'game_over':
+                record("death", game=game_id, frame=state.game_time, cause=event[1], in_firewall=state.is_firewall_event, score=int(state.score))
+        if self.in_firewall and not state.is_firewall_event and not state.game_over:
+            record("firewall_survived", game=game_id, frame=state.game_time)
+        self.in_firewall = state.is_firewall_event
+
+    def end(self, state):
+        self.telemetry.record("game_end", game=self.game_id, score=int(state.score), frames=state.game_time,
+                              grazes=self.grazes, combo_peak=round(self.combo_peak, 2), firewalls=self.firewalls)
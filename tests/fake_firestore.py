@@ -0,0 +1,84 @@
+import threading
+
+
+class FakeFirestore:
+    """
+    In-memory stand-in for the parts of the Firestore client the game uses:
+    collection(name).document(id).set(data), batch() -> set(ref, data) /
+    commit() and collection(name).order_by(field)[.order_by(field)]
+    .start_after({field: value} or snapshot).limit(n).stream(). 'collections' maps a collection name to
+    {document id: data}; 'queries' counts the streamed queries.
+
+    fail_writes makes that many of the next writes raise; with apply_failed
+    the write lands before the error, like a commit whose response was lost.
+    """
+    def __init__(self):
+        self.collections, self.writes, self.queries = {}, 0, 0
+        self.fail_writes, self.apply_failed = 0, False
+        self._lock = threading.Lock()
+
+    def collection(self, name): return FakeCollection(self, name)
+
+    def batch(self): return FakeBatch(self)
+
+    def docs(self, name): return self.collections.get(name, {})
+
+    def _commit(self, writes):
+        with self._lock:
+            self.writes += 1
+            failing = self.fail_writes > 0
+            if failing: self.fail_writes -= 1
+            if not failing or self.apply_failed:
+                for ref, data in writes: self.collections.setdefault(ref.collection, {})[ref.id] = dict(data)
+            if failing: raise ConnectionError("simulated network failure")
+
+
+class FakeCollection:
+    def __init__(self, db, name): self.db, self.name = db, name
+
+    def document(self, doc_id): return FakeDocument(self.db, self.name, doc_id)
+
+    def order_by(self, field): return FakeQuery(self.db, self.name, (field,))
+
+
+class FakeQuery:
+    """Orders by 'fields' ("__name__" is the document id); start_after takes a {field: value} prefix or a snapshot."""
+    def __init__(self, db, collection, fields, after=None, count=None):
+        self.db, self.collection, self.fields, self.after, self.count = db, collection, fields, after, count
+
+    def _key(self, doc_id, data): return tuple(doc_id if field == "__name__" else data[field] for field in self.fields)
+
+    def order_by(self, field): return FakeQuery(self.db, self.collection, self.fields + (field,), self.after, self.count)
+
+    def start_after(self, values):
+        if isinstance(values, FakeSnapshot): after = self._key(values.id, values.to_dict())
+        else: after = tuple(values[field] for field in self.fields[:len(values)])
+        return FakeQuery(self.db, self.collection, self.fields, after, self.count)
+
+    def limit(self, count): return FakeQuery(self.db, self.collection, self.fields, self.after, count)
+
+    def stream(self):
+        self.db.queries += 1
+        docs = sorted(self.db.docs(self.collection).items(), key=lambda item: self._key(*item))
+        if self.after is not None: docs = [item for item in docs if self._key(*item)[:len(self.after)] > self.after]
+        return [FakeSnapshot(doc_id, data) for doc_id, data in docs[:self.count]]
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data): self.id, self._data = doc_id, data
+
+    def to_dict(self): return dict(self._data)
+
+
+class FakeDocument:
+    def __init__(self, db, collection, doc_id): self.db, self.collection, self.id = db, collection, doc_id
+
+    def set(self, data): self.db._commit([(self, data)])
+
+
+class FakeBatch:
+    def __init__(self, db): self.db, self.writes = db, []
+
+    def set(self, ref, data): self.writes.append((ref, data))
+
+    def commit(self): self.db._commit(self.writes)
@@ -0,0 +1,58 @@
+import time
+from balance_board import (ABS_HAT0X, EV_ABS, EV_SYN, BalanceBoard, Calibration, CalibrationStore, Calibrator,
+                           EventRecorder, ReplaySource, SampleRing, load_recording, synthetic_events)
+
+
+def test_sample_ring_wraps_and_counts_overruns():
+    ring = SampleRing(capacity=4)
+    for i in range(3): ring.push(i)
+    assert ring.drain() == [0, 1, 2] and ring.drain() == []
+    for i in range(3, 6): ring.push(i)  # wraps around the end of the slots
+    assert ring.drain() == [3, 4, 5]
+    for i in range(6, 16): ring.push(i)  # 10 behind with room for 4: the oldest 6 are lost
+    assert ring.drain() == [12, 13, 14, 15] and ring.overruns == 6
+
+
+def sway(balance, total=4000):
+    right, left = total * (1 + balance) / 2, total * (1 - balance) / 2
+    return (0.0, right / 2, left / 2, right / 2, left / 2)  # (t, tr, tl, br, bl)
+
+
+def test_calibrator_maps_the_riders_leans_to_full_scale(tmp_path):
+    calibrator = Calibrator()
+    calibrator.add("center", [sway(0.1)] * 20)
+    calibrator.add("left", [sway(-0.3)] * 20); calibrator.add("right", [sway(0.5)] * 20)
+    calibration = calibrator.result()
+    assert calibration.lean(*sway(0.1)[1:]) == 0.0
+    assert calibration.lean(*sway(-0.3)[1:]) == -1.0 and calibration.lean(*sway(0.5)[1:]) == 1.0
+    assert calibration.lean(*sway(0.1, total=calibration.min_weight / 2)[1:]) == 0.0  # nobody on the board
+
+    store = CalibrationStore(str(tmp_path / "calibration.json")); store.put("AAA", calibration)
+    reloaded = CalibrationStore(str(tmp_path / "calibration.json")).get("AAA")
+    assert reloaded.as_dict() == calibration.as_dict()
+    assert CalibrationStore(str(tmp_path / "missing.json")).get("AAA") is None
+
+
+def test_calibrator_rejects_leans_that_dont_separate():
+    calibrator = Calibrator()
+    for stage in Calibrator.STAGES: calibrator.add(stage, [sway(0.0)] * 10)
+    assert calibrator.result() is None
+    assert Calibrator().result() is None
+
+
+def test_recording_replays_the_same_samples(tmp_path):
+    path = str(tmp_path / "board.jsonl")
+    events = synthetic_events(2, seed=3)
+    recorder = EventRecorder(path)
+    for event in events: recorder.write(*event)
+    recorder.write(events[-1][0] + 0.01, EV_ABS, ABS_HAT0X, 1)  # half-written sample, no EV_SYN
+    recorder.close()
+    recorded = load_recording(path)
+    assert [event[1:] for event in recorded[:-1]] == [event[1:] for event in events]
+
+    board = BalanceBoard(ReplaySource(recorded, realtime=False), Calibration()).start()
+    deadline = time.monotonic() + 5
+    while board.running() and time.monotonic() < deadline: time.sleep(0.01)
+    samples = board.drain_samples()
+    assert len(samples) == sum(1 for event in events if event[1] == EV_SYN) + 1  # plus the failsafe
+    assert samples[-1][1:] == (0, 0, 0, 0)
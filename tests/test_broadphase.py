@@ -0,0 +1,54 @@
+import random
+import numpy as np
+from broadphase import EntityBounds
+from pools import EntityPool
+from simulation import INPUT_LEFT, INPUT_RIGHT, GameState, Rect, questions, step
+
+
+class Box:
+    def __init__(self, x, y, width, height): self.x, self.y, self.width, self.height = x, y, width, height
+    def off_screen(self): return self.y > 600
+
+
+def brute_force(items, rect, width_attr='width', height_attr='height'):
+    return [i for i, item in enumerate(items)
+            if rect.colliderect(Rect(item.x, item.y, getattr(item, width_attr), getattr(item, height_attr)))]
+
+
+class BruteForceBounds(EntityBounds):
+    """EntityBounds with query() replaced by a colliderect over every entity, as the reference."""
+    def query(self, rect): return brute_force(self.items, rect, self.width_attr, self.height_attr)
+
+
+def test_query_matches_colliderect_over_random_add_move_remove():
+    rng = random.Random(7); pool = EntityPool(Box)
+    bounds = EntityBounds(capacity=4, pool=pool)
+    for frame in range(2000):
+        for _ in range(rng.randrange(3)):
+            bounds.append(Box(rng.uniform(-20, 780), rng.uniform(-80, 0), rng.randrange(0, 60), rng.randrange(0, 60)))
+        for item in bounds: item.y += rng.uniform(0, 12)
+        bounds.sync(); bounds.remove_off_screen(600)
+        if bounds and rng.random() < 0.2: bounds.discard(rng.sample(bounds.items, rng.randrange(1, min(4, len(bounds)) + 1)))
+        if rng.random() < 0.01: bounds.keep(np.array([rng.random() < 0.5 for _ in bounds], bool))
+        rect = Rect(rng.uniform(-50, 800), rng.uniform(-50, 650), rng.randrange(0, 200), rng.randrange(0, 200))
+        assert bounds.query(rect) == brute_force(bounds.items, rect)
+        assert all(item.y <= 600 for item in bounds)
+    assert pool.released > 0
+
+
+def test_step_events_match_brute_force_collisions():
+    for seed in (1, 2, 3):
+        fast, reference = GameState(seed), GameState(seed)
+        for bounds in (reference.obstacles, reference.powerups): bounds.__class__ = BruteForceBounds
+        rng = random.Random(seed); counts = {}
+        for frame in range(6000):
+            if frame % 400 == 0: fast.player.has_shield = reference.player.has_shield = True
+            buttons = rng.choice((0, INPUT_LEFT, INPUT_RIGHT))
+            for state in (fast, reference):
+                while state.question_queue: step(state, answer=questions[state.question_queue[0]]["correct"])
+            events = step(fast, buttons)
+            assert events == step(reference, buttons)
+            for event in events: counts[event[0]] = counts.get(event[0], 0) + 1
+            fast.game_over = reference.game_over = False  # keep colliding
+        assert counts.get('graze', 0) > 0 and counts.get('shield_hit', 0) > 0 and counts.get('game_over', 0) > 0
+        assert fast.score == reference.score
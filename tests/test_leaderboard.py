@@ -0,0 +1,63 @@
+import datetime
+import random
+from fake_firestore import FakeFirestore
+from leaderboard import Leaderboard, LeaderboardSync
+
+BASE = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def add_score(db, doc_id, name, score, seconds):
+    db.collections.setdefault("highscores", {})[doc_id] = {"name": name, "score": score, "timestamp": BASE + datetime.timedelta(seconds=seconds)}
+
+
+def expected_top(db, size=10):
+    best = {}
+    for doc in db.docs("highscores").values(): best[doc["name"]] = max(best.get(doc["name"], -1), doc["score"])
+    return [(name, score) for score, name in sorted(((s, n) for n, s in best.items()), reverse=True)[:size]]
+
+
+def test_sync_30k_scores_matches_brute_force(tmp_path):
+    rng = random.Random(1); db = FakeFirestore()
+    names = ["".join(rng.choice("ABCDEFGHIJ") for _ in range(4)) for _ in range(20000)]
+    for i in range(30000): add_score(db, f"doc{i}", rng.choice(names), rng.randrange(5000), i)
+    board = Leaderboard(); sync = LeaderboardSync(board, db, str(tmp_path / "leaderboard.json"), start=False)
+    assert sync.sync(db) == 30000
+    assert db.queries == 30000 // sync.page_size + 1
+    assert board.top() == expected_top(db)
+    name, score = board.top()[3]
+    assert board.rank(name) == 1 + sum(1 for s, _ in board.best.values() if s > score)
+
+
+def test_incremental_sync_reads_overlap_and_late_scores(tmp_path):
+    db = FakeFirestore(); path = str(tmp_path / "leaderboard.json")
+    for i in range(1000): add_score(db, f"doc{i}", f"P{i}", i, i * 600)  # one score every 10 minutes
+    board = Leaderboard(); sync = LeaderboardSync(board, db, path, start=False)
+    sync.sync(db); sync.save()
+    # A kiosk's outbox flushes a score timestamped an hour before the newest one, plus a new score
+    add_score(db, "late", "LATE", 99999, 999 * 600 - 3600)
+    add_score(db, "new", "NEWW", 88888, 1000 * 600)
+    board, cursor = Leaderboard.load(path)
+    sync = LeaderboardSync(board, db, path, cursor, start=False)
+    assert sync.sync(db) == 24 * 6 + 2  # the last day of scores again plus the two new ones
+    assert board.top()[:2] == [("LATE", 99999), ("NEWW", 88888)]
+    assert board.top() == expected_top(db)
+    sync.save()
+    reloaded, cursor = Leaderboard.load(path)
+    assert reloaded.top() == board.top() and cursor == (BASE + datetime.timedelta(seconds=600000)).isoformat()
+
+
+def test_sync_pages_through_runs_of_equal_timestamps(tmp_path):
+    db = FakeFirestore()
+    for i in range(1200): add_score(db, f"doc{i:04d}", f"P{i}", i, 0)  # more than a page at one timestamp
+    for i in range(30): add_score(db, f"late{i:02d}", f"L{i}", 5000 + i, 60)
+    board = Leaderboard(size=2000); sync = LeaderboardSync(board, db, str(tmp_path / "leaderboard.json"), page_size=500, start=False)
+    assert sync.sync(db) == 1230
+    assert len(board) == 1230 and board.top() == expected_top(db, size=2000)
+
+
+def test_close_saves_local_changes(tmp_path):
+    path = str(tmp_path / "leaderboard.json")
+    board = Leaderboard(); sync = LeaderboardSync(board, lambda: None, path, start=False)
+    board.add("AAA", 100, BASE.isoformat())
+    sync.close()
+    assert Leaderboard.load(path)[0].top() == [("AAA", 100)]
@@ -0,0 +1,38 @@
+import gc
+import random
+from pools import EntityPool, GCController
+from simulation import Obstacle, Powerup
+
+
+def fields(item): return {name: getattr(item, name) for name in type(item).__slots__}
+
+
+def test_reused_entities_match_fresh_ones():
+    pool = EntityPool(Obstacle)
+    for _ in range(5):
+        obs = pool.acquire(600, rng=random.Random(1))
+        for _ in range(50): obs.update()
+        pool.release(obs)
+    assert pool.created == 1 and pool.reused == 4
+    assert fields(pool.acquire(1200, rng=random.Random(2))) == fields(Obstacle(1200, rng=random.Random(2)))
+    pups = EntityPool(Powerup); pup = pups.acquire(random.Random(3))
+    for _ in range(30): pup.move()
+    pups.release(pup)
+    assert fields(pups.acquire(random.Random(4))) == fields(Powerup(random.Random(4)))
+
+
+def test_free_list_is_bounded():
+    pool = EntityPool(Powerup, max_free=2)
+    items = [pool.acquire(random.Random(i)) for i in range(3)]
+    for item in items: pool.release(item)
+    assert len(pool.free) == 2 and pool.stats()["dropped"] == 1
+
+
+def test_manual_gc_mode_defers_collection_to_between_games():
+    controller = GCController('manual')
+    try:
+        controller.game_started(); assert not gc.isenabled()
+        controller.game_ended(); assert gc.isenabled()
+        assert controller.stats()["collections"] >= 1
+    finally:
+        gc.enable(); gc.callbacks.remove(controller._callback)
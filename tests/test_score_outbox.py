@@ -0,0 +1,78 @@
+import os
+import threading
+import time
+from fake_firestore import FakeFirestore
+from score_outbox import ScoreOutbox, ScoreSubmitter
+
+
+def test_retry_after_lost_response_does_not_duplicate(tmp_path):
+    db = FakeFirestore(); db.fail_writes, db.apply_failed = 1, True
+    submitter = ScoreSubmitter(ScoreOutbox(str(tmp_path / "outbox.jsonl")), db, base_delay=0.01)
+    ids = [submitter.submit(name, score) for name, score in (("AAA", 100), ("BBB", 250), ("CCC", 75))]
+    assert submitter.flush(timeout=5)
+    submitter.close()
+    docs = db.docs("highscores")
+    assert sorted(docs) == sorted(ids)
+    assert {doc["name"]: doc["score"] for doc in docs.values()} == {"AAA": 100, "BBB": 250, "CCC": 75}
+    assert db.writes >= 2 and submitter.failures == 0
+
+
+def test_outbox_replay_after_restart_is_idempotent(tmp_path):
+    path = str(tmp_path / "outbox.jsonl")
+    # The first session's batch reaches Firestore but the response is lost, then the game quits
+    db = FakeFirestore(); db.fail_writes, db.apply_failed = 1, True
+    outbox = ScoreOutbox(path)
+    ids = [outbox.add("AAA", score) for score in (10, 20, 30)]
+    submitter = ScoreSubmitter(outbox, db, base_delay=60)
+    deadline = time.monotonic() + 5
+    while submitter.failures == 0 and time.monotonic() < deadline: time.sleep(0.01)
+    submitter.close()
+    assert len(outbox) == 3
+    assert len(db.docs("highscores")) == 3
+    # The next session replays the outbox with the same document ids
+    outbox = ScoreOutbox(path)
+    assert sorted(r["id"] for r in outbox.peek(10)) == sorted(ids)
+    submitter = ScoreSubmitter(outbox, db)
+    assert submitter.flush(timeout=5)
+    submitter.close()
+    assert sorted(db.docs("highscores")) == sorted(ids)
+    assert len(ScoreOutbox(path)) == 0
+
+
+def test_stops_when_firebase_is_unavailable(tmp_path):
+    path = str(tmp_path / "outbox.jsonl")
+    calls = []
+    def no_client(): calls.append(1); return None
+    submitter = ScoreSubmitter(ScoreOutbox(path), no_client)
+    submitter.submit("AAA", 100)
+    assert not submitter.flush(timeout=5)
+    submitter.close()
+    assert len(calls) == 1
+    assert len(ScoreOutbox(path)) == 1
+
+
+def test_new_scores_do_not_cut_the_backoff_short(tmp_path):
+    db = FakeFirestore(); db.fail_writes = 1
+    submitter = ScoreSubmitter(ScoreOutbox(str(tmp_path / "outbox.jsonl")), db, base_delay=60)
+    submitter.submit("AAA", 100)
+    deadline = time.monotonic() + 5
+    while submitter.failures == 0 and time.monotonic() < deadline: time.sleep(0.01)
+    for score in (200, 300): submitter.submit("BBB", score); time.sleep(0.05)
+    assert db.writes == 1 and len(submitter.outbox) == 3
+    submitter.close()
+
+
+def test_submit_leaves_the_fsync_to_the_worker(tmp_path, monkeypatch):
+    real_fsync, fsync_threads = os.fsync, []
+    def fsync(fd): fsync_threads.append(threading.current_thread().name); real_fsync(fd)
+    monkeypatch.setattr(os, "fsync", fsync)
+    path = str(tmp_path / "outbox.jsonl")
+    submitter = ScoreSubmitter(ScoreOutbox(path), lambda: None)
+    submitter.submit("AAA", 100); fsync_threads.clear()
+    submitter.submit("BBB", 200)
+    assert threading.current_thread().name not in fsync_threads
+    deadline = time.monotonic() + 5
+    while "score-submitter" not in fsync_threads and time.monotonic() < deadline: time.sleep(0.01)
+    assert "score-submitter" in fsync_threads
+    submitter.close()
+    assert len(ScoreOutbox(path)) == 2
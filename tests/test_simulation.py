@@ -0,0 +1,26 @@
+import datetime
+import pytest
+from replay import Replay, ReplayRecorder
+from simulation import GameState, daily_seed, step
+
+DAY = datetime.date(2026, 12, 24)
+
+
+def test_daily_seed_is_stable_and_curated_seeds_win():
+    assert daily_seed(DAY) == daily_seed(DAY) != daily_seed(DAY + datetime.timedelta(days=1))
+    assert daily_seed(DAY, curated={"2026-12-24": 12345}) == 12345
+    assert daily_seed(DAY, curated={"2026-12-25": 12345}) == daily_seed(DAY)
+
+
+@pytest.mark.parametrize("seed", [-1, 2**32, 2**40, 1.5, "7", True])
+def test_daily_seed_rejects_seeds_a_replay_cannot_store(seed):
+    with pytest.raises(ValueError):
+        daily_seed(DAY, curated={"2026-12-24": seed})
+
+
+@pytest.mark.parametrize("seed", [0, 2**32 - 1])
+def test_curated_seed_replays_round_trip(seed):
+    state = GameState(daily_seed(DAY, curated={"2026-12-24": seed})); recorder = ReplayRecorder(state.seed, "AAA")
+    for _ in range(120): recorder.step(0); step(state, 0)
+    replay = Replay.from_bytes(recorder.finish(state.score).to_bytes())
+    assert replay.seed == seed and replay.steps == 120
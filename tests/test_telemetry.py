@@ -0,0 +1,48 @@
+import glob
+import gzip
+import os
+import time
+from telemetry import Telemetry, read_events
+
+
+def files(directory): return sorted(glob.glob(os.path.join(directory, "telemetry-*.jsonl.gz")))
+
+
+def flush(telemetry):
+    """Wakes the writer thread and waits until it has written everything recorded so far."""
+    telemetry._wake.set(); deadline = time.monotonic() + 5
+    while telemetry.written + telemetry.dropped < telemetry.recorded and time.monotonic() < deadline: time.sleep(0.01)
+
+
+def test_batches_rotate_into_files_that_read_back(tmp_path):
+    directory = str(tmp_path)
+    telemetry = Telemetry(directory, batch_size=10**6, flush_interval=60, max_file_bytes=1, max_files=100)
+    for batch in range(3):
+        for i in range(5): telemetry.record("tick", batch=batch, i=i)
+        flush(telemetry)  # every flush after the first starts a new file
+    telemetry.close()
+    paths = files(directory)
+    assert len(paths) >= 3
+    assert [(e["batch"], e["i"]) for path in paths for e in read_events(path)] == [(b, i) for b in range(3) for i in range(5)]
+    assert telemetry.stats()["written"] == 15
+
+
+def test_members_append_and_a_torn_batch_is_not_an_error(tmp_path):
+    directory = str(tmp_path)
+    telemetry = Telemetry(directory, flush_interval=60)
+    telemetry.record("a"); flush(telemetry); telemetry.record("b"); telemetry.close()
+    (path,) = files(directory)
+    assert [e["event"] for e in read_events(path)] == ["a", "b"]
+    with open(path, "ab") as f: f.write(gzip.compress(b'{"event":"c"}\n' * 100)[:20])  # killed mid-write
+    assert [e["event"] for e in read_events(path)][:2] == ["a", "b"]
+
+
+def test_buffer_drops_the_oldest_and_old_files_are_pruned(tmp_path):
+    directory = str(tmp_path)
+    telemetry = Telemetry(directory, capacity=4, batch_size=10**6, flush_interval=60, max_file_bytes=1, max_files=2)
+    telemetry.close()  # no writer: the buffer fills up
+    for i in range(6): telemetry.record("tick", i=i)
+    assert telemetry.stats()["dropped"] == 2 and [e["i"] for e in telemetry.buffer] == [2, 3, 4, 5]
+    for i in range(4): telemetry.record("tick", i=10 + i); telemetry._flush()
+    paths = files(directory)
+    assert len(paths) == 2 and [e["i"] for e in read_events(paths[-1])] == [13]
@@ -0,0 +1,30 @@
+from timestep import FixedTimestep, FramePacer
+
+DT = 1 / 60
+
+
+def test_accumulator_carries_the_remainder_into_alpha():
+    timestep = FixedTimestep(60)
+    assert timestep.advance(DT * 0.5) == 0 and abs(timestep.alpha - 0.5) < 1e-9
+    assert timestep.advance(DT * 0.75) == 1 and abs(timestep.alpha - 0.25) < 1e-9
+    assert timestep.advance(DT * 2.5) == 2 and abs(timestep.alpha - 0.75) < 1e-9
+    timestep.reset(); assert timestep.alpha == 0.0
+
+
+def test_jittery_60hz_frames_snap_to_one_step():
+    timestep = FixedTimestep(60)
+    steps = [timestep.advance(DT * factor) for factor in (1.05, 0.95, 1.08, 0.92) * 50]
+    assert steps == [1] * 200 and timestep.steps == 200
+
+
+def test_a_long_stall_runs_at_most_max_steps():
+    timestep = FixedTimestep(60, max_steps=5)
+    assert timestep.advance(DT * 30.4) == 5
+    assert abs(timestep.dropped_s - DT * 25) < 1e-9
+    assert timestep.alpha < 1.0 and timestep.advance(DT) == 1
+
+
+def test_vsync_pacing_falls_back_to_the_clock_when_flips_dont_block():
+    pacer = FramePacer('vsync', 60)
+    for _ in range(FramePacer.LEARN_FRAMES): pacer.begin(); pacer.rendered(); pacer.presented()
+    assert not pacer.flips_block and pacer.stats()["refresh_hz"] == 60
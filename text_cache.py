@@ -0,0 +1,36 @@
+import pygame
+from presentation import to_display_format
+
+
+def render_text(font, text, color):
+    """Renders one antialiased string in the display's alpha format (the factory for a SpriteCache of text)."""
+    return to_display_format(font.render(text, True, color), alpha=True)
+
+
+class GlyphAtlas:
+    """
+    A fixed set of characters (e.g. score digits) rendered once into a single
+    surface. draw() blits one glyph area per character, so a changing number
+    never rasterizes a new string.
+    """
+    def __init__(self, font, color, chars="0123456789"):
+        self.surface = to_display_format(font.render(chars, True, color), alpha=True)
+        self.height = self.surface.get_height()
+        self.glyphs = {}
+        x = 0
+        for i, ch in enumerate(chars):
+            # Advance from the rendered prefix width, so kerning/proportional fonts line up
+            next_x = font.size(chars[:i + 1])[0]
+            self.glyphs[ch] = pygame.Rect(x, 0, next_x - x, self.height)
+            x = next_x
+
+    def width(self, text): return sum(self.glyphs[ch].width for ch in text)
+
+    def draw(self, surface, text, pos):
+        """Draws 'text' (which must only use atlas characters) with its top-left at pos."""
+        x, y = pos; atlas, glyphs = self.surface, self.glyphs
+        blits = []
+        for ch in text:
+            area = glyphs[ch]; blits.append((atlas, (x, y), area)); x += area.width
+        surface.blits(blits, doreturn=False)
+        return x
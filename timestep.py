@@ -0,0 +1,118 @@
+import time
+import pygame
+
+PACING_MODES = ('fixed', 'uncapped', 'vsync', 'low-latency')
+
+
+class FixedTimestep:
+    """
+    Runs the simulation at a fixed rate, independent of the render rate.
+
+    advance() adds a frame's real elapsed time to an accumulator and returns
+    how many fixed steps to run; the leftover fraction of a step ('alpha')
+    is what the renderer interpolates by. At most 'max_steps' run per frame:
+    after a long stall the extra time is dropped (and counted) rather than
+    replayed in a burst. A frame within 'snap' of exactly one step counts as
+    one step, so timer jitter at a 60 Hz render rate never produces
+    0- or 2-step frames.
+    """
+    def __init__(self, rate, max_steps=5, snap=0.1):
+        self.dt, self.max_steps, self.snap = 1 / rate, max_steps, snap
+        self.accumulator, self.steps, self.dropped_s = 0.0, 0, 0.0
+
+    def advance(self, elapsed):
+        dt = self.dt
+        if abs(elapsed - dt) < dt * self.snap: elapsed = dt
+        self.accumulator += elapsed
+        steps = int(self.accumulator / dt + 1e-9)
+        if steps > self.max_steps:
+            self.dropped_s += (steps - self.max_steps) * dt; steps = self.max_steps
+            self.accumulator = dt * steps
+        self.accumulator = max(0.0, self.accumulator - steps * dt); self.steps += steps
+        return steps
+
+    @property
+    def alpha(self): return min(1.0, self.accumulator / self.dt)
+
+    def reset(self): self.accumulator = 0.0
+
+
+class FramePacer:
+    """
+    Decides when a frame starts. Call begin() at the top of the frame (it
+    waits as the mode requires and returns the seconds since the previous
+    frame), then read input, step and draw, call rendered() just before
+    presenting and presented() right after.
+
+    Modes:
+      'fixed'       - clock.tick(fps), the original pacing
+      'uncapped'    - no waiting at all (render as fast as possible)
+      'vsync'       - no waiting; the presenter's vsync flip blocks instead
+      'low-latency' - vsync, but sleeps *before* reading input so that
+                      input + simulation + drawing finish just ahead of the
+                      next vblank, instead of input being read right after
+                      the previous flip and then waiting a whole refresh
+
+    In vsync modes the refresh period is measured over the first frames
+    (low-latency mode doesn't sleep until it is known). If the flips turn out
+    not to block (no vsync available, e.g. set_mode without SCALED or OPENGL),
+    the period falls back to 1/fps: vsync mode then paces with clock.tick(fps)
+    like 'fixed', and low-latency mode works as a frame limiter that reads
+    input late.
+    stats() reports the frame time, the work time and the input-to-present
+    latency (exponential moving averages, in milliseconds).
+    """
+    MARGIN = 0.002         # seconds of slack kept before the vblank in low-latency mode
+    LEARN_FRAMES = 120     # frames measured to find the refresh period
+    MIN_VSYNC_PERIOD = 1 / 250
+
+    def __init__(self, mode='fixed', fps=60, refresh_rate=None):
+        if mode not in PACING_MODES: raise ValueError(f"Unknown pacing mode '{mode}', expected one of {PACING_MODES}")
+        self.mode, self.fps = mode, fps
+        self.period = 1 / (refresh_rate or fps)
+        self._intervals = [] if refresh_rate is None and self.vsync else None
+        self.flips_block = True  # cleared once vsync flips are measured not to wait
+        self.clock = pygame.time.Clock()
+        self.frame_ms, self.work_ms, self.latency_ms = 0.0, 0.0, 0.0
+        self._last = self._input_at = self._rendered_at = self._presented_at = time.perf_counter()
+
+    @property
+    def vsync(self): return self.mode in ('vsync', 'low-latency')
+
+    def begin(self):
+        if self.mode == 'fixed' or self.mode == 'vsync' and not self.flips_block:
+            self.clock.tick(self.fps)
+        elif self.mode == 'low-latency' and self._intervals is None:
+            # Expected work plus a margin has to fit between now and the next vblank
+            delay = self._presented_at + self.period - (self.work_ms / 1000 * 1.25 + self.MARGIN) - time.perf_counter()
+            if delay > 0: time.sleep(delay)
+        now = time.perf_counter()
+        elapsed = now - self._last; self._last = self._input_at = now
+        self.frame_ms += (elapsed * 1000 - self.frame_ms) * 0.05
+        return elapsed
+
+    def rendered(self): self._rendered_at = time.perf_counter()
+
+    def presented(self):
+        now = time.perf_counter()
+        if self._intervals is not None:
+            self._intervals.append(now - self._presented_at)
+            if len(self._intervals) == self.LEARN_FRAMES:
+                median = sorted(self._intervals)[self.LEARN_FRAMES // 2]
+                if median >= self.MIN_VSYNC_PERIOD: self.period = median
+                else:
+                    self.flips_block = False
+                    print(f"Frame pacing: flips don't wait for vsync, pacing to {self.fps} fps instead.")
+                self._intervals = None
+        self._presented_at = now
+        self.work_ms += ((self._rendered_at - self._input_at) * 1000 - self.work_ms) * 0.05
+        self.latency_ms += ((now - self._input_at) * 1000 - self.latency_ms) * 0.05
+
+    def resync(self):
+        """Forgets the time spent outside the loop (a modal screen), so it isn't simulated afterwards."""
+        self._last = self._presented_at = time.perf_counter()
+        if self._intervals: self._intervals.clear()
+
+    def stats(self):
+        return {"mode": self.mode, "flips_block": self.flips_block, "frame_ms": self.frame_ms, "work_ms": self.work_ms,
+                "latency_ms": self.latency_ms, "refresh_hz": 1 / self.period}
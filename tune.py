@@ -0,0 +1,157 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from simulation import DESIGN_WIDTH, FPS, PLAYER_SPEED, INPUT_LEFT, INPUT_RIGHT, Tuning, simulate
+
+# Difficulty sweep: plays large batches of seeded, display-less games with a
+# scripted bot for every combination of tuning values and reports how long the
+# bot survives and what it scores. Every parameter set is played on the same
+# seeds, so differences between rows come from the tuning, not the dice.
+#
+#   python tune.py --param obstacle_speed=3,4 --param graze_margin=40,60 --games 2000
+
+# --- Bot ---
+BOT_LOOKAHEAD = 220    # px above the player the bot looks at
+BOT_HORIZON = 12       # frames of movement a candidate move is projected for
+BOT_MARGIN = 6         # px of clearance the bot wants on each side
+
+def dodge_bot(state):
+    """
+    Scripted policy: scores staying, moving left and moving right by how many
+    (and how close) obstacles are in the way of the projected position and
+    picks the safest, preferring to stay put and drifting back to the middle.
+    Module-level so it pickles into the worker processes.
+    """
+    player, obstacles = state.player, state.obstacles
+    n = len(obstacles)
+    centre_bits = INPUT_LEFT if player.x > DESIGN_WIDTH / 2 + 40 else INPUT_RIGHT if player.x < DESIGN_WIDTH / 2 - 40 else 0
+    if not n: return centre_bits
+    x, y, w, h = obstacles.x[:n], obstacles.y[:n], obstacles.w[:n], obstacles.h[:n]
+    ahead = (y + h > player.y - BOT_LOOKAHEAD) & (y < player.y + player.height)
+    if not ahead.any(): return centre_bits
+    x, w = x[ahead], w[ahead]
+    closeness = 1.0 / (1.0 + np.maximum(0.0, player.y - (y[ahead] + h[ahead])))
+    half, low, high = player.width / 2, player.width, DESIGN_WIDTH - player.width
+    best_bits, best_danger = 0, None
+    for bits, dx in ((0, 0), (INPUT_LEFT, -PLAYER_SPEED * BOT_HORIZON), (INPUT_RIGHT, PLAYER_SPEED * BOT_HORIZON)):
+        cx = max(low, min(high, player.x + dx))
+        left, right = cx - half - BOT_MARGIN, cx + half + BOT_MARGIN
+        danger = closeness[(x < right) & (left < x + w)].sum() + (0 if bits == 0 else 1e-3)
+        if best_danger is None or danger < best_danger: best_bits, best_danger = bits, danger
+    return best_bits
+
+
+# --- Worker ---
+def run_chunk(params, seeds, max_frames, quiz_accuracy):
+    """Plays one game per seed with the given tuning overrides; runs in a worker process."""
+    tuning = Tuning(**params)
+    results = []
+    for seed in seeds:
+        quiz_rng = random.Random(seed ^ 0x5EED)
+        def answer(state, q):
+            return q["correct"] if quiz_rng.random() < quiz_accuracy else (q["correct"] + 1) % len(q["options"])
+        state = simulate(seed, dodge_bot, answer, max_frames, tuning)
+        results.append((state.game_time, state.score, not state.game_over))
+    return results
+
+
+def summarize(values):
+    values = np.asarray(values, dtype=float)
+    p10, p50, p90 = np.percentile(values, [10, 50, 90])
+    return {"mean": float(values.mean()), "p10": float(p10), "p50": float(p50), "p90": float(p90),
+            "min": float(values.min()), "max": float(values.max())}
+
+
+# --- CLI ---
+def parse_value(text):
+    for cast in (int, float):
+        try: return cast(text)
+        except ValueError: pass
+    raise argparse.ArgumentTypeError(f"'{text}' is not a number")
+
+def parse_param(text):
+    name, sep, values = text.partition("=")
+    if not sep or not values: raise argparse.ArgumentTypeError(f"expected name=v1,v2,... but got '{text}'")
+    if name not in Tuning.parameter_names():
+        raise argparse.ArgumentTypeError(f"unknown parameter '{name}' (choose from {', '.join(Tuning.parameter_names())})")
+    return name, [parse_value(v) for v in values.split(",")]
+
+def parameter_grid(params):
+    """Cartesian product of every --param's values, as a list of override dicts."""
+    names = [name for name, _ in params]
+    return [dict(zip(names, combo)) for combo in itertools.product(*(values for _, values in params))]
+
+def chunked(seq, size): return [seq[i:i + size] for i in range(0, len(seq), size)]
+
+
+def sweep(grid, seeds, max_frames, quiz_accuracy=1.0, workers=None, chunk_size=None):
+    """
+    Runs every parameter set on every seed across a process pool and returns
+    one summary dict per set, in grid order. Seeds are split into chunks so
+    each worker gets many small jobs and stays busy until the end.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, min(50, len(seeds) * len(grid) // (workers * 8)))
+    jobs = [(i, chunk) for i in range(len(grid)) for chunk in chunked(seeds, chunk_size)]
+    results = [[] for _ in grid]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(i, pool.submit(run_chunk, grid[i], chunk, max_frames, quiz_accuracy)) for i, chunk in jobs]
+        for i, future in futures: results[i].extend(future.result())
+    summaries = []
+    for params, games in zip(grid, results):
+        frames, scores, timeouts = zip(*games)
+        summaries.append({"params": params, "games": len(games), "timeouts": sum(timeouts),
+                          "survival_s": summarize(np.array(frames) / FPS), "score": summarize(scores)})
+    return summaries
+
+
+def format_table(summaries):
+    names = sorted({name for s in summaries for name in s["params"]})
+    header = [*names, "games", "survive p10", "p50", "p90", "mean", "score p10", "p50", "p90", "mean", "timeouts"]
+    rows = []
+    for s in summaries:
+        sv, sc = s["survival_s"], s["score"]
+        rows.append([*(str(s["params"].get(name, "")) for name in names), str(s["games"]),
+                     *(f"{sv[k]:.1f}" for k in ("p10", "p50", "p90", "mean")),
+                     *(f"{sc[k]:.0f}" for k in ("p10", "p50", "p90", "mean")), str(s["timeouts"])])
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in [header] + rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep difficulty parameters with headless bot games.")
+    parser.add_argument("--param", action="append", type=parse_param, default=[], metavar="NAME=V1,V2",
+                        help="tuning parameter and values to try (repeat for a grid); parameters: " + ", ".join(Tuning.parameter_names()))
+    parser.add_argument("--games", type=int, default=500, help="games per parameter set (default 500)")
+    parser.add_argument("--seed", type=int, default=0, help="first seed; games use seed .. seed+games-1")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--max-minutes", type=float, default=10, help="cap on a single game's length (default 10)")
+    parser.add_argument("--quiz-accuracy", type=float, default=1.0, help="chance the bot answers a quiz question correctly")
+    parser.add_argument("--json", metavar="PATH", help="also write the summaries as JSON")
+    args = parser.parse_args(argv)
+
+    grid = parameter_grid(args.param)
+    seeds = list(range(args.seed, args.seed + args.games))
+    max_frames = int(args.max_minutes * 60 * FPS)
+    workers = args.workers or os.cpu_count() or 1
+    print(f"Sweeping {len(grid)} parameter set(s) x {len(seeds)} games on {workers} worker(s)...", file=sys.stderr)
+    start = time.perf_counter()
+    summaries = sweep(grid, seeds, max_frames, args.quiz_accuracy, workers)
+    elapsed = time.perf_counter() - start
+    total_frames = sum(s["survival_s"]["mean"] * FPS * s["games"] for s in summaries)
+    print(format_table(summaries))
+    print(f"{len(grid) * len(seeds)} games, {total_frames / elapsed:,.0f} simulated frames/s in {elapsed:.1f}s", file=sys.stderr)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"defaults": Tuning().as_dict(), "seeds": [seeds[0], seeds[-1]], "max_frames": max_frames,
+                       "quiz_accuracy": args.quiz_accuracy, "results": summaries}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()